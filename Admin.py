@@ -5,24 +5,40 @@
 # - Add, Search, Update, and Delete Flights
 # - Uses SQLite for persistent storage
 # - GUI built with Tkinter
-# - Text-to-Speech announcements using gTTS + pygame
+# - Text-to-Speech announcements using gTTS + pygame, coalesced (see announcer.py)
+#   and streamed sentence by sentence (see speech.py)
+# - Multi-leg route finder (see itinerary.py)
+# - Booking and passenger reports (see analytics.py)
+# - Automatic boarding / final call announcements (see announcement_scheduler.py)
+# - Background ANALYZE and incremental vacuum (see maintenance.py)
 # - Can be extended later for passengers & bookings
 # ---------------------------
 
 
-from gtts import gTTS
 from tkinter import *
 import tkinter.messagebox as messagebox
-import sqlite3
-import os
-import pygame
+import slow_query_log
+import speech
+import itinerary
+import flight_events
+import flight_cache
+import autocomplete
+import audit_log
+import analytics
+import announcement_scheduler
+import announcer
+import archive
+import departure_board
+import maintenance
+import change_feed
+from flight_times import now_minutes
 
 # -------------------------------
 # Database Setup
 # -------------------------------
 def setup_database():
     """Initialize the SQLite database with flights, passengers, and bookings tables."""
-    conn = sqlite3.connect('airline_management.db')
+    conn = slow_query_log.connect('airline_management.db')
     cursor = conn.cursor()
     
     # Create flights table
@@ -36,6 +52,11 @@ def setup_database():
             arrival_time VARCHAR NOT NULL
         )
     ''')
+
+    # Lookups, updates and deletes by flight number (see query_plans.py)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_flights_number ON flights (flight_number)
+    ''')
     
     # Create passengers table
     cursor.execute('''
@@ -60,6 +81,9 @@ def setup_database():
             FOREIGN KEY(flight_id) REFERENCES flights(id)
         )
     ''')
+
+    # Change records for boards, caches and exports (see change_feed.py)
+    change_feed.setup_change_feed(conn)
     
     conn.commit()
     conn.close()
@@ -71,21 +95,13 @@ setup_database()  # Ensure database is ready before GUI starts
 # Text-to-Speech (gTTS + pygame)
 # -------------------------------
 def text_to_speech(text):
-    """Convert text to speech and play it using pygame."""
-    tts = gTTS(text=text, lang='en')
-    audio_file = "flight_info.mp3"
-    tts.save(audio_file)
-    
-    pygame.mixer.init()
-    pygame.mixer.music.load(audio_file)
-    pygame.mixer.music.play()
-    
-    # Keep program running until audio finishes
-    while pygame.mixer.music.get_busy():
-        continue
-    
-    pygame.mixer.quit()
-    os.remove(audio_file)  # Remove temp audio file after playing
+    """Convert text to speech and play it, starting with the first sentence."""
+    speech.speak(text)
+
+
+# All announcements are spoken one at a time by a background thread,
+# with bursts merged into a single utterance
+announcements = announcer.Announcer(text_to_speech)
 
 
 # -------------------------------
@@ -112,7 +128,7 @@ def add():
     arrival_time = arrival_time_entry.get()
 
     if flight_number and origin and destination and departure_time and arrival_time:
-        conn = sqlite3.connect('airline_management.db')
+        conn = slow_query_log.connect('airline_management.db')
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -121,6 +137,10 @@ def add():
         ''', (flight_number, origin, destination, departure_time, arrival_time))
         
         conn.commit()
+        flight_events.flight_changed(conn, flight_number)
+        audit_log.record("insert", "flights", flight_number, after={
+            "flight_number": flight_number, "origin": origin, "destination": destination,
+            "departure_time": departure_time, "arrival_time": arrival_time})
         conn.close()
         messagebox.showinfo("Success", "Flight added successfully!")
         
@@ -128,7 +148,7 @@ def add():
         flight_info = (f"Flight {flight_number} from {origin} to {destination} "
                        f"has been successfully added. Departure at {departure_time} "
                        f"and arrival at {arrival_time}.")
-        text_to_speech(flight_info)
+        announcements.announce(flight_info, kind="added", flight_number=flight_number, origin=origin)
         
         clear_entries()
     else:
@@ -143,24 +163,21 @@ def search():
     flight_number = flight_number_entry.get()
 
     if flight_number:
-        conn = sqlite3.connect('airline_management.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT flight_number, origin, destination, departure_time, arrival_time
-            FROM flights
-            WHERE flight_number = ?
-        ''', (flight_number,))
-        
-        result = cursor.fetchone()
-        conn.close()
+        # Served from memory unless the flights table has changed
+        result = flight_cache.get_flight_cache().get_by_number(flight_number)
 
         if result:
-            flight_info = (f"Flight {result[0]} from {result[1]} to {result[2]} "
-                           f"departs at {result[3]} and arrives at {result[4]}.")
-            text_to_speech(flight_info)
+            flight_info = (f"Flight {result[1]} from {result[2]} to {result[3]} "
+                           f"departs at {result[4]} and arrives at {result[5]}.")
+            announcements.announce(flight_info, kind="info", flight_number=result[1])
         else:
-            messagebox.showinfo("Not Found", "No flight found with that flight number.")
+            # Departed flights are moved to the archive (see archive.py)
+            archived = archive.find_archived_flight(flight_number)
+            if archived:
+                messagebox.showinfo("Archived", f"Flight {archived[1]} from {archived[2]} to {archived[3]} "
+                                                f"departed at {archived[4]} and has been archived.")
+            else:
+                messagebox.showinfo("Not Found", "No flight found with that flight number.")
     else:
         messagebox.showinfo("Alert", "Please enter a flight number to search.")
 
@@ -177,9 +194,11 @@ def update():
     arrival_time = arrival_time_entry.get()
 
     if flight_number and origin and destination and departure_time and arrival_time:
-        conn = sqlite3.connect('airline_management.db')
+        conn = slow_query_log.connect('airline_management.db')
         cursor = conn.cursor()
 
+        before = audit_log.rows_as_dicts(conn, "SELECT * FROM flights WHERE flight_number = ?", (flight_number,))
+
         cursor.execute('''
             UPDATE flights 
             SET origin = ?, destination = ?, departure_time = ?, arrival_time = ? 
@@ -187,6 +206,11 @@ def update():
         ''', (origin, destination, departure_time, arrival_time, flight_number))
 
         conn.commit()
+        flight_events.flight_changed(conn, flight_number)
+        for row in before:
+            audit_log.record("update", "flights", flight_number, before=row, after=dict(
+                row, origin=origin, destination=destination,
+                departure_time=departure_time, arrival_time=arrival_time))
 
         if cursor.rowcount > 0:  # FIXED: used rowcount instead of xcount
             messagebox.showinfo("Success", f"Flight {flight_number} updated successfully.")
@@ -194,7 +218,7 @@ def update():
             flight_info = (f"Flight {flight_number} has been successfully updated. "
                            f"It will now depart from {origin} to {destination} at {departure_time} "
                            f"and arrive at {arrival_time}.")
-            text_to_speech(flight_info)
+            announcements.announce(flight_info, kind="updated", flight_number=flight_number, origin=origin)
             clear_entries()
         else:
             messagebox.showinfo("Not Found", "No flight found with that flight number.")
@@ -210,19 +234,25 @@ def delete():
     flight_number = flight_number_entry.get()
 
     if flight_number:
-        conn = sqlite3.connect('airline_management.db')
+        conn = slow_query_log.connect('airline_management.db')
         cursor = conn.cursor()
         
+        before = audit_log.rows_as_dicts(conn, "SELECT * FROM flights WHERE flight_number = ?", (flight_number,))
+
         cursor.execute('''
             DELETE FROM flights WHERE flight_number = ?
         ''', (flight_number,))
         
         conn.commit()
+        flight_events.flight_changed(conn, flight_number)
+        for row in before:
+            audit_log.record("delete", "flights", flight_number, before=row)
 
         if cursor.rowcount > 0:  # FIXED: used rowcount instead of xcount
             messagebox.showinfo("Success", f"Flight {flight_number} deleted successfully.")
             flight_info = f"Flight {flight_number} has been successfully deleted."
-            text_to_speech(flight_info)
+            announcements.announce(flight_info, kind="deleted", flight_number=flight_number,
+                                   origin=before[0]["origin"] if before else None)
             clear_entries()
         else:
             messagebox.showinfo("Not Found", "No flight found with that flight number.")
@@ -232,6 +262,42 @@ def delete():
         messagebox.showinfo("Alert", "Please enter a flight number to delete.")
 
 
+# -------------------------------
+# Find Route (connecting flights)
+# -------------------------------
+def find_route():
+    """Find itineraries between two airports, departing from now on."""
+    route_origin = route_origin_entry.get()
+    route_destination = route_destination_entry.get()
+
+    if route_origin and route_destination:
+        graph = itinerary.get_flight_graph()
+        itineraries = graph.find_itineraries(route_origin, route_destination,
+                                             earliest=now_minutes())
+        if itineraries:
+            routes = "\n\n".join(graph.describe(legs) for legs in itineraries)
+            messagebox.showinfo("Routes", routes)
+        else:
+            messagebox.showinfo("Not Found", "No connecting flights found between those airports.")
+    else:
+        messagebox.showinfo("Alert", "Please enter an origin and a destination.")
+
+
+# -------------------------------
+# Reports
+# -------------------------------
+def show_reports():
+    """Show passenger ages, busiest routes and peak hours in a new window."""
+    report = analytics.format_report(analytics.get_analytics())
+
+    window = Toplevel(root)
+    window.title("Reports")
+    text = Text(window, width=60, height=30)
+    text.insert(END, report)
+    text.config(state=DISABLED)
+    text.pack(fill=BOTH, expand=True)
+
+
 # -------------------------------
 # Tkinter GUI Setup
 # -------------------------------
@@ -281,6 +347,39 @@ update_button.place(x=180, y=430)
 delete_button = Button(right_frame, text="Delete Flight", command=delete)
 delete_button.place(x=280, y=430)
 
+# Route finder
+Label(right_frame, text="Route From", font=("Calibri", 12, "bold"), bg="lightgray").place(x=150, y=490)
+Label(right_frame, text="Route To", font=("Calibri", 12, "bold"), bg="lightgray").place(x=150, y=540)
+
+route_origin_entry = Entry(right_frame)
+route_destination_entry = Entry(right_frame)
+route_origin_entry.place(x=280, y=495)
+route_destination_entry.place(x=280, y=545)
+
+# Type-ahead suggestions from the in-memory flight index
+suggestions = autocomplete.get_suggestions()
+autocomplete.Autocomplete(flight_number_entry, suggestions.flight_numbers)
+for place_entry in (origin_entry, destination_entry, route_origin_entry, route_destination_entry):
+    autocomplete.Autocomplete(place_entry, suggestions.places_for)
+
+route_button = Button(right_frame, text="Find Route", command=find_route)
+route_button.place(x=280, y=590)
+
+# Reports window
+reports_button = Button(right_frame, text="Reports", command=show_reports)
+reports_button.place(x=180, y=590)
+
+# Live departures/arrivals board (Escape leaves full screen)
+board_button = Button(right_frame, text="Departure Board",
+                      command=lambda: departure_board.open_board(root))
+board_button.place(x=380, y=590)
+
+# Boarding and final call announcements for upcoming departures
+announcement_scheduler.start_scheduler(announcements.announce)
+
+# ANALYZE after heavy change, reclaim free pages while idle
+maintenance.start_maintenance()
+
 # Window size
 root.geometry("1200x720")
 root.mainloop()
@@ -17,6 +17,8 @@ from tkinter import messagebox
 import sqlite3
 import subprocess   # To run external scripts like admin.py / flight.py
 
+from staff_import import verify_password
+
 
 # -----------------------------
 # Database Setup
@@ -36,6 +38,11 @@ def setup_database():
             password TEXT NOT NULL
         )
     ''')
+
+    # Login looks users up by first name and position
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_users_login ON users (first_name, position)
+    ''')
     conn.commit()
     conn.close()
 
@@ -128,11 +135,12 @@ def show_login_page():
         conn = sqlite3.connect('airline_manage.db')
         cursor = conn.cursor()
         cursor.execute('''
-            SELECT * FROM users 
-            WHERE first_name = ? AND position = ? AND password = ?
-        ''', (first_name, position, password))
+            SELECT password FROM users
+            WHERE first_name = ? AND position = ?
+        ''', (first_name, position))
 
-        result = cursor.fetchone()
+        # Stored passwords may be hashes (staff_import.py)
+        result = any(verify_password(stored, password) for (stored,) in cursor.fetchall())
         conn.close()
 
         if result:
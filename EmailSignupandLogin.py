@@ -3,6 +3,8 @@ from tkinter import messagebox
 import sqlite3
 import subprocess  # To run the main.py file after successful login
 
+from staff_import import verify_password
+
 
 # ============================
 # DATABASE SETUP
@@ -27,6 +29,11 @@ def setup_database():
         )
     ''')
 
+    # Login looks users up by first name and position
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_users_login ON users (first_name, position)
+    ''')
+
     conn.commit()
     conn.close()
 
@@ -125,11 +132,12 @@ def show_login_page():
 
         # Verify user details
         cursor.execute('''
-            SELECT * FROM users 
-            WHERE first_name = ? AND position = ? AND password = ?
-        ''', (first_name, position, password))
+            SELECT password FROM users
+            WHERE first_name = ? AND position = ?
+        ''', (first_name, position))
 
-        result = cursor.fetchone()
+        # Stored passwords may be hashes (staff_import.py)
+        result = any(verify_password(stored, password) for (stored,) in cursor.fetchall())
         conn.close()
 
         if result:
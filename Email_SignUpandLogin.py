@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import messagebox
 import sqlite3
 
+from staff_import import verify_password
+
 
 # ============================
 # DATABASE SETUP
@@ -25,6 +27,11 @@ def setup_database():
             password TEXT NOT NULL
         )
     ''')
+
+    # Login looks users up by first name and position
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_users_login ON users (first_name, position)
+    ''')
     conn.commit()
     conn.close()
 
@@ -124,11 +131,12 @@ def show_login_page():
 
         # Check if user exists
         cursor.execute('''
-            SELECT * FROM users 
-            WHERE first_name = ? AND position = ? AND password = ?
-        ''', (first_name, position, password))
+            SELECT password FROM users
+            WHERE first_name = ? AND position = ?
+        ''', (first_name, position))
 
-        result = cursor.fetchone()
+        # Stored passwords may be hashes (staff_import.py)
+        result = any(verify_password(stored, password) for (stored,) in cursor.fetchall())
         conn.close()
 
         if result:
@@ -37,6 +37,11 @@ def setup_database():
         )
     ''')
 
+    # Login looks users up by first name and position
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_users_login ON users (first_name, position)
+    ''')
+
     conn.commit()
     conn.close()
 
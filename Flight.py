@@ -1,10 +1,16 @@
-from gtts import gTTS
 from tkinter import *
 import tkinter.messagebox as messagebox
 import sqlite3
-import os
-import pygame
-import random
+import slow_query_log
+import speech
+import passenger_search
+import passport_index
+import booking_conflicts
+import seat_map
+import waitlist
+import maintenance
+import change_feed
+import audit_log
 
 
 # =======================
@@ -12,9 +18,13 @@ import random
 # =======================
 def setup_database():
     """Create the airline management database and tables if they do not exist."""
-    conn = sqlite3.connect('airline_management.db')
+    conn = slow_query_log.connect('airline_management.db')
     cursor = conn.cursor()
 
+    # Free pages are reclaimed in small slices (see maintenance.py);
+    # only takes effect when the database file is new
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
     # Create flights table.
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS flights (
@@ -27,6 +37,11 @@ def setup_database():
         )
     ''')
 
+    # Lookups, updates and deletes by flight number (see query_plans.py)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_flights_number ON flights (flight_number)
+    ''')
+
     # Create passengers table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS passengers (
@@ -51,6 +66,18 @@ def setup_database():
         )
     ''')
 
+    # Full-text passenger lookup index (see passenger_search.py)
+    passenger_search.setup_passenger_search(conn)
+
+    # Capacity and waitlist tables (see waitlist.py)
+    waitlist.setup_waitlist(conn)
+
+    # Change counters that trigger ANALYZE (see maintenance.py)
+    maintenance.setup_maintenance(conn)
+
+    # Change records for boards, caches and exports (see change_feed.py)
+    change_feed.setup_change_feed(conn)
+
     conn.commit()
     conn.close()
 
@@ -64,22 +91,11 @@ setup_database()
 def text_to_speech(text):
     """
     Converts given text into speech and plays it using pygame.
-    The temporary MP3 file is deleted after playback.
+    Sentences are synthesised concurrently and playback starts with
+    the first one (see speech.py).
     """
     try:
-        tts = gTTS(text=text, lang='en')
-        audio_file = "flight_info.mp3"
-        tts.save(audio_file)
-
-        pygame.mixer.init()
-        pygame.mixer.music.load(audio_file)
-        pygame.mixer.music.play()
-
-        while pygame.mixer.music.get_busy():  # Wait until the audio finishes
-            continue
-
-        pygame.mixer.quit()
-        os.remove(audio_file)
+        speech.speak(text)
     except Exception as e:
         messagebox.showerror("TTS Error", f"Could not play audio: {e}")
 
@@ -101,21 +117,31 @@ def save_passenger():
         messagebox.showwarning("Input Error", "Please fill in all fields.")
         return
 
-    conn = sqlite3.connect('airline_management.db')
+    conn = slow_query_log.connect('airline_management.db')
     cursor = conn.cursor()
 
-    # Check if passport number already exists
-    cursor.execute("SELECT COUNT(*) FROM passengers WHERE passport_number = ?", (passport_number,))
-    exists = cursor.fetchone()[0]
+    # Check if passport number already exists (Bloom filter first, see passport_index.py)
+    passports = passport_index.get_passport_index()
+    exists = passports.exists(passport_number)
+
+    if not exists:
+        try:
+            cursor.execute('''
+                INSERT INTO passengers (name, age, gender, passport_number, contact_info)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (name, age, gender, passport_number, contact_info))
+        except sqlite3.IntegrityError:
+            # Saved from another terminal since the index last caught up
+            exists = True
 
     if exists:
         messagebox.showerror("Duplicate Entry", "A passenger with this passport number already exists.")
     else:
-        cursor.execute('''
-            INSERT INTO passengers (name, age, gender, passport_number, contact_info)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (name, age, gender, passport_number, contact_info))
         conn.commit()
+        passports.add(passport_number)
+        audit_log.record("insert", "passengers", passport_number, after={
+            "name": name, "age": age, "gender": gender,
+            "passport_number": passport_number, "contact_info": contact_info})
         messagebox.showinfo("Success", f"Passenger {name} added successfully.")
         
         # Optional: Announce passenger registration using TTS
@@ -138,16 +164,9 @@ def clear_passenger_fields():
 # ==========================
 # BOOKING MANAGEMENT
 # ==========================
-def generate_seat_number():
-    """Generate a random seat number in the format '001-A'."""
-    seat_number = f"{random.randint(1, 150):03d}"
-    seat_row = random.choice(['A', 'B', 'C', 'D'])
-    return f"{seat_number}-{seat_row}"
-
-
 def book_flight(passenger_id, flight_id):
     """Book a passenger on a flight if not already booked."""
-    conn = sqlite3.connect('airline_management.db')
+    conn = slow_query_log.connect('airline_management.db')
     cursor = conn.cursor()
 
     # Verify passenger and flight IDs exist
@@ -173,16 +192,41 @@ def book_flight(passenger_id, flight_id):
         WHERE passenger_id = ? AND flight_id = ?
     ''', (passenger_id, flight_id))
     already_booked = cursor.fetchone()[0]
+    position = None if already_booked else waitlist.waitlist_position(conn, passenger_id, flight_id)
 
     if already_booked:
         messagebox.showwarning("Booking Error", "This passenger is already booked on this flight.")
+    elif position is not None:
+        messagebox.showwarning("Booking Error", f"This passenger is already waitlisted (position {position}).")
     else:
-        seat_number = generate_seat_number()
-        cursor.execute('''
-            INSERT INTO bookings (passenger_id, flight_id, seat_number)
-            VALUES (?, ?, ?)
-        ''', (passenger_id, flight_id, seat_number))
+        # Books a free seat, or waitlists the passenger if the flight is full
+        # (refused if the passenger is on an overlapping flight, checked
+        # under the same write lock as the insert)
+        status, detail = waitlist.book_or_waitlist(
+            conn, passenger_id, flight_id, conflicts=booking_conflicts.get_conflict_index().conflicts)
+        if status == "conflict":
+            conn.rollback()
+            messagebox.showwarning("Booking Error", "This passenger is already booked on overlapping flight(s):\n"
+                                   + booking_conflicts.describe(conn, detail))
+            conn.close()
+            return
         conn.commit()
+        if status == "booked":
+            audit_log.record("insert", "bookings", f"{passenger_id}/{flight_id}", after={
+                "passenger_id": passenger_id, "flight_id": flight_id, "seat_number": detail})
+        else:
+            audit_log.record("insert", "waitlist", f"{passenger_id}/{flight_id}", after={
+                "passenger_id": passenger_id, "flight_id": flight_id, "position": detail})
+
+        if status == "waitlisted":
+            messagebox.showinfo("Waitlisted", f"Flight is full. Passenger added to the waitlist at position {detail}.")
+            clear_booking_fields()
+            conn.close()
+            return
+
+        seat_number = detail or "assigned at gate"
+        if detail:
+            seat_map_view.mark_taken(flight_id, detail)
         messagebox.showinfo("Success", f"Flight booked successfully! Seat number: {seat_number}")
 
         # Optional: Announce booking
@@ -193,6 +237,51 @@ def book_flight(passenger_id, flight_id):
     conn.close()
 
 
+def cancel_booking():
+    """Cancel a booking and promote the next waitlisted passenger, if any."""
+    passenger_id = passenger_id_entry.get()
+    flight_id = flight_id_entry.get()
+
+    if not passenger_id.isdigit() or not flight_id.isdigit():
+        messagebox.showwarning("Input Error", "Please enter valid numeric IDs.")
+        return
+
+    passenger_id, flight_id = int(passenger_id), int(flight_id)
+    conn = slow_query_log.connect('airline_management.db')
+    seat_number = conn.execute('''
+        SELECT seat_number FROM bookings WHERE passenger_id = ? AND flight_id = ?
+    ''', (passenger_id, flight_id)).fetchone()
+    cancelled, promoted = waitlist.cancel_booking(
+        conn, passenger_id, flight_id, conflicts=booking_conflicts.get_conflict_index().conflicts)
+    conn.close()
+
+    if not cancelled:
+        messagebox.showinfo("Not Found", "No booking or waitlist entry for that passenger on this flight.")
+        return
+
+    key = f"{passenger_id}/{flight_id}"
+    if seat_number is not None:
+        audit_log.record("delete", "bookings", key, before={
+            "passenger_id": passenger_id, "flight_id": flight_id, "seat_number": seat_number[0]})
+    else:
+        audit_log.record("delete", "waitlist", key, before={
+            "passenger_id": passenger_id, "flight_id": flight_id})
+    if promoted:
+        audit_log.record("insert", "bookings", f"{promoted[0]}/{flight_id}", after={
+            "passenger_id": promoted[0], "flight_id": flight_id, "seat_number": promoted[1],
+            "promoted_from_waitlist": True})
+
+    if seat_number is not None:
+        seat_map_view.mark_free(flight_id, seat_number[0])
+    if promoted:
+        promoted_id, promoted_seat = promoted
+        seat_map_view.mark_taken(flight_id, promoted_seat)
+        messagebox.showinfo("Cancelled", f"Booking cancelled. Passenger {promoted_id} promoted from the waitlist to seat {promoted_seat}.")
+    else:
+        messagebox.showinfo("Cancelled", "Booking cancelled.")
+    clear_booking_fields()
+
+
 def submit_booking():
     """Handles the booking button click."""
     passenger_id = passenger_id_entry.get()
@@ -211,6 +300,61 @@ def clear_booking_fields():
     flight_id_entry.delete(0, END)
 
 
+# ==========================
+# SEAT MAP
+# ==========================
+def show_seat_map():
+    """Show which seats are taken on the flight in the Flight ID field."""
+    flight_id = flight_id_entry.get()
+
+    if not flight_id.isdigit():
+        messagebox.showwarning("Input Error", "Please enter a valid numeric flight ID.")
+        return
+
+    conn = slow_query_log.connect('airline_management.db')
+    flight_id = int(flight_id)
+    seat_map_view.show_flight(conn, flight_id, waitlist.flight_layout(conn, flight_id))
+    conn.close()
+    seat_map_label.config(text=f"Seat Map - Flight {flight_id}")
+
+
+# ==========================
+# PASSENGER LOOKUP
+# ==========================
+search_job = None
+search_results = []
+
+
+def schedule_passenger_search(event=None):
+    """Debounce keystrokes in the search box so we query once typing pauses."""
+    global search_job
+    if search_job is not None:
+        root.after_cancel(search_job)
+    search_job = root.after(150, run_passenger_search)
+
+
+def run_passenger_search():
+    """Fill the results list with passengers matching the search box."""
+    global search_job, search_results
+    search_job = None
+
+    conn = slow_query_log.connect('airline_management.db')
+    search_results = passenger_search.search_passengers(conn, passenger_search_entry.get())
+    conn.close()
+
+    search_listbox.delete(0, END)
+    for passenger_id, name, passport_number, contact_info in search_results:
+        search_listbox.insert(END, f"{passenger_id}: {name} ({passport_number}) {contact_info}")
+
+
+def select_passenger(event=None):
+    """Copy the selected passenger's ID into the booking form."""
+    selection = search_listbox.curselection()
+    if selection:
+        passenger_id_entry.delete(0, END)
+        passenger_id_entry.insert(0, str(search_results[selection[0]][0]))
+
+
 # ==========================
 # GUI SETUP
 # ==========================
@@ -251,6 +395,21 @@ flight_id_entry = Entry(left_frame); flight_id_entry.place(x=330, y=510)
 # Buttons
 Button(left_frame, text="Save Passenger", command=save_passenger, bg="green", fg="white").place(x=330, y=410)
 Button(left_frame, text="Book Flight", command=submit_booking, fg="green", bg="white").place(x=330, y=550)
+Button(left_frame, text="Cancel Booking", command=cancel_booking, fg="red", bg="white").place(x=430, y=550)
+
+# Passenger lookup (name, passport digits or contact details)
+Label(left_frame, text="Find Passenger", bg="lightblue").place(x=620, y=167)
+passenger_search_entry = Entry(left_frame, width=40); passenger_search_entry.place(x=720, y=170)
+passenger_search_entry.bind("<KeyRelease>", schedule_passenger_search)
+
+search_listbox = Listbox(left_frame, width=60, height=6); search_listbox.place(x=620, y=200)
+search_listbox.bind("<<ListboxSelect>>", select_passenger)
+
+# Seat map for the flight in the Flight ID field
+seat_map_label = Label(left_frame, text="Seat Map", bg="lightblue", font=("Arial", 12, "bold"))
+seat_map_label.place(x=620, y=330)
+seat_map_view = seat_map.SeatMap(left_frame, bg="lightblue"); seat_map_view.place(x=620, y=360)
+Button(left_frame, text="Show Seats", command=show_seat_map).place(x=480, y=507)
 
 # Run GUI loop
 root.mainloop()
@@ -0,0 +1,283 @@
+# ----------------------------------------
+# Airline Management System - Booking and Passenger Analytics
+# ----------------------------------------
+# Aggregates over bookings, passengers and flights:
+# - age distribution of passengers
+# - bookings per route (origin -> destination)
+# - peak departure hours (flights and booked passengers per hour)
+#
+# Columns are pulled from SQLite in chunks into NumPy arrays and the
+# aggregates are computed with bincount/indexing instead of Python
+# loops. Bookings are first reduced to (flight_id, count) pairs by
+# SQLite's GROUP BY, so only one row per flight crosses into Python
+# even with 10M bookings. Results are cached until PRAGMA data_version
+# says one of the tables has changed.
+#
+# NumPy is optional: without it the same columns are kept in
+# array.array and counted with plain Python (slower, same results).
+#
+#   python analytics.py              # report for airline_management.db
+#   python analytics.py --bench 10000000
+# ----------------------------------------
+
+import sqlite3
+import time
+from array import array
+from collections import Counter
+
+from flight_times import to_minutes
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DB_PATH = 'airline_management.db'
+
+# Rows fetched from SQLite per chunk
+CHUNK_SIZE = 200_000
+
+
+def _fetch_columns(conn, sql, width, chunk_size=CHUNK_SIZE):
+    """
+    The integer columns of a query, as NumPy arrays (or array.array
+    without NumPy), fetched in chunks.
+    """
+    cursor = conn.execute(sql)
+    if np is None:
+        columns = [array("q") for _ in range(width)]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return columns
+            for index, column in enumerate(columns):
+                column.extend(row[index] for row in rows)
+
+    chunks = []
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        chunks.append(np.array(rows, dtype=np.int64).reshape(len(rows), width))
+    if not chunks:
+        return [np.zeros(0, dtype=np.int64) for _ in range(width)]
+    block = np.concatenate(chunks)
+    return [block[:, index] for index in range(width)]
+
+
+class Analytics:
+    """Cached aggregates over the airline database."""
+
+    def __init__(self, db_path=DB_PATH, chunk_size=CHUNK_SIZE):
+        self.conn = sqlite3.connect(db_path)
+        self.chunk_size = chunk_size
+        self.version = None
+        self.results = {}
+
+    def _cached(self, name, compute):
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.version:
+            self.version = version
+            self.results.clear()
+        if name not in self.results:
+            self.results[name] = compute()
+        return self.results[name]
+
+    # -------------------------------
+    # Flights lookup table
+    # -------------------------------
+    def _flights(self):
+        """
+        Per-flight route index and departure hour, addressable by flight
+        id, so bookings can be aggregated with one fancy-index + bincount.
+        """
+        def compute():
+            routes = []
+            route_index = {}
+            ids, route_of, hour_of = [], [], []
+            for flight_id, origin, destination, departure_time in self.conn.execute('''
+                SELECT id, origin, destination, departure_time FROM flights
+            '''):
+                route = (origin.strip().upper(), destination.strip().upper())
+                index = route_index.get(route)
+                if index is None:
+                    index = route_index[route] = len(routes)
+                    routes.append(route)
+                minutes = to_minutes(departure_time)
+                ids.append(flight_id)
+                route_of.append(index)
+                hour_of.append(-1 if minutes is None else minutes % (24 * 60) // 60)
+
+            size = max(ids) + 1 if ids else 1
+            if np is None:
+                route_by_id = array("l", [-1]) * size
+                hour_by_id = array("l", [-1]) * size
+                for flight_id, route, hour in zip(ids, route_of, hour_of):
+                    route_by_id[flight_id] = route
+                    hour_by_id[flight_id] = hour
+            else:
+                route_by_id = np.full(size, -1, dtype=np.int64)
+                hour_by_id = np.full(size, -1, dtype=np.int64)
+                route_by_id[ids] = route_of
+                hour_by_id[ids] = hour_of
+            return routes, route_by_id, hour_by_id, hour_of
+
+        return self._cached("flights", compute)
+
+    def _bookings_per_flight(self):
+        """(flight ids, booking counts), reduced by SQLite's GROUP BY."""
+        return self._cached("booking_counts", lambda: _fetch_columns(self.conn, '''
+            SELECT flight_id, COUNT(*) FROM bookings GROUP BY flight_id
+        ''', 2, self.chunk_size))
+
+    # -------------------------------
+    # Aggregates
+    # -------------------------------
+    def age_distribution(self, bucket=10):
+        """[(label, passengers)] in age buckets of `bucket` years."""
+        def compute():
+            ages, counts = _fetch_columns(self.conn, '''
+                SELECT CAST(age AS INTEGER), COUNT(*) FROM passengers GROUP BY 1
+            ''', 2, self.chunk_size)
+            if np is None:
+                buckets = Counter()
+                for age, count in zip(ages, counts):
+                    if age >= 0:
+                        buckets[age // bucket] += count
+                top = max(buckets) + 1 if buckets else 0
+                counts = [buckets.get(i, 0) for i in range(top)]
+            else:
+                valid = ages >= 0
+                counts = (np.bincount(ages[valid] // bucket, weights=counts[valid]).astype(np.int64).tolist()
+                          if valid.any() else [])
+            return [(f"{i * bucket}-{i * bucket + bucket - 1}", count)
+                    for i, count in enumerate(counts)]
+        return self._cached(("ages", bucket), compute)
+
+    def bookings_per_route(self, top=20):
+        """[((origin, destination), bookings)] for the busiest routes."""
+        def compute():
+            routes, route_by_id, _, _ = self._flights()
+            flight_ids, bookings = self._bookings_per_flight()
+            if np is None:
+                counts = Counter()
+                for flight_id, count in zip(flight_ids, bookings):
+                    if 0 <= flight_id < len(route_by_id) and route_by_id[flight_id] >= 0:
+                        counts[route_by_id[flight_id]] += count
+                ranked = counts.most_common(top)
+            else:
+                known = (flight_ids >= 0) & (flight_ids < len(route_by_id))
+                route = route_by_id[flight_ids[known]]
+                valid = route >= 0
+                counts = np.bincount(route[valid], weights=bookings[known][valid],
+                                     minlength=len(routes)).astype(np.int64)
+                order = np.argsort(counts)[::-1][:top]
+                ranked = [(int(i), int(counts[i])) for i in order if counts[i]]
+            return [(routes[i], count) for i, count in ranked]
+        return self._cached(("routes", top), compute)
+
+    def peak_departure_hours(self):
+        """
+        Per hour of day (0-23): (flights departing, passengers booked on them).
+        Flights with unparseable departure times are left out.
+        """
+        def compute():
+            _, _, hour_by_id, hour_of = self._flights()
+            flight_ids, bookings = self._bookings_per_flight()
+            if np is None:
+                flights = Counter(hour for hour in hour_of if hour >= 0)
+                passengers = Counter()
+                for flight_id, count in zip(flight_ids, bookings):
+                    if 0 <= flight_id < len(hour_by_id) and hour_by_id[flight_id] >= 0:
+                        passengers[hour_by_id[flight_id]] += count
+                return [(flights.get(h, 0), passengers.get(h, 0)) for h in range(24)]
+
+            hours = np.asarray(hour_of, dtype=np.int64)
+            flights = np.bincount(hours[hours >= 0], minlength=24)
+            known = (flight_ids >= 0) & (flight_ids < len(hour_by_id))
+            booked = hour_by_id[flight_ids[known]]
+            valid = booked >= 0
+            passengers = np.bincount(booked[valid], weights=bookings[known][valid],
+                                     minlength=24).astype(np.int64)
+            return list(zip(flights.tolist(), passengers.tolist()))
+        return self._cached("hours", compute)
+
+
+def format_report(analytics):
+    """Plain-text report of all aggregates."""
+    lines = ["Passenger age distribution:"]
+    for label, count in analytics.age_distribution():
+        lines.append(f"  {label:>7}: {count}")
+    lines.append("Busiest routes:")
+    for (origin, destination), count in analytics.bookings_per_route(10):
+        lines.append(f"  {origin} -> {destination}: {count}")
+    lines.append("Departures by hour (flights / booked passengers):")
+    for hour, (flights, passengers) in enumerate(analytics.peak_departure_hours()):
+        if flights or passengers:
+            lines.append(f"  {hour:02d}:00  {flights:>6} / {passengers}")
+    return "\n".join(lines)
+
+
+# -------------------------------
+# Shared instance for the app
+# -------------------------------
+_analytics = None
+
+
+def get_analytics(db_path=DB_PATH):
+    """Return the shared Analytics instance (results cached across calls)."""
+    global _analytics
+    if _analytics is None:
+        _analytics = Analytics(db_path)
+    return _analytics
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import random
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Booking and passenger analytics.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--bench", type=int, metavar="BOOKINGS",
+                        help="time the aggregates on a synthetic database of this many bookings")
+    args = parser.parse_args()
+
+    if not args.bench:
+        print(format_report(Analytics(args.db)))
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "analytics_bench.db")
+        conn = sqlite3.connect(path)
+        conn.executescript('''
+            CREATE TABLE flights (id INTEGER PRIMARY KEY, flight_number, origin, destination,
+                                  departure_time, arrival_time);
+            CREATE TABLE passengers (id INTEGER PRIMARY KEY, name, age, gender,
+                                     passport_number, contact_info);
+            CREATE TABLE bookings (id INTEGER PRIMARY KEY, passenger_id, flight_id, seat_number);
+            CREATE INDEX idx_bookings_flight ON bookings (flight_id, passenger_id);
+        ''')
+        random.seed(1)
+        airports = ["LOS", "ABV", "PHC", "KAN", "ACC", "JFK", "LHR", "DXB"]
+        flights = 20_000
+        passengers = max(args.bench // 5, 1)
+        conn.executemany("INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?)", (
+            (i, f"FL{i}", *random.sample(airports, 2),
+             f"2025-05-{random.randint(1, 28):02d} {random.randint(0, 23):02d}:{random.randint(0, 59):02d}",
+             "") for i in range(1, flights + 1)))
+        conn.executemany("INSERT INTO passengers VALUES (?, 'x', ?, 'F', ?, 'x')", (
+            (i, random.randint(0, 90), f"P{i}") for i in range(1, passengers + 1)))
+        conn.executemany("INSERT INTO bookings VALUES (?, ?, ?, NULL)", (
+            (i, random.randint(1, passengers), random.randint(1, flights))
+            for i in range(1, args.bench + 1)))
+        conn.commit()
+
+        analytics = Analytics(path)
+        print(f"NumPy: {'yes' if np is not None else 'no (array fallback)'}")
+        for name, call in (("age distribution", analytics.age_distribution),
+                           ("bookings per route", analytics.bookings_per_route),
+                           ("peak departure hours", analytics.peak_departure_hours),
+                           ("bookings per route (cached)", analytics.bookings_per_route)):
+            start = time.perf_counter()
+            call()
+            print(f"{name}: {time.perf_counter() - start:.2f} s")
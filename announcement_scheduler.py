@@ -0,0 +1,283 @@
+# ----------------------------------------
+# Airline Management System - Announcement Scheduler
+# ----------------------------------------
+# Plays "now boarding" and "final call" announcements automatically,
+# BOARDING_MINUTES and FINAL_CALL_MINUTES before each departure.
+#
+# - Upcoming announcements are kept in a heap ordered by due time,
+#   built once from the parsed departure times of every flight
+# - One background thread sleeps on a condition variable until the
+#   next announcement is due (or until the heap changes), so the
+#   flights table is never polled
+# - Adding, updating or deleting a flight reschedules only that flight
+#   (through flight_events). Its old heap entries are not searched
+#   for; they are recognised as stale when they reach the top and
+#   dropped, and the heap is compacted once most of it is stale.
+#
+#   python announcement_scheduler.py   # prints announcements instead of speaking
+# ----------------------------------------
+
+import heapq
+import itertools
+import sqlite3
+import threading
+
+import flight_events
+from flight_times import to_minutes, now_seconds
+
+DB_PATH = 'airline_management.db'
+
+# Minutes before departure of each announcement
+BOARDING_MINUTES = 40
+FINAL_CALL_MINUTES = 15
+
+# Announcements more than this many seconds overdue are skipped
+# (e.g. the app was closed when they were due)
+GRACE_SECONDS = 120
+
+ANNOUNCEMENTS = (
+    ("boarding", BOARDING_MINUTES,
+     "Flight {flight_number} from {origin} to {destination} is now boarding."),
+    ("final_call", FINAL_CALL_MINUTES,
+     "Final call for flight {flight_number} to {destination}. Please proceed to the gate."),
+)
+
+
+class AnnouncementScheduler:
+    """Heap of upcoming announcements served by one sleeping thread."""
+
+    def __init__(self, announce, announcements=ANNOUNCEMENTS, clock=now_seconds, speed=1):
+        self.announce = announce            # announce(text, kind, flight_number, origin), from the thread
+        self.announcements = announcements
+        self.clock = clock
+        self.speed = speed                  # clock seconds per real second (demos)
+
+        self.heap = []                      # (due seconds, seq, flight id, token, kind)
+        self.flights = {}                   # flight id -> (flight_number, origin, destination, token)
+        self.by_number = {}                 # flight_number -> set of flight ids
+        self.stale = 0
+        self.fired = 0
+        self._seq = itertools.count()
+        self._wakeup = threading.Condition()
+        self._thread = None
+        self._running = False
+
+    # -------------------------------
+    # Building and incremental updates
+    # -------------------------------
+    def load(self, conn):
+        """(Re)build the heap from every flight that has not departed yet."""
+        with self._wakeup:
+            self.heap.clear()
+            self.flights.clear()
+            self.by_number.clear()
+            self.stale = 0
+            for row in conn.execute('''
+                SELECT id, flight_number, origin, destination, departure_time FROM flights
+            '''):
+                self._add_flight(row, push=False)
+            heapq.heapify(self.heap)
+            self._wakeup.notify()
+
+    def _add_flight(self, row, push=True):
+        flight_id, flight_number, origin, destination, departure_time = row
+        departure = to_minutes(departure_time)
+        if departure is None:
+            return False
+        # Entries pushed for an earlier version of the flight carry an
+        # older token and are skipped when they reach the top
+        token = next(self._seq)
+        now = self.clock()
+        events = [(departure * 60 - minutes * 60, next(self._seq), flight_id, token, kind)
+                  for kind, minutes, _ in self.announcements]
+        events = [event for event in events if event[0] > now - GRACE_SECONDS]
+        if not events:
+            return False
+
+        self.flights[flight_id] = (flight_number, origin, destination, token)
+        self.by_number.setdefault(flight_number, set()).add(flight_id)
+        for event in events:
+            if push:
+                heapq.heappush(self.heap, event)
+            else:
+                self.heap.append(event)
+        return True
+
+    def _remove_flight(self, flight_id):
+        flight = self.flights.pop(flight_id, None)
+        if flight is None:
+            return
+        ids = self.by_number.get(flight[0])
+        if ids is not None:
+            ids.discard(flight_id)
+            if not ids:
+                del self.by_number[flight[0]]
+        self.stale += len(self.announcements)
+
+    def refresh_flight_number(self, conn, flight_number):
+        """Reschedule every flight with this number after an add/update/delete."""
+        rows = conn.execute('''
+            SELECT id, flight_number, origin, destination, departure_time
+            FROM flights
+            WHERE flight_number = ?
+        ''', (flight_number,)).fetchall()
+        with self._wakeup:
+            for flight_id in list(self.by_number.get(flight_number, ())):
+                self._remove_flight(flight_id)
+            for row in rows:
+                self._add_flight(row)
+            if self.stale > len(self.heap) // 2:
+                self._compact()
+            self._wakeup.notify()
+
+    def _is_current(self, event):
+        flight = self.flights.get(event[2])
+        return flight is not None and flight[3] == event[3]
+
+    def _compact(self):
+        self.heap = [event for event in self.heap if self._is_current(event)]
+        heapq.heapify(self.heap)
+        self.stale = 0
+
+    def upcoming(self, limit=10):
+        """The next `limit` announcements as (due seconds, flight_number, kind)."""
+        with self._wakeup:
+            events = heapq.nsmallest(limit + self.stale, self.heap)
+            return [(due, self.flights[flight_id][0], kind)
+                    for due, _, flight_id, token, kind in events
+                    if self._is_current((due, None, flight_id, token))][:limit]
+
+    # -------------------------------
+    # Scheduler thread
+    # -------------------------------
+    def _next_due(self):
+        """Pop the next announcement if it is due, else return the seconds to wait."""
+        while self.heap:
+            event = self.heap[0]
+            if not self._is_current(event):
+                heapq.heappop(self.heap)
+                self.stale = max(self.stale - 1, 0)
+                continue
+            delay = event[0] - self.clock()
+            if delay > 0:
+                return None, delay
+            heapq.heappop(self.heap)
+            if delay < -GRACE_SECONDS:
+                continue
+            return event, 0
+        return None, None
+
+    def _text(self, event):
+        flight_number, origin, destination, _ = self.flights[event[2]]
+        for kind, _, template in self.announcements:
+            if kind == event[4]:
+                return template.format(flight_number=flight_number, origin=origin,
+                                       destination=destination), flight_number, origin
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                if not self._running:
+                    return
+                event, delay = self._next_due()
+                if event is None:
+                    # Sleep until the next announcement or until the heap changes
+                    self._wakeup.wait(None if delay is None else delay / self.speed)
+                    continue
+                text, flight_number, origin = self._text(event)
+                self.fired += 1
+            self.announce(text, kind=event[4], flight_number=flight_number, origin=origin)
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="announcements", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._wakeup:
+            self._running = False
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+
+# -------------------------------
+# Shared scheduler for the app
+# -------------------------------
+_scheduler = None
+
+
+def start_scheduler(announce, db_path=DB_PATH):
+    """Load upcoming announcements and start the shared scheduler thread."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = AnnouncementScheduler(announce)
+        conn = sqlite3.connect(db_path)
+        _scheduler.load(conn)
+        conn.close()
+        _scheduler.start()
+    return _scheduler
+
+
+@flight_events.subscribe
+def flight_changed(conn, flight_number):
+    """Hook for add/update/delete: reschedule this flight's announcements."""
+    if _scheduler is not None:
+        _scheduler.refresh_flight_number(conn, flight_number)
+
+
+# -------------------------------
+# Demo with a fast clock
+# -------------------------------
+if __name__ == "__main__":
+    import time
+
+    from flight_times import from_minutes
+
+    # One simulated minute per 50 ms of real time
+    speed = 1200
+    started = time.monotonic()
+    base = now_seconds()
+
+    def clock():
+        return base + (time.monotonic() - started) * speed
+
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE flights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flight_number VARCHAR NOT NULL,
+            origin VARCHAR NOT NULL,
+            destination VARCHAR NOT NULL,
+            departure_time VARCHAR NOT NULL,
+            arrival_time VARCHAR NOT NULL
+        )
+    ''')
+    minute = int(base // 60)
+    for number, offset in (("AX1", 45), ("AX2", 50), ("AX3", 70)):
+        conn.execute('''
+            INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+            VALUES (?, 'Lagos', 'Abuja', ?, ?)
+        ''', (number, from_minutes(minute + offset), from_minutes(minute + offset + 60)))
+    conn.commit()
+
+    def announce(text, **details):
+        print(f"[T+{(clock() - base) / 60:5.1f} min] {text}")
+
+    scheduler = AnnouncementScheduler(announce, clock=clock, speed=speed)
+    scheduler.load(conn)
+    scheduler.start()
+
+    # AX2 is delayed by 30 minutes after 3 simulated minutes
+    time.sleep(3 * 60 / speed)
+    conn.execute("UPDATE flights SET departure_time = ? WHERE flight_number = 'AX2'",
+                 (from_minutes(minute + 80),))
+    conn.commit()
+    scheduler.refresh_flight_number(conn, "AX2")
+
+    time.sleep(80 * 60 / speed)
+    scheduler.stop()
+    print(f"{scheduler.fired} announcements fired")
@@ -0,0 +1,229 @@
+# ----------------------------------------
+# Airline Management System - Coalesced Announcements
+# ----------------------------------------
+# Every add/update/delete used to call text_to_speech itself, so a bulk
+# change turned into a long, blocking queue of separate synthesis
+# requests. Announcements now go through one Announcer:
+#
+# - announce() only queues the announcement and returns
+# - a background thread collects everything that arrives within
+#   COALESCE_SECONDS of the first announcement and speaks it as one
+#   utterance
+# - repeated announcements for the same flight are de-duplicated
+#   (the latest one wins)
+# - several flights from the same origin with the same change are
+#   summarised ("12 flights from Lagos have been updated.")
+# - at most MAX_PER_MINUTE utterances with flight changes (added,
+#   updated, deleted) are synthesised per minute; changes arriving while
+#   the limit is reached are merged into the next one. Other
+#   announcements (a flight looked up at the counter, boarding calls)
+#   are not held back by the limit
+#
+# stats() reports how many announcements were merged away.
+#
+#   python announcer.py   # bulk-update demo that prints instead of speaking
+# ----------------------------------------
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+# Window in which announcements are merged (seconds)
+COALESCE_SECONDS = 1.0
+
+# Upper bound on synthesis calls per minute
+MAX_PER_MINUTE = 6
+
+# Changes that can be summarised per origin, and how they are phrased
+SUMMARY_KINDS = {"added": "added", "updated": "updated", "deleted": "deleted"}
+
+# Smallest group that is summarised instead of read out flight by flight
+SUMMARY_MIN = 3
+
+
+def compose(batch):
+    """
+    Merge a batch of (text, kind, flight_number, origin) announcements
+    into the text of one utterance.
+    """
+    # De-duplicate by flight: a later change to the same flight replaces
+    # the earlier one, but e.g. a final call and an update both stay.
+    latest = {}
+    for index, (text, kind, flight_number, origin) in enumerate(batch):
+        if flight_number is None:
+            key = ("text", index)
+        else:
+            key = (flight_number, "change" if kind in SUMMARY_KINDS else kind)
+        latest.pop(key, None)
+        latest[key] = (text, kind, flight_number, origin)
+    events = list(latest.values())
+
+    groups = {}
+    for event in events:
+        text, kind, _, origin = event
+        if kind in SUMMARY_KINDS and origin:
+            groups.setdefault((kind, origin), []).append(event)
+
+    parts = []
+    summarised = set()
+    for event in events:
+        text, kind, _, origin = event
+        group = groups.get((kind, origin))
+        if group is None or len(group) < SUMMARY_MIN:
+            parts.append(text)
+        elif (kind, origin) not in summarised:
+            summarised.add((kind, origin))
+            parts.append(f"{len(group)} flights from {origin} have been {SUMMARY_KINDS[kind]}.")
+
+    return " ".join(parts)
+
+
+class Announcer:
+    """Background speaker that coalesces announcements."""
+
+    def __init__(self, speak, window=COALESCE_SECONDS, max_per_minute=MAX_PER_MINUTE):
+        self.speak = speak                  # speak(text), blocking, called from the thread
+        self.window = window
+        self.max_per_minute = max_per_minute
+        self.queue = queue.Queue()
+        self.spoken_at = deque()            # times of the recent synthesis calls
+
+        self.received = 0
+        self.utterances = 0
+        self.merged = 0
+        self.thread = threading.Thread(target=self._run, name="announcer", daemon=True)
+        self.thread.start()
+
+    def announce(self, text, kind=None, flight_number=None, origin=None):
+        """
+        Queue one announcement. kind is 'added', 'updated' or 'deleted'
+        for flight changes (these can be summarised per origin), or any
+        other label; flight_number enables de-duplication.
+        """
+        self.received += 1
+        self.queue.put((text, kind, flight_number, origin))
+
+    def flush(self, timeout=30):
+        """Block until everything queued so far has been spoken."""
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join(30)
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "utterances": self.utterances,
+            "merged": self.merged,
+        }
+
+    def _collect(self, batch, waiters, deadline, until_other=False):
+        """
+        Add queued announcements to batch until the deadline (with
+        until_other: or until one that is not a flight change). False on close.
+        """
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return True
+            try:
+                item = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                return True
+            if item is None:
+                return False
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+                # A flush stops waiting for more announcements
+                return True
+            batch.append(item)
+            if until_other and item[1] not in SUMMARY_KINDS:
+                return True
+
+    def _run(self):
+        running = True
+        held = []   # flight changes waiting for a slot under the rate limit
+        while running:
+            batch = []
+            waiters = []
+            if held:
+                # Keep merging changes until a slot frees up; anything else
+                # ends the wait and is spoken on its own
+                running = self._collect(batch, waiters, self.spoken_at[0] + 60, until_other=True)
+                if running and batch and not waiters:
+                    running = self._collect(batch, waiters, time.monotonic() + self.window)
+            else:
+                item = self.queue.get()
+                if item is None:
+                    break
+                if isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                    running = self._collect(batch, waiters, time.monotonic() + self.window)
+
+            now = time.monotonic()
+            while self.spoken_at and now - self.spoken_at[0] >= 60:
+                self.spoken_at.popleft()
+            batch = held + batch
+            held = []
+            if running and not waiters and len(self.spoken_at) >= self.max_per_minute:
+                # Over the rate limit: only flight changes wait
+                held = [event for event in batch if event[1] in SUMMARY_KINDS]
+                batch = [event for event in batch if event[1] not in SUMMARY_KINDS]
+
+            if batch:
+                text = compose(batch)
+                # Every announcement beyond the first saved a synthesis call
+                self.merged += len(batch) - 1
+                self.utterances += 1
+                if any(event[1] in SUMMARY_KINDS for event in batch):
+                    self.spoken_at.append(time.monotonic())
+                try:
+                    self.speak(text)
+                except Exception:
+                    logging.getLogger(__name__).exception("Announcement failed: %s", text)
+            for waiter in waiters:
+                waiter.set()
+
+
+# -------------------------------
+# Demo: a scripted bulk update
+# -------------------------------
+if __name__ == "__main__":
+    def speak(text):
+        print(f"speaking: {text}")
+        time.sleep(1)  # roughly one synthesis + playback
+
+    announcer = Announcer(speak, window=0.5)
+    for i in range(12):
+        announcer.announce(f"Flight LA{i} has been successfully updated.",
+                           kind="updated", flight_number=f"LA{i}", origin="Lagos")
+    for _ in range(3):
+        announcer.announce("Flight AB7 has been successfully updated.",
+                           kind="updated", flight_number="AB7", origin="Abuja")
+    announcer.announce("Flight AB9 has been successfully deleted.",
+                       kind="deleted", flight_number="AB9", origin="Abuja")
+    announcer.flush()
+    print(announcer.stats())
+    announcer.close()
+
+    # Over the limit, changes wait for a slot but a lookup is spoken at once
+    started = time.monotonic()
+    announcer = Announcer(lambda text: print(f"{time.monotonic() - started:4.1f} s speaking: {text}"),
+                          window=0.2, max_per_minute=1)
+    announcer.announce("Flight LA1 has been successfully updated.",
+                       kind="updated", flight_number="LA1", origin="Lagos")
+    time.sleep(0.5)
+    announcer.announce("Flight LA2 has been successfully updated.",
+                       kind="updated", flight_number="LA2", origin="Lagos")
+    announcer.announce("Flight AB7 departs Abuja at 14:00.", kind="info", flight_number="AB7")
+    time.sleep(1)
+    announcer.flush()
+    announcer.close()
@@ -0,0 +1,262 @@
+# ----------------------------------------
+# Airline Management System - Flight Archive
+# ----------------------------------------
+# Keeps the hot tables small: flights that departed more than
+# RETENTION_DAYS ago are moved, together with their bookings, into
+# airline_archive.db.
+#
+# - The archive is ATTACHed to the main connection, so each batch of
+#   flights is copied and deleted in one transaction
+# - Batches are BATCH_SIZE flights, so other terminals are never locked
+#   out for long; copies use INSERT OR REPLACE, so re-running after an
+#   interruption is safe
+# - Waitlist entries and capacity rows of archived flights are dropped
+#   (nobody can board a departed flight); their crew_roster rows move
+#   with them, so crew_roster.py still sees those duties for the rest
+#   rule and the attendant's history (archived_duties())
+# - open_with_archive() returns a connection with the archive attached
+#   and TEMP views all_flights / all_bookings over hot + archived rows,
+#   for historical lookups
+#
+#   python archive.py --days 90             # archive flights older than 90 days
+#   python archive.py --dry-run
+#   python archive.py history BA123         # look a flight up in both
+# ----------------------------------------
+
+import os
+import sqlite3
+
+import flight_events
+from flight_times import to_minutes, now_minutes, from_minutes
+
+DB_PATH = 'airline_management.db'
+ARCHIVE_PATH = 'airline_archive.db'
+
+# Flights that departed more than this many days ago are archived
+RETENTION_DAYS = 90
+
+# Flights moved per transaction
+BATCH_SIZE = 500
+
+
+def attach_archive(conn, archive_path=ARCHIVE_PATH):
+    """Attach the archive database as `archive` and create its tables."""
+    attached = [row[1] for row in conn.execute("PRAGMA database_list")]
+    if "archive" not in attached:
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+    # Same columns as the hot tables; ids are kept, so no AUTOINCREMENT
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS archive.flights (
+            id INTEGER PRIMARY KEY,
+            flight_number VARCHAR NOT NULL,
+            origin VARCHAR NOT NULL,
+            destination VARCHAR NOT NULL,
+            departure_time VARCHAR NOT NULL,
+            arrival_time VARCHAR NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS archive.bookings (
+            id INTEGER PRIMARY KEY,
+            passenger_id INTEGER NOT NULL,
+            flight_id INTEGER NOT NULL,
+            seat_number TEXT
+        );
+        CREATE TABLE IF NOT EXISTS archive.crew_roster (
+            id INTEGER PRIMARY KEY,
+            flight_id INTEGER NOT NULL,
+            attendant_id INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS archive.idx_archive_flight_number ON flights (flight_number);
+        CREATE INDEX IF NOT EXISTS archive.idx_archive_bookings_flight ON bookings (flight_id, passenger_id);
+        CREATE INDEX IF NOT EXISTS archive.idx_archive_bookings_passenger ON bookings (passenger_id);
+        CREATE INDEX IF NOT EXISTS archive.idx_archive_crew_attendant ON crew_roster (attendant_id, flight_id);
+    ''')
+
+
+def open_with_archive(db_path=DB_PATH, archive_path=ARCHIVE_PATH):
+    """
+    Connection to db_path with the archive attached and TEMP views
+    all_flights / all_bookings covering hot and archived rows.
+    """
+    conn = sqlite3.connect(db_path)
+    attach_archive(conn, archive_path)
+    conn.executescript('''
+        CREATE TEMP VIEW IF NOT EXISTS all_flights AS
+            SELECT id, flight_number, origin, destination, departure_time, arrival_time,
+                   0 AS archived
+            FROM main.flights
+            UNION ALL
+            SELECT id, flight_number, origin, destination, departure_time, arrival_time,
+                   1 AS archived
+            FROM archive.flights;
+
+        CREATE TEMP VIEW IF NOT EXISTS all_bookings AS
+            SELECT id, passenger_id, flight_id, seat_number, 0 AS archived FROM main.bookings
+            UNION ALL
+            SELECT id, passenger_id, flight_id, seat_number, 1 AS archived FROM archive.bookings;
+    ''')
+    return conn
+
+
+def departed_before(conn, cutoff):
+    """Ids and numbers of hot flights departing before cutoff (minutes since the epoch)."""
+    old = []
+    for flight_id, flight_number, departure_time in conn.execute('''
+        SELECT id, flight_number, departure_time FROM main.flights
+    '''):
+        # Times are free text, so the cut-off is applied after parsing
+        departure = to_minutes(departure_time)
+        if departure is not None and departure < cutoff:
+            old.append((flight_id, flight_number))
+    return old
+
+
+def _move_batch(conn, flight_ids):
+    placeholders = ",".join("?" * len(flight_ids))
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(f'''
+            INSERT OR REPLACE INTO archive.flights
+            SELECT id, flight_number, origin, destination, departure_time, arrival_time
+            FROM main.flights WHERE id IN ({placeholders})
+        ''', flight_ids)
+        bookings = conn.execute(f'''
+            INSERT OR REPLACE INTO archive.bookings
+            SELECT id, passenger_id, flight_id, seat_number
+            FROM main.bookings WHERE flight_id IN ({placeholders})
+        ''', flight_ids).rowcount
+        conn.execute(f"DELETE FROM main.bookings WHERE flight_id IN ({placeholders})", flight_ids)
+        if conn.execute("SELECT 1 FROM main.sqlite_master WHERE name = 'crew_roster'").fetchone():
+            conn.execute(f'''
+                INSERT OR REPLACE INTO archive.crew_roster
+                SELECT id, flight_id, attendant_id
+                FROM main.crew_roster WHERE flight_id IN ({placeholders})
+            ''', flight_ids)
+        for table in ("waitlist", "flight_capacity", "crew_roster"):
+            if conn.execute("SELECT 1 FROM main.sqlite_master WHERE name = ?", (table,)).fetchone():
+                conn.execute(f"DELETE FROM main.{table} WHERE flight_id IN ({placeholders})",
+                             flight_ids)
+        conn.execute(f"DELETE FROM main.flights WHERE id IN ({placeholders})", flight_ids)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return bookings
+
+
+def archive_departed(db_path=DB_PATH, archive_path=ARCHIVE_PATH, days=RETENTION_DAYS,
+                     batch_size=BATCH_SIZE, dry_run=False):
+    """
+    Move flights that departed more than `days` ago, and their bookings,
+    into the archive. Returns {'flights': n, 'bookings': n, 'batches': n}.
+    """
+    # Autocommit, so each batch is exactly one explicit transaction
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    attach_archive(conn, archive_path)
+    old = departed_before(conn, now_minutes() - days * 24 * 60)
+
+    result = {"flights": len(old), "bookings": 0, "batches": 0}
+    if dry_run:
+        conn.close()
+        return result
+
+    for start in range(0, len(old), batch_size):
+        batch = old[start:start + batch_size]
+        result["bookings"] += _move_batch(conn, [flight_id for flight_id, _ in batch])
+        result["batches"] += 1
+
+    # In-memory caches, route graph and announcements drop the flights
+    for flight_number in sorted({flight_number for _, flight_number in old}):
+        flight_events.flight_changed(conn, flight_number)
+    conn.close()
+    return result
+
+
+# -------------------------------
+# Historical lookups
+# -------------------------------
+def flight_history(conn, flight_number):
+    """Every flight with this number, hot and archived, newest id first."""
+    return conn.execute('''
+        SELECT id, flight_number, origin, destination, departure_time, arrival_time, archived
+        FROM all_flights
+        WHERE flight_number = ?
+        ORDER BY id DESC
+    ''', (flight_number,)).fetchall()
+
+
+def find_archived_flight(flight_number, db_path=DB_PATH, archive_path=ARCHIVE_PATH):
+    """Most recent archived flight with this number, or None (no archive yet: None)."""
+    if not os.path.exists(archive_path):
+        return None
+    conn = open_with_archive(db_path, archive_path)
+    row = conn.execute('''
+        SELECT id, flight_number, origin, destination, departure_time, arrival_time
+        FROM archive.flights
+        WHERE flight_number = ?
+        ORDER BY id DESC
+        LIMIT 1
+    ''', (flight_number,)).fetchone()
+    conn.close()
+    return row
+
+
+def archived_duties(attendant_id=None, archive_path=ARCHIVE_PATH):
+    """
+    (attendant_id, flight_id, flight_number, origin, destination,
+    departure_time, arrival_time) of archived crew duties, of one
+    attendant or of all ([] without an archive).
+    """
+    if not os.path.exists(archive_path):
+        return []
+    conn = sqlite3.connect(archive_path)
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'crew_roster'").fetchone():
+            return []
+        return conn.execute(f'''
+            SELECT r.attendant_id, f.id, f.flight_number, f.origin, f.destination,
+                   f.departure_time, f.arrival_time
+            FROM crew_roster r JOIN flights f ON f.id = r.flight_id
+            {"WHERE r.attendant_id = ?" if attendant_id is not None else ""}
+        ''', () if attendant_id is None else (attendant_id,)).fetchall()
+    finally:
+        conn.close()
+
+
+def passenger_history(conn, passenger_id):
+    """(flight_number, origin, destination, departure, seat, archived) for every booking."""
+    return conn.execute('''
+        SELECT f.flight_number, f.origin, f.destination, f.departure_time, b.seat_number, b.archived
+        FROM all_bookings b
+        JOIN all_flights f ON f.id = b.flight_id
+        WHERE b.passenger_id = ?
+        ORDER BY f.id
+    ''', (passenger_id,)).fetchall()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive departed flights and their bookings.")
+    parser.add_argument("command", nargs="?", default="archive", choices=["archive", "history"])
+    parser.add_argument("flight_number", nargs="?")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--archive", default=ARCHIVE_PATH)
+    parser.add_argument("--days", type=int, default=RETENTION_DAYS)
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "history":
+        if not args.flight_number:
+            parser.error("history needs a flight number")
+        conn = open_with_archive(args.db, args.archive)
+        for row in flight_history(conn, args.flight_number):
+            print(f"#{row[0]} {row[1]} {row[2]} -> {row[3]} {row[4]} - {row[5]}"
+                  f"{' (archived)' if row[6] else ''}")
+        conn.close()
+    else:
+        cutoff = from_minutes(now_minutes() - args.days * 24 * 60)
+        result = archive_departed(args.db, args.archive, args.days, args.batch, args.dry_run)
+        verb = "would move" if args.dry_run else "moved"
+        print(f"Departed before {cutoff}: {verb} {result['flights']} flights"
+              f"{'' if args.dry_run else ' and %d bookings in %d batches' % (result['bookings'], result['batches'])}")
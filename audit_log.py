@@ -0,0 +1,372 @@
+# ----------------------------------------
+# Airline Management System - Audit Journal
+# ----------------------------------------
+# Append-only history of every mutation: who did it, what changed,
+# and the row before/after, stored in audit_log.db.
+#
+# - record() only puts the entry on a queue, so the GUI is not slowed
+#   down by a disk write per action
+# - A background writer group-commits the queue every FLUSH_MS
+#   milliseconds or every BATCH_SIZE records, whichever comes first
+# - Triggers reject UPDATE and DELETE on the journal table
+# - A failed commit (database locked, disk full, ...) is logged and
+#   retried with a growing delay; the batch is kept, never dropped
+#   while the writer runs. flush() and close() return False while
+#   records are not committed
+#
+# Querying and replaying the journal from the command line:
+#   python audit_log.py query --table flights --key BA123
+#   python audit_log.py replay --table flights --key BA123 --at "2025-01-01 12:00"
+#   python audit_log.py bench
+# ----------------------------------------
+
+import atexit
+import getpass
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+JOURNAL_PATH = 'audit_log.db'
+
+# Group-commit window (milliseconds) and maximum records per commit
+FLUSH_MS = 50
+BATCH_SIZE = 256
+
+# Delay before retrying a failed commit, doubled up to RETRY_MAX_SECONDS
+RETRY_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30
+
+# Attempts to commit what is left when the writer is closed
+CLOSE_ATTEMPTS = 3
+
+_log = logging.getLogger(__name__)
+
+# Marks a retry wake-up in the writer (nothing was queued)
+_RETRY = object()
+
+_actor = os.environ.get("AIRLINE_USER") or getpass.getuser()
+
+
+def set_actor(actor):
+    """Record subsequent entries under this user (e.g. the login email)."""
+    global _actor
+    _actor = actor
+
+
+def setup_journal(conn):
+    """Create the append-only journal table, its indexes and guards."""
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS journal (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            ts REAL NOT NULL,
+            actor TEXT NOT NULL,
+            action TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            before TEXT,
+            after TEXT
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_journal_row ON journal (table_name, row_key, seq);
+        CREATE INDEX IF NOT EXISTS idx_journal_ts ON journal (ts);
+
+        CREATE TRIGGER IF NOT EXISTS journal_no_update BEFORE UPDATE ON journal BEGIN
+            SELECT RAISE(ABORT, 'journal is append-only');
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS journal_no_delete BEFORE DELETE ON journal BEGIN
+            SELECT RAISE(ABORT, 'journal is append-only');
+        END;
+    ''')
+    conn.commit()
+
+
+def rows_as_dicts(conn, sql, params=()):
+    """Run a SELECT and return its rows as dicts (for before/after images)."""
+    cursor = conn.execute(sql, params)
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+class JournalWriter:
+    """Background writer that batches journal entries into group commits."""
+
+    def __init__(self, path=JOURNAL_PATH, flush_ms=FLUSH_MS, batch_size=BATCH_SIZE):
+        self.path = path
+        self.flush_ms = flush_ms
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.records = 0
+        self.commits = 0
+        self.error = None   # last failed commit, None once writes succeed again
+        self.thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self.thread.start()
+
+    def append(self, action, table_name, row_key, before=None, after=None, actor=None):
+        """Queue one journal entry. Returns immediately."""
+        self.queue.put((
+            time.time(), actor or _actor, action, table_name, str(row_key),
+            None if before is None else json.dumps(before, default=str),
+            None if after is None else json.dumps(after, default=str),
+        ))
+
+    def _report_dead(self):
+        _log.error("Audit journal writer is not running; %d queued records were not written",
+                   self.queue.qsize())
+
+    def flush(self, timeout=5):
+        """
+        Block until everything queued so far has been committed. Returns
+        False if that did not happen (writer failing, stopped or too slow).
+        """
+        if not self.thread.is_alive():
+            self._report_dead()
+            return False
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout) and self.error is None
+
+    def close(self):
+        """Commit what is left and stop the writer thread. False if records were lost."""
+        if not self.thread.is_alive():
+            if not self.queue.empty():
+                self._report_dead()
+            return self.queue.empty() and self.error is None
+        self.queue.put(None)
+        self.thread.join(5)
+        if self.thread.is_alive():
+            _log.error("Audit journal writer did not finish in time")
+            return False
+        return self.error is None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        setup_journal(conn)
+        return conn
+
+    def _run(self):
+        try:
+            self._write_loop()
+        except Exception:
+            _log.exception("Audit journal writer stopped")
+            raise
+
+    def _write_loop(self):
+        conn = None
+        pending = []   # batch kept after a failed commit
+        delay = RETRY_SECONDS
+        close_attempts = CLOSE_ATTEMPTS
+        running = True
+        while running or pending:
+            batch, pending = pending, []
+            waiters = []
+            if running:
+                # With a failed batch waiting, wake up to retry after delay
+                try:
+                    item = self.queue.get(timeout=delay if batch else None)
+                except queue.Empty:
+                    item = _RETRY
+                deadline = time.monotonic() + self.flush_ms / 1000
+
+                # Collect until the window closes or the batch is full
+                while item is not _RETRY:
+                    if item is None:
+                        running = False
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        batch.append(item)
+                    if not running or len(batch) >= self.batch_size:
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 and not waiters:
+                        break
+                    try:
+                        item = self.queue.get(timeout=max(remaining, 0))
+                    except queue.Empty:
+                        break
+
+            if batch:
+                try:
+                    if conn is None:
+                        conn = self._connect()
+                    conn.executemany('''
+                        INSERT INTO journal (ts, actor, action, table_name, row_key, before, after)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ''', batch)
+                    conn.commit()
+                except sqlite3.Error as e:
+                    self.error = e
+                    pending = batch
+                    if conn is not None:
+                        try:
+                            conn.rollback()
+                        except sqlite3.Error:
+                            conn.close()
+                            conn = None
+                    if running:
+                        _log.warning("Audit journal commit failed (%s); keeping %d records, "
+                                     "retrying in %.1f s", e, len(batch), delay)
+                        delay = min(delay * 2, RETRY_MAX_SECONDS)
+                    else:
+                        close_attempts -= 1
+                        if close_attempts <= 0:
+                            _log.error("Audit journal commit failed (%s); %d records lost at close",
+                                       e, len(batch))
+                            pending = []
+                        else:
+                            time.sleep(delay)
+                else:
+                    if self.error is not None:
+                        _log.warning("Audit journal commits resumed")
+                    self.error = None
+                    delay = RETRY_SECONDS
+                    self.records += len(batch)
+                    self.commits += 1
+            for waiter in waiters:
+                waiter.set()
+
+        if conn is not None:
+            conn.close()
+
+
+# -------------------------------
+# Shared writer for the app
+# -------------------------------
+_writer = None
+
+
+def get_writer():
+    """Start the shared journal writer on first use."""
+    global _writer
+    if _writer is None:
+        _writer = JournalWriter()
+        atexit.register(_writer.close)
+    return _writer
+
+
+def record(action, table_name, row_key, before=None, after=None):
+    """Journal one mutation (action is 'insert', 'update' or 'delete')."""
+    get_writer().append(action, table_name, row_key, before, after)
+
+
+# -------------------------------
+# Query and replay
+# -------------------------------
+def _to_ts(text):
+    return datetime.fromisoformat(text).timestamp() if text else None
+
+
+def query(conn, table_name=None, row_key=None, actor=None, since=None, until=None, limit=100):
+    """Journal entries matching the filters, oldest first."""
+    conditions = []
+    params = []
+    for column, value in (("table_name", table_name), ("row_key", row_key), ("actor", actor)):
+        if value is not None:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    if since is not None:
+        conditions.append("ts >= ?")
+        params.append(since)
+    if until is not None:
+        conditions.append("ts <= ?")
+        params.append(until)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(limit)
+    return conn.execute(f'''
+        SELECT seq, ts, actor, action, table_name, row_key, before, after
+        FROM journal
+        {where}
+        ORDER BY seq
+        LIMIT ?
+    ''', params).fetchall()
+
+
+def replay(conn, table_name, row_key, at=None):
+    """
+    Rebuild the state of a row as of `at` (a timestamp) from its journal
+    entries. Returns the last 'after' image, or None if it was deleted.
+    """
+    params = [table_name, row_key]
+    condition = ""
+    if at is not None:
+        condition = "AND ts <= ?"
+        params.append(at)
+    row = conn.execute(f'''
+        SELECT action, after FROM journal
+        WHERE table_name = ? AND row_key = ? {condition}
+        ORDER BY seq DESC
+        LIMIT 1
+    ''', params).fetchone()
+    if row is None or row[0] == "delete":
+        return None
+    return json.loads(row[1]) if row[1] else None
+
+
+def _print_entry(entry):
+    seq, ts, actor, action, table_name, row_key, before, after = entry
+    stamp = datetime.fromtimestamp(ts).isoformat(sep=" ", timespec="seconds")
+    print(f"#{seq} {stamp} {actor} {action} {table_name}[{row_key}]")
+    if before:
+        print(f"    before: {before}")
+    if after:
+        print(f"    after:  {after}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query and replay the audit journal.")
+    parser.add_argument("command", choices=["query", "replay", "bench"])
+    parser.add_argument("--db", default=JOURNAL_PATH)
+    parser.add_argument("--table")
+    parser.add_argument("--key")
+    parser.add_argument("--actor")
+    parser.add_argument("--since", help="YYYY-MM-DD HH:MM")
+    parser.add_argument("--until", help="YYYY-MM-DD HH:MM")
+    parser.add_argument("--at", help="replay state as of YYYY-MM-DD HH:MM")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        import tempfile
+
+        path = os.path.join(tempfile.mkdtemp(), "bench_audit.db")
+        count = 20_000
+        writer = JournalWriter(path)
+        start = time.perf_counter()
+        for i in range(count):
+            writer.append("update", "flights", f"FL{i % 500}",
+                          {"origin": "LOS"}, {"origin": "ABV"}, actor="bench")
+        queued = time.perf_counter() - start
+        writer.flush(60)
+        total = time.perf_counter() - start
+        writer.close()
+        print(f"{count} records: {queued / count * 1e6:.1f} us per record on the caller, "
+              f"{count / total:.0f} records/s committed, "
+              f"{writer.commits} commits ({writer.records / max(writer.commits, 1):.0f} records each)")
+
+        conn = sqlite3.connect(path)
+        start = time.perf_counter()
+        state = replay(conn, "flights", "FL42")
+        print(f"replay of one row: {(time.perf_counter() - start) * 1000:.2f} ms -> {state}")
+        conn.close()
+    else:
+        conn = sqlite3.connect(args.db)
+        setup_journal(conn)
+        if args.command == "query":
+            for entry in query(conn, args.table, args.key, args.actor,
+                               _to_ts(args.since), _to_ts(args.until), args.limit):
+                _print_entry(entry)
+        else:
+            if not args.table or not args.key:
+                parser.error("replay needs --table and --key")
+            print(json.dumps(replay(conn, args.table, args.key, _to_ts(args.at)), indent=2))
+        conn.close()
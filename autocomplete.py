@@ -0,0 +1,380 @@
+# ----------------------------------------
+# Airline Management System - Type-ahead Suggestions
+# ----------------------------------------
+# Suggests flight numbers and airports while an agent types, so a typo
+# shows up before "No flight found".
+#
+# - PrefixIndex keeps the values in a sorted list; completing a prefix
+#   is a bisect plus a short slice, with no SQLite query per keystroke
+# - FlightSuggestions holds one index of flight numbers and one of
+#   origins/destinations, loaded once and patched through flight_events
+#   when this process adds, updates or deletes a flight
+# - Changes committed by other connections are picked up through
+#   PRAGMA data_version, checked at most every VERSION_CHECK_SECONDS;
+#   when it moved, the flights records of the change feed
+#   (change_feed.py) say which flight numbers to re-read. The full
+#   load() is only repeated if the feed was pruned past our position
+# - Autocomplete attaches a dropdown list to an existing Entry and
+#   refreshes it DEBOUNCE_MS after typing pauses
+#
+#   python autocomplete.py 100000    # suggestion latency on 100k flights
+# ----------------------------------------
+
+import sqlite3
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from tkinter import Listbox, END
+
+import change_feed
+import flight_events
+
+DB_PATH = 'airline_management.db'
+
+# Suggestions shown under an entry
+MAX_SUGGESTIONS = 8
+
+# Pause in typing before the suggestions are refreshed (milliseconds)
+DEBOUNCE_MS = 120
+
+# Minimum interval between checks for other instances' changes
+VERSION_CHECK_SECONDS = 5
+
+
+class PrefixIndex:
+    """Sorted, case-insensitive set of strings with prefix completion."""
+
+    def __init__(self):
+        self.keys = []     # sorted casefolded values
+        self.values = {}   # casefolded value -> [value as first seen, reference count]
+
+    def load(self, values):
+        """Replace the contents with values (duplicates are counted)."""
+        counts = Counter(value for value in values if value)
+        self.values = {}
+        for value, count in counts.items():
+            entry = self.values.setdefault(value.casefold(), [value, 0])
+            entry[1] += count
+        self.keys = sorted(self.values)
+
+    def add(self, value):
+        if not value:
+            return
+        key = value.casefold()
+        entry = self.values.get(key)
+        if entry is None:
+            self.values[key] = [value, 1]
+            insort(self.keys, key)
+        else:
+            entry[1] += 1
+
+    def remove(self, value):
+        """Drop one reference to value; it disappears when none are left."""
+        key = value.casefold() if value else None
+        entry = self.values.get(key)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self.values[key]
+            del self.keys[bisect_left(self.keys, key)]
+
+    def complete(self, prefix, limit=MAX_SUGGESTIONS):
+        """Up to limit values starting with prefix, in sorted order."""
+        key = prefix.strip().casefold()
+        if not key:
+            return []
+        start = bisect_left(self.keys, key)
+        matches = []
+        for candidate in self.keys[start:start + limit]:
+            if not candidate.startswith(key):
+                break
+            matches.append(self.values[candidate][0])
+        return matches
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class FlightSuggestions:
+    """Prefix indexes over flight numbers and origin/destination values."""
+
+    def __init__(self, db_path=DB_PATH):
+        self.conn = sqlite3.connect(db_path)
+        self.numbers = PrefixIndex()
+        self.places = PrefixIndex()
+        self.routes = {}   # flight_number -> [(id, origin, destination), ...]
+        self.number_of = {}   # flight id -> flight_number
+        self.version = None
+        self.seq = 0
+        self.checked = 0.0
+        self.load()
+
+    def load(self):
+        """(Re)build both indexes from the flights table."""
+        self.version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        self.checked = time.monotonic()
+        # Taken first, so flights changed meanwhile are replayed from the feed
+        self.seq = change_feed.last_seq(self.conn)
+        self.routes = {}
+        self.number_of = {}
+        for flight_id, flight_number, origin, destination in self.conn.execute('''
+            SELECT id, flight_number, origin, destination FROM flights
+        '''):
+            self.routes.setdefault(flight_number, []).append((flight_id, origin, destination))
+            self.number_of[flight_id] = flight_number
+        self.numbers.load(number for number, routes in self.routes.items() for _ in routes)
+        self.places.load(place for routes in self.routes.values()
+                         for _, origin, destination in routes for place in (origin, destination))
+
+    def refresh_flight_number(self, conn, flight_number):
+        """Re-read one flight number after it was added, updated or deleted."""
+        for flight_id, origin, destination in self.routes.pop(flight_number, ()):
+            if self.number_of.get(flight_id) == flight_number:
+                del self.number_of[flight_id]
+            self.numbers.remove(flight_number)
+            self.places.remove(origin)
+            self.places.remove(destination)
+        routes = conn.execute('''
+            SELECT id, origin, destination FROM flights WHERE flight_number = ?
+        ''', (flight_number,)).fetchall()
+        if routes:
+            self.routes[flight_number] = routes
+        for flight_id, origin, destination in routes:
+            self.number_of[flight_id] = flight_number
+            self.numbers.add(flight_number)
+            self.places.add(origin)
+            self.places.add(destination)
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self.checked < VERSION_CHECK_SECONDS:
+            return
+        self.checked = now
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.version:
+            return
+        self.version = version
+        flight_ids = set()
+        try:
+            while True:
+                changes = change_feed.read_changes(self.conn, self.seq)
+                if not changes:
+                    break
+                self.seq = changes[-1][0]
+                flight_ids.update(row_id for _, table_name, row_id, _ in changes
+                                  if table_name == "flights")
+        except change_feed.ChangesPruned:
+            self.load()
+            return
+        self._refresh_ids(flight_ids)
+
+    def _refresh_ids(self, flight_ids):
+        """Re-read the flight numbers these rows had before and have now."""
+        numbers = {self.number_of[flight_id] for flight_id in flight_ids
+                   if flight_id in self.number_of}
+        flight_ids = sorted(flight_ids)
+        for start in range(0, len(flight_ids), 500):
+            chunk = flight_ids[start:start + 500]
+            numbers.update(flight_number for flight_number, in self.conn.execute(f'''
+                SELECT flight_number FROM flights WHERE id IN ({",".join("?" * len(chunk))})
+            ''', chunk))
+        for flight_number in numbers:
+            self.refresh_flight_number(self.conn, flight_number)
+
+    # -------------------------------
+    # Completions
+    # -------------------------------
+    def flight_numbers(self, prefix, limit=MAX_SUGGESTIONS):
+        self._check_version()
+        return self.numbers.complete(prefix, limit)
+
+    def places_for(self, prefix, limit=MAX_SUGGESTIONS):
+        self._check_version()
+        return self.places.complete(prefix, limit)
+
+
+# -------------------------------
+# Dropdown for an Entry
+# -------------------------------
+class Autocomplete:
+    """Debounced suggestion list under an Entry placed with .place()."""
+
+    def __init__(self, entry, complete, delay_ms=DEBOUNCE_MS, limit=MAX_SUGGESTIONS):
+        self.entry = entry
+        self.complete = complete
+        self.delay_ms = delay_ms
+        self.limit = limit
+        self.job = None
+        self.listbox = Listbox(entry.master, height=limit, exportselection=False)
+
+        entry.bind("<KeyRelease>", self._schedule, add="+")
+        entry.bind("<Down>", self._focus_list, add="+")
+        entry.bind("<Escape>", self.hide, add="+")
+        entry.bind("<FocusOut>", self._focus_out, add="+")
+        self.listbox.bind("<ButtonRelease-1>", self.choose)
+        self.listbox.bind("<Return>", self.choose)
+        self.listbox.bind("<Escape>", self._back_to_entry)
+
+    def _schedule(self, event=None):
+        if event is not None and event.keysym in ("Down", "Up", "Return", "Escape", "Tab"):
+            return
+        if self.job is not None:
+            self.entry.after_cancel(self.job)
+        self.job = self.entry.after(self.delay_ms, self.refresh)
+
+    def refresh(self):
+        """Show the suggestions for the entry's current text."""
+        self.job = None
+        text = self.entry.get().strip()
+        matches = self.complete(text, self.limit) if text else []
+        if not matches or matches == [text]:
+            self.hide()
+            return
+        self.listbox.delete(0, END)
+        for match in matches:
+            self.listbox.insert(END, match)
+        self.listbox.configure(height=len(matches))
+        self.listbox.place(x=self.entry.winfo_x(),
+                           y=self.entry.winfo_y() + self.entry.winfo_height(),
+                           width=self.entry.winfo_width())
+        self.listbox.lift()
+
+    def choose(self, event=None):
+        """Copy the selected suggestion into the entry."""
+        selection = self.listbox.curselection()
+        if selection:
+            self.entry.delete(0, END)
+            self.entry.insert(0, self.listbox.get(selection[0]))
+        self._back_to_entry()
+
+    def hide(self, event=None):
+        self.listbox.place_forget()
+
+    def _focus_list(self, event=None):
+        if self.listbox.winfo_ismapped():
+            self.listbox.focus_set()
+            self.listbox.selection_clear(0, END)
+            self.listbox.selection_set(0)
+            self.listbox.activate(0)
+
+    def _back_to_entry(self, event=None):
+        self.hide()
+        self.entry.focus_set()
+        self.entry.icursor(END)
+
+    def _focus_out(self, event=None):
+        # Give a click on the list the chance to land first
+        self.entry.after(150, self._hide_unless_list_focused)
+
+    def _hide_unless_list_focused(self):
+        if self.entry.focus_get() is not self.listbox:
+            self.hide()
+
+
+# -------------------------------
+# Shared index for the app
+# -------------------------------
+_suggestions = None
+
+
+def get_suggestions(db_path=DB_PATH):
+    """Return the shared suggestion indexes, loading them on first use."""
+    global _suggestions
+    if _suggestions is None:
+        _suggestions = FlightSuggestions(db_path)
+    return _suggestions
+
+
+@flight_events.subscribe
+def flight_changed(conn, flight_number):
+    """Hook for add/update/delete: patch the indexes if they are loaded."""
+    if _suggestions is not None:
+        _suggestions.refresh_flight_number(conn, flight_number)
+
+
+# -------------------------------
+# Benchmark: suggestion latency
+# -------------------------------
+if __name__ == "__main__":
+    import os
+    import random
+    import sys
+    import tempfile
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    random.seed(5)
+    airports = [f"{a}{b}{c}" for a in "ABCDEFGHKLMNPS" for b in "ABELNORU" for c in "ADKLNOSX"]
+    path = os.path.join(tempfile.mkdtemp(), "autocomplete_bench.db")
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE flights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flight_number VARCHAR NOT NULL,
+            origin VARCHAR NOT NULL,
+            destination VARCHAR NOT NULL,
+            departure_time VARCHAR NOT NULL,
+            arrival_time VARCHAR NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX idx_flights_number ON flights (flight_number)")
+    conn.executemany('''
+        INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+        VALUES (?, ?, ?, ?, ?)
+    ''', ((f"{random.choice(['BA', 'LA', 'AF', 'KQ'])}{i}", random.choice(airports),
+           random.choice(airports), "2025-01-01 08:00", "2025-01-01 09:00") for i in range(count)))
+    conn.commit()
+    change_feed.setup_change_feed(conn)
+
+    start = time.perf_counter()
+    suggestions = FlightSuggestions(path)
+    print(f"{count} flights, {len(suggestions.places)} airports: "
+          f"index built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    prefixes = [f"{random.choice(['BA', 'LA', 'AF', 'KQ'])}{random.randrange(1, 999)}"
+                for _ in range(5000)]
+    samples = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        suggestions.flight_numbers(prefix)
+        suggestions.places_for(prefix[:1])
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    print(f"indexes:  median {samples[len(samples) // 2] * 1000:.3f} ms, "
+          f"p99 {samples[int(len(samples) * 0.99)] * 1000:.3f} ms per keystroke")
+
+    samples = []
+    for prefix in prefixes[:200]:
+        start = time.perf_counter()
+        conn.execute("SELECT DISTINCT flight_number FROM flights WHERE flight_number LIKE ? LIMIT ?",
+                     (prefix + "%", MAX_SUGGESTIONS)).fetchall()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    print(f"LIKE query: median {samples[len(samples) // 2] * 1000:.3f} ms per keystroke")
+
+    # An existing flight number, so the update really changes a row
+    updated = conn.execute("SELECT flight_number FROM flights WHERE id = ?", (count // 2,)).fetchone()[0]
+    start = time.perf_counter()
+    conn.execute("UPDATE flights SET origin = 'ZZZ' WHERE flight_number = ?", (updated,))
+    conn.commit()
+    suggestions.refresh_flight_number(conn, updated)
+    print(f"incremental update: {(time.perf_counter() - start) * 1000:.3f} ms, "
+          f"{updated} from ZZZ, ZZ -> {suggestions.places.complete('ZZ')}")
+    assert suggestions.places.complete("ZZ") == ["ZZZ"]
+
+    # Another instance renumbers a flight and adds one: the next keystroke
+    # catches up from the change feed instead of reloading
+    conn.execute("UPDATE flights SET flight_number = 'QQ1', destination = 'YYY' WHERE flight_number = ?",
+                 (updated,))
+    conn.execute('''
+        INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+        VALUES ('QQ2', 'LOS', 'ABV', '2025-01-01 08:00', '2025-01-01 09:00')
+    ''')
+    conn.commit()
+    suggestions.checked = 0.0
+    start = time.perf_counter()
+    matches = suggestions.flight_numbers("QQ")
+    print(f"keystroke after another instance's commit: {(time.perf_counter() - start) * 1000:.3f} ms, "
+          f"QQ -> {matches}")
+    assert matches == ["QQ1", "QQ2"] and suggestions.flight_numbers(updated) == []
+    assert suggestions.places_for("YY") == ["YYY"]
@@ -0,0 +1,157 @@
+# ----------------------------------------
+# Airline Management System - Online Backups
+# ----------------------------------------
+# Takes consistent snapshots of airline_management.db while agents keep
+# booking, using SQLite's online backup API:
+#
+# - Pages are copied in small steps with a short sleep between them,
+#   so writers are never locked out for more than one step
+# - Each snapshot is written to a temporary file, checked with
+#   PRAGMA integrity_check and only then renamed into place
+# - Snapshots are timestamped and rotated (oldest removed first)
+# - Throughput and the longest stall (slowest single step) are reported
+# - SQLite restarts a stepped backup whenever another connection writes
+#   to the source. After MAX_RESTARTS the remainder is copied in a
+#   single step, so a busy counter cannot starve the backup forever
+#
+# Usage:
+#   python backup.py                      # one snapshot into backups/
+#   python backup.py --every 60 --keep 24 # one snapshot per hour
+# ----------------------------------------
+
+import glob
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+DB_PATH = 'airline_management.db'
+BACKUP_DIR = 'backups'
+
+# Pages copied per step, and pause between steps (seconds)
+PAGES_PER_STEP = 64
+STEP_SLEEP = 0.005
+
+# Number of snapshots kept
+KEEP = 10
+
+# Restarts tolerated before falling back to a single-step copy
+MAX_RESTARTS = 3
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def backup_database(db_path=DB_PATH, backup_dir=BACKUP_DIR, pages=PAGES_PER_STEP,
+                    sleep=STEP_SLEEP, keep=KEEP, max_restarts=MAX_RESTARTS):
+    """
+    Write one verified, timestamped snapshot of db_path into backup_dir.
+    Returns a dict with the snapshot path and timing statistics.
+    Raises sqlite3.DatabaseError if the snapshot fails integrity_check.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(db_path))[0]
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    final_path = os.path.join(backup_dir, f"{name}-{stamp}.db")
+    temp_path = final_path + ".tmp"
+
+    stats = {"steps": 0, "restarts": 0, "longest_step": 0.0, "single_step": False}
+    last = {"remaining": None, "time": time.perf_counter()}
+
+    def progress(status, remaining, total):
+        # Called after each step; the time since the previous call minus
+        # our own sleep is how long that step held the source database.
+        now = time.perf_counter()
+        step = now - last["time"]
+        stats["steps"] += 1
+        stats["longest_step"] = max(stats["longest_step"], step)
+        stats["pages"] = total
+        if last["remaining"] is not None and remaining > last["remaining"]:
+            # The source changed under us and the copy started over
+            stats["restarts"] += 1
+            if stats["restarts"] > max_restarts:
+                raise _TooManyRestarts()
+        last["remaining"] = remaining
+        time.sleep(sleep)
+        last["time"] = time.perf_counter()
+
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(temp_path)
+    start = last["time"] = time.perf_counter()
+    try:
+        try:
+            source.backup(target, pages=pages, progress=progress)
+        except _TooManyRestarts:
+            # Copy everything in one step: the source is only read-locked
+            # for the length of one copy instead of being chased forever.
+            stats["single_step"] = True
+            step_start = time.perf_counter()
+            source.backup(target)
+            stats["longest_step"] = max(stats["longest_step"], time.perf_counter() - step_start)
+        elapsed = time.perf_counter() - start
+
+        result = target.execute("PRAGMA integrity_check").fetchone()[0]
+        if result != "ok":
+            raise sqlite3.DatabaseError(f"Backup failed integrity_check: {result}")
+    except Exception:
+        target.close()
+        source.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    target.close()
+    source.close()
+
+    os.replace(temp_path, final_path)
+    size = os.path.getsize(final_path)
+    removed = rotate_backups(backup_dir, name, keep)
+
+    stats.update({
+        "path": final_path,
+        "bytes": size,
+        "seconds": elapsed,
+        "throughput_mb_s": size / 1e6 / elapsed if elapsed else 0.0,
+        "removed": removed,
+    })
+    return stats
+
+
+def rotate_backups(backup_dir, name, keep=KEEP):
+    """Delete the oldest snapshots so that at most `keep` remain."""
+    snapshots = sorted(glob.glob(os.path.join(backup_dir, f"{name}-*.db")))
+    removed = snapshots[:-keep] if keep > 0 else snapshots
+    for path in removed:
+        os.remove(path)
+    return removed
+
+
+def print_report(stats):
+    print(f"Snapshot:  {stats['path']}")
+    print(f"Size:      {stats['bytes'] / 1e6:.2f} MB ({stats.get('pages', 0)} pages)")
+    print(f"Duration:  {stats['seconds']:.2f} s in {stats['steps']} steps "
+          f"({stats['throughput_mb_s']:.1f} MB/s)")
+    print(f"Longest stall: {stats['longest_step'] * 1000:.1f} ms"
+          f"{', restarted %d time(s)' % stats['restarts'] if stats['restarts'] else ''}"
+          f"{', finished in a single step' if stats['single_step'] else ''}")
+    for path in stats["removed"]:
+        print(f"Rotated out: {path}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Online backup of the airline database.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--dir", default=BACKUP_DIR)
+    parser.add_argument("--pages", type=int, default=PAGES_PER_STEP, help="pages per step")
+    parser.add_argument("--sleep", type=float, default=STEP_SLEEP, help="seconds between steps")
+    parser.add_argument("--keep", type=int, default=KEEP, help="snapshots to keep")
+    parser.add_argument("--every", type=float, help="repeat every N minutes")
+    args = parser.parse_args()
+
+    while True:
+        print_report(backup_database(args.db, args.dir, args.pages, args.sleep, args.keep))
+        if not args.every:
+            break
+        time.sleep(args.every * 60)
@@ -9,12 +9,21 @@
 # 2. passengers - Stores passenger information
 # 3. bookings  - Stores passenger bookings for flights
 #
+# plus the passengers_fts search index and its triggers, the
+# flight_capacity / waitlist tables, the change_counts table used
+# by maintenance.py and the changes feed (change_feed.py).
+#
 # Running this script ensures that the database is ready
 # before launching the main application.
 # ----------------------------------------
 
 import sqlite3
 
+import passenger_search
+import waitlist
+import maintenance
+import change_feed
+
 
 def setup_database():
     """Create the SQLite database with flights, passengers, and bookings tables."""
@@ -22,6 +31,10 @@ def setup_database():
     # Connect to (or create) the database file
     conn = sqlite3.connect('airline_management.db')
     cursor = conn.cursor()
+
+    # Free pages are reclaimed in small slices (see maintenance.py);
+    # only takes effect when the database file is new
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
     
     # ------------------------
     # Create flights table
@@ -36,6 +49,11 @@ def setup_database():
             arrival_time VARCHAR NOT NULL
         )
     ''')
+
+    # Lookups, updates and deletes by flight number (see query_plans.py)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_flights_number ON flights (flight_number)
+    ''')
      
     # ------------------------
     # Create passengers table
@@ -65,6 +83,18 @@ def setup_database():
         )
     ''')
     
+    # Full-text passenger lookup index (see passenger_search.py)
+    passenger_search.setup_passenger_search(conn)
+
+    # Capacity and waitlist tables (see waitlist.py)
+    waitlist.setup_waitlist(conn)
+
+    # Change counters that trigger ANALYZE (see maintenance.py)
+    maintenance.setup_maintenance(conn)
+
+    # Change records for boards, caches and exports (see change_feed.py)
+    change_feed.setup_change_feed(conn)
+
     # Commit changes and close connection
     conn.commit()
     conn.close()
@@ -0,0 +1,368 @@
+# ----------------------------------------
+# Airline Management System - Booking Conflicts
+# ----------------------------------------
+# Stops a passenger from being booked on two flights whose times
+# overlap, and audits the bookings already made.
+#
+# - Each booking is the interval [departure, arrival] of its flight
+# - ConflictIndex keeps, per passenger, the intervals sorted by
+#   departure with a running maximum of the arrivals. A new booking is
+#   checked with one bisect: the intervals after the insertion point
+#   that start before it ends, and the ones before it that are still
+#   in the air when it departs (found by walking back only while the
+#   running maximum allows)
+# - The index is loaded once and kept current from the change feed
+#   (change_feed.py): new and cancelled bookings, and flights whose
+#   times were updated. The feed is only read when PRAGMA data_version
+#   on the index's own connection shows a commit
+# - waitlist.py asks conflicts() under the write lock of the booking
+#   (or promotion) it guards, so no overlapping booking can be
+#   committed between the check and the insert
+# - audit_conflicts() checks every booking in one pass: sort by
+#   (passenger, departure), then sweep with a heap of the flights
+#   still in the air
+#
+#   python booking_conflicts.py audit            # report double bookings
+#   python booking_conflicts.py bench 200000     # index and audit timings
+# ----------------------------------------
+
+import heapq
+import sqlite3
+import time
+from bisect import bisect_right
+
+import change_feed
+from flight_times import to_minutes, from_minutes
+
+DB_PATH = 'airline_management.db'
+
+# Minutes required between one flight's arrival and the next departure
+# (0: only real overlaps are conflicts)
+BUFFER_MINUTES = 0
+
+
+def _interval(departure_time, arrival_time):
+    """(start, end) in minutes, or (None, None) if either time cannot be parsed."""
+    start, end = to_minutes(departure_time), to_minutes(arrival_time)
+    if start is None or end is None:
+        return None, None
+    return start, end
+
+
+class PassengerIntervals:
+    """One passenger's booked intervals, sorted by departure."""
+
+    __slots__ = ("starts", "ends", "max_ends", "bookings")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.max_ends = []   # max_ends[i] = max(ends[:i + 1])
+        self.bookings = []   # (booking id, flight id)
+
+    def load(self, intervals):
+        """Replace the contents with [(start, end, booking)]."""
+        intervals.sort()
+        self.starts = [start for start, _, _ in intervals]
+        self.ends = [end for _, end, _ in intervals]
+        self.bookings = [booking for _, _, booking in intervals]
+        self.max_ends = self.ends[:]
+        self._fix_max_ends(0)
+
+    def _fix_max_ends(self, index):
+        running = self.max_ends[index - 1] if index else None
+        for i in range(index, len(self.ends)):
+            running = self.ends[i] if running is None else max(running, self.ends[i])
+            self.max_ends[i] = running
+
+    def add(self, start, end, booking):
+        index = bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.ends.insert(index, end)
+        self.max_ends.insert(index, end)
+        self.bookings.insert(index, booking)
+        self._fix_max_ends(index)
+
+    def remove(self, start, booking):
+        index = bisect_right(self.starts, start) - 1
+        while self.bookings[index] != booking:
+            index -= 1
+        for column in (self.starts, self.ends, self.max_ends, self.bookings):
+            del column[index]
+        self._fix_max_ends(index)
+
+    def overlapping(self, start, end, buffer=0):
+        """(booking, start, end) of every interval overlapping [start, end]."""
+        found = []
+        index = bisect_right(self.starts, start)
+        # Later departures that leave before this flight (plus buffer) lands
+        i = index
+        while i < len(self.starts) and self.starts[i] < end + buffer:
+            found.append((self.bookings[i], self.starts[i], self.ends[i]))
+            i += 1
+        # Earlier departures still in the air when this flight leaves
+        i = index - 1
+        while i >= 0 and self.max_ends[i] + buffer > start:
+            if self.ends[i] + buffer > start:
+                found.append((self.bookings[i], self.starts[i], self.ends[i]))
+            i -= 1
+        return found
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class ConflictIndex:
+    """Booked intervals of every passenger, kept current from the change feed."""
+
+    def __init__(self, db_path=DB_PATH, buffer=BUFFER_MINUTES):
+        # Own connection: data_version only compares on the same connection
+        self.conn = sqlite3.connect(db_path)
+        self.buffer = buffer
+        self.passengers = {}   # passenger id -> PassengerIntervals
+        self.bookings = {}     # booking id -> (passenger id, flight id, start, end)
+        self.by_flight = {}    # flight id -> set of booking ids
+        self.seq = 0
+        self.version = None
+        self.loaded = False
+
+    def _add(self, booking_id, passenger_id, flight_id, start, end):
+        # A booking whose flight times cannot be parsed has no interval; it
+        # is still kept, so a fix to the flight re-reads it
+        self.bookings[booking_id] = (passenger_id, flight_id, start, end)
+        self.by_flight.setdefault(flight_id, set()).add(booking_id)
+        if start is not None:
+            self.passengers.setdefault(passenger_id, PassengerIntervals()).add(
+                start, end, (booking_id, flight_id))
+
+    def _remove(self, booking_id):
+        entry = self.bookings.pop(booking_id, None)
+        if entry is None:
+            return
+        passenger_id, flight_id, start, _ = entry
+        self.by_flight[flight_id].discard(booking_id)
+        if start is not None:
+            intervals = self.passengers[passenger_id]
+            intervals.remove(start, (booking_id, flight_id))
+            if not intervals:
+                del self.passengers[passenger_id]
+
+    def load(self):
+        """Read every booking with its flight's times."""
+        conn = self.conn
+        self.passengers, self.bookings, self.by_flight = {}, {}, {}
+        self.version = conn.execute("PRAGMA data_version").fetchone()[0]
+        # Taken first, so bookings made meanwhile are replayed from the feed
+        self.seq = change_feed.last_seq(conn)
+        times = {}   # flight id -> (start, end), parsed once per flight
+        intervals = {}
+        for booking_id, passenger_id, flight_id, departure_time, arrival_time in conn.execute('''
+            SELECT b.id, b.passenger_id, b.flight_id, f.departure_time, f.arrival_time
+            FROM bookings b JOIN flights f ON f.id = b.flight_id
+        '''):
+            if flight_id not in times:
+                times[flight_id] = _interval(departure_time, arrival_time)
+            start, end = times[flight_id]
+            self.bookings[booking_id] = (passenger_id, flight_id, start, end)
+            self.by_flight.setdefault(flight_id, set()).add(booking_id)
+            if start is not None:
+                intervals.setdefault(passenger_id, []).append((start, end, (booking_id, flight_id)))
+        for passenger_id, booked in intervals.items():
+            self.passengers[passenger_id] = PassengerIntervals()
+            self.passengers[passenger_id].load(booked)
+        self.loaded = True
+        return self
+
+    def _reload_bookings(self, booking_ids):
+        booking_ids = sorted(booking_ids)
+        for booking_id in booking_ids:
+            self._remove(booking_id)
+        for start in range(0, len(booking_ids), 500):
+            chunk = booking_ids[start:start + 500]
+            for row in self.conn.execute(f'''
+                SELECT b.id, b.passenger_id, b.flight_id, f.departure_time, f.arrival_time
+                FROM bookings b JOIN flights f ON f.id = b.flight_id
+                WHERE b.id IN ({",".join("?" * len(chunk))})
+            ''', chunk):
+                self._add(*row[:3], *_interval(*row[3:]))
+
+    def catch_up(self):
+        """Apply bookings and flight times changed since the last call."""
+        conn = self.conn
+        if not self.loaded:
+            self.load()
+            return
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.version:
+            return
+        self.version = version
+        booking_ids = set()
+        try:
+            while True:
+                changes = change_feed.read_changes(conn, self.seq)
+                if not changes:
+                    break
+                self.seq = changes[-1][0]
+                for _, table_name, row_id, _ in changes:
+                    if table_name == "bookings":
+                        booking_ids.add(row_id)
+                    elif table_name == "flights":
+                        booking_ids.update(self.by_flight.get(row_id, ()))
+        except change_feed.ChangesPruned:
+            self.load()
+            return
+        self._reload_bookings(booking_ids)
+
+    def conflicts(self, passenger_id, flight_id):
+        """
+        [(flight_id, departure, arrival)] of the passenger's bookings that
+        overlap flight_id. Empty if the flight's times cannot be parsed.
+        """
+        self.catch_up()
+        try:
+            passenger_id, flight_id = int(passenger_id), int(flight_id)
+        except (TypeError, ValueError):
+            return []
+        intervals = self.passengers.get(passenger_id)
+        if intervals is None:
+            return []
+        row = self.conn.execute('''
+            SELECT departure_time, arrival_time FROM flights WHERE id = ?
+        ''', (flight_id,)).fetchone()
+        start, end = _interval(*row) if row else (None, None)
+        if start is None or end is None:
+            return []
+        return [(other_flight, other_start, other_end)
+                for (_, other_flight), other_start, other_end
+                in intervals.overlapping(start, end, self.buffer)
+                if other_flight != flight_id]
+
+
+def describe(conn, conflicts):
+    """One line per conflicting flight, for message boxes."""
+    lines = []
+    for flight_id, start, end in conflicts:
+        row = conn.execute("SELECT flight_number FROM flights WHERE id = ?", (flight_id,)).fetchone()
+        lines.append(f"{row[0] if row else flight_id} ({from_minutes(start)} - {from_minutes(end)[11:]})")
+    return "\n".join(lines)
+
+
+# -------------------------------
+# Batch audit
+# -------------------------------
+def audit_conflicts(conn, buffer=BUFFER_MINUTES):
+    """
+    Every pair of overlapping bookings of the same passenger, as
+    (passenger_id, (flight_number, start, end), (flight_number, start, end), overlap minutes).
+    """
+    intervals = []
+    times = {}   # flight id -> (start, end), parsed once per flight
+    for passenger_id, flight_id, flight_number, departure_time, arrival_time in conn.execute('''
+        SELECT b.passenger_id, b.flight_id, f.flight_number, f.departure_time, f.arrival_time
+        FROM bookings b JOIN flights f ON f.id = b.flight_id
+    '''):
+        if flight_id not in times:
+            times[flight_id] = _interval(departure_time, arrival_time)
+        start, end = times[flight_id]
+        if start is not None:
+            intervals.append((passenger_id, start, end, flight_number))
+    intervals.sort()
+
+    conflicts = []
+    current = None
+    in_air = []   # heap of (end, start, flight_number) for the current passenger
+    for passenger_id, start, end, flight_number in intervals:
+        if passenger_id != current:
+            current, in_air = passenger_id, []
+        while in_air and in_air[0][0] + buffer <= start:
+            heapq.heappop(in_air)
+        for other_end, other_start, other_number in in_air:
+            conflicts.append((passenger_id, (other_number, other_start, other_end),
+                              (flight_number, start, end), min(end, other_end) - start))
+        heapq.heappush(in_air, (end, start, flight_number))
+    return conflicts
+
+
+# -------------------------------
+# Shared index for the app
+# -------------------------------
+_index = None
+
+
+def get_conflict_index():
+    """Return the shared conflict index (loaded on its first check)."""
+    global _index
+    if _index is None:
+        _index = ConflictIndex()
+    return _index
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import random
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Detect passengers booked on overlapping flights.")
+    parser.add_argument("command", choices=["audit", "bench"])
+    parser.add_argument("count", nargs="?", type=int, default=200_000, help="bookings (bench)")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--buffer", type=int, default=BUFFER_MINUTES, help="minutes between flights")
+    args = parser.parse_args()
+
+    if args.command == "audit":
+        conn = sqlite3.connect(args.db)
+        start = time.perf_counter()
+        conflicts = audit_conflicts(conn, args.buffer)
+        for passenger_id, first, second, overlap in conflicts:
+            print(f"passenger {passenger_id}: {first[0]} {from_minutes(first[1])}-{from_minutes(first[2])[11:]} "
+                  f"overlaps {second[0]} {from_minutes(second[1])}-{from_minutes(second[2])[11:]} "
+                  f"by {overlap} min")
+        print(f"{len(conflicts)} conflicts in {time.perf_counter() - start:.2f} s")
+    else:
+        random.seed(9)
+        base = to_minutes("2025-04-01 00:00")
+        path = os.path.join(tempfile.mkdtemp(), "conflict_bench.db")
+        conn = sqlite3.connect(path)
+        conn.executescript('''
+            CREATE TABLE flights (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                flight_number VARCHAR NOT NULL,
+                origin VARCHAR NOT NULL,
+                destination VARCHAR NOT NULL,
+                departure_time VARCHAR NOT NULL,
+                arrival_time VARCHAR NOT NULL
+            );
+            CREATE TABLE bookings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                passenger_id INTEGER NOT NULL,
+                flight_id INTEGER NOT NULL,
+                seat_number TEXT
+            );
+        ''')
+        flights = max(1000, args.count // 10)
+        conn.executemany('''
+            INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+            VALUES (?, 'LOS', 'ABV', ?, ?)
+        ''', ((f"PX{i}", from_minutes(dep), from_minutes(dep + random.randint(45, 600)))
+              for i, dep in enumerate(base + random.randint(0, 365 * 24 * 60) for _ in range(flights))))
+        passengers = max(1, args.count // 20)
+        conn.executemany("INSERT INTO bookings (passenger_id, flight_id) VALUES (?, ?)",
+                         ((random.randint(1, passengers), random.randint(1, flights))
+                          for _ in range(args.count)))
+        change_feed.setup_change_feed(conn)
+        conn.commit()
+
+        start = time.perf_counter()
+        conflicts = audit_conflicts(conn)
+        print(f"{args.count} bookings: audit found {len(conflicts)} conflicts in "
+              f"{time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        index = ConflictIndex(path).load()
+        print(f"index loaded in {time.perf_counter() - start:.2f} s")
+        checks = [(random.randint(1, passengers), random.randint(1, flights)) for _ in range(20_000)]
+        start = time.perf_counter()
+        for passenger_id, flight_id in checks:
+            index.conflicts(passenger_id, flight_id)
+        print(f"booking check: {(time.perf_counter() - start) / len(checks) * 1e6:.1f} us")
@@ -0,0 +1,262 @@
+# ----------------------------------------
+# Airline Management System - Change Feed
+# ----------------------------------------
+# Tells boards, caches and exports what changed, so none of them has
+# to re-read whole tables.
+#
+# - Triggers on flights, passengers and bookings append one compact
+#   record per inserted, updated or deleted row to the changes table:
+#     (seq, table_name, row_id, op)   op is 'I', 'U' or 'D'
+#   seq is an AUTOINCREMENT sequence number, so it never goes back
+# - A ChangeConsumer reads the records after its position in batches
+#   of BATCH_SIZE and saves its position (checkpoint) in
+#   change_consumers with ack(), so it resumes where it stopped after
+#   a restart
+# - prune() deletes the records every registered consumer has
+#   acknowledged, keeping the last KEEP_RECENT for readers that do not
+#   checkpoint (the departure board); read_changes() raises
+#   ChangesPruned if such a reader fell further behind
+#
+#   python change_feed.py status               # consumers and their lag
+#   python change_feed.py tail --follow        # print changes as JSON lines
+#   python change_feed.py tail --consumer export --follow   # checkpointed
+#   python change_feed.py drop export          # forget a consumer
+# ----------------------------------------
+
+import sqlite3
+import time
+
+DB_PATH = 'airline_management.db'
+
+TRACKED_TABLES = ("flights", "passengers", "bookings")
+
+# Records returned per fetch
+BATCH_SIZE = 500
+
+# Records kept after pruning, for readers without a checkpoint
+KEEP_RECENT = 1000
+
+OPERATIONS = {"I": "insert", "U": "update", "D": "delete"}
+
+
+class ChangesPruned(Exception):
+    """Records after the requested sequence number have been pruned."""
+
+
+def setup_change_feed(conn):
+    """Create the changes and change_consumers tables and the triggers (tables that exist)."""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            op TEXT NOT NULL
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_consumers (
+            name TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    ''')
+    for table in TRACKED_TABLES:
+        if not cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                              (table,)).fetchone():
+            continue
+        for event, op, row in (("INSERT", "I", "NEW"), ("UPDATE", "U", "NEW"), ("DELETE", "D", "OLD")):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_feed_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO changes (table_name, row_id, op) VALUES ('{table}', {row}.id, '{op}');
+                END
+            ''')
+
+    # Replaced by the changes table (the first departure board kept its own log)
+    for event in ("insert", "update", "delete"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS flights_log_{event}")
+    cursor.execute("DROP TABLE IF EXISTS flight_changes")
+    conn.commit()
+
+
+def last_seq(conn):
+    """Sequence number of the newest record ever written (0 if none)."""
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+    return row[0] if row else 0
+
+
+def read_changes(conn, after, limit=BATCH_SIZE):
+    """
+    Up to limit (seq, table_name, row_id, op) records with seq > after,
+    oldest first. Raises ChangesPruned if some of them were pruned.
+    """
+    # The newest sequence number is read in the same statement, so both
+    # come from one snapshot: a commit landing between two reads would
+    # otherwise look like pruned records. The LEFT JOIN keeps one row
+    # (with NULLs) when there are no records after `after`
+    rows = conn.execute('''
+        SELECT newest.seq, c.seq, c.table_name, c.row_id, c.op
+        FROM (SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'changes'), 0) AS seq) newest
+        LEFT JOIN (
+            SELECT seq, table_name, row_id, op FROM changes
+            WHERE seq > ?
+            ORDER BY seq
+            LIMIT ?
+        ) c
+        ORDER BY c.seq
+    ''', (after, limit)).fetchall()
+    newest = rows[0][0]
+    rows = [row[1:] for row in rows if row[1] is not None]
+    # Sequence numbers have no gaps, except where records were pruned
+    if (rows and rows[0][0] > after + 1) or (not rows and newest > after):
+        raise ChangesPruned(f"changes after {after} were pruned")
+    return rows
+
+
+def prune(conn, keep_recent=KEEP_RECENT):
+    """Delete records every registered consumer has acknowledged. Returns the number deleted."""
+    row = conn.execute("SELECT MIN(position) FROM change_consumers").fetchone()
+    limit = last_seq(conn) - keep_recent
+    if row[0] is not None:
+        limit = min(limit, row[0])
+    deleted = conn.execute("DELETE FROM changes WHERE seq <= ?", (limit,)).rowcount
+    conn.commit()
+    return deleted
+
+
+def consumers(conn):
+    """[(name, position, lag, seconds since last ack)] for every registered consumer."""
+    newest = last_seq(conn)
+    now = time.time()
+    return [(name, position, newest - position, now - updated_at)
+            for name, position, updated_at in conn.execute('''
+                SELECT name, position, updated_at FROM change_consumers ORDER BY name
+            ''')]
+
+
+def unregister(conn, name):
+    """Forget a consumer, so it no longer holds back pruning."""
+    conn.execute("DELETE FROM change_consumers WHERE name = ?", (name,))
+    conn.commit()
+
+
+class ChangeConsumer:
+    """
+    Named reader of the change feed with a saved position. New consumers
+    start at the newest record: they see changes made after they
+    registered.
+    """
+
+    def __init__(self, conn, name, tables=None, batch_size=BATCH_SIZE):
+        self.conn = conn
+        self.name = name
+        self.tables = set(tables) if tables else None
+        self.batch_size = batch_size
+        conn.execute('''
+            INSERT OR IGNORE INTO change_consumers (name, position, updated_at) VALUES (?, ?, ?)
+        ''', (name, last_seq(conn), time.time()))
+        conn.commit()
+        self.acked = conn.execute('''
+            SELECT position FROM change_consumers WHERE name = ?
+        ''', (name,)).fetchone()[0]
+        self.position = self.acked   # last record handed out by fetch()
+        self.version = None          # data_version when the feed was last found drained
+
+    def fetch(self):
+        """
+        Next batch of (seq, table_name, row_id, op) records for this
+        consumer's tables ([] when it is up to date). The position moves
+        on in memory; call ack() once the batch has been handled.
+        """
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.version:
+            # Nothing committed since the feed was drained
+            return []
+        while True:
+            rows = read_changes(self.conn, self.position, self.batch_size)
+            if not rows:
+                self.version = version
+                return []
+            self.position = rows[-1][0]
+            if self.tables is not None:
+                rows = [row for row in rows if row[1] in self.tables]
+            if rows:
+                return rows
+
+    def __iter__(self):
+        """Every pending record, batch by batch (not acknowledged)."""
+        while True:
+            rows = self.fetch()
+            if not rows:
+                return
+            yield from rows
+
+    def ack(self, seq=None):
+        """Save the checkpoint (default: everything fetched so far) and prune."""
+        self.acked = self.position if seq is None else seq
+        self.conn.execute('''
+            UPDATE change_consumers SET position = ?, updated_at = ? WHERE name = ?
+        ''', (self.acked, time.time(), self.name))
+        self.conn.commit()
+        prune(self.conn)
+
+    def lag(self):
+        return last_seq(self.conn) - self.acked
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Inspect and follow the change feed.")
+    parser.add_argument("command", choices=["status", "tail", "drop"])
+    parser.add_argument("name", nargs="?", help="consumer to drop")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--consumer", help="read as this checkpointed consumer")
+    parser.add_argument("--from", dest="start", type=int, default=None, help="sequence number to start after")
+    parser.add_argument("--table", action="append", choices=TRACKED_TABLES)
+    parser.add_argument("--follow", action="store_true")
+    parser.add_argument("--every", type=float, default=1.0, help="seconds between polls with --follow")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    setup_change_feed(conn)
+    if args.command == "status":
+        print(f"Newest record: {last_seq(conn)}, "
+              f"kept: {conn.execute('SELECT COUNT(*) FROM changes').fetchone()[0]}")
+        for name, position, lag, idle in consumers(conn):
+            print(f"  {name:<24} at {position:<10} {lag:>8} behind, last ack {idle:.0f} s ago")
+    elif args.command == "drop":
+        if not args.name:
+            parser.error("drop needs a consumer name")
+        unregister(conn, args.name)
+    else:
+        consumer = None
+        position = last_seq(conn) if args.start is None else args.start
+        if args.consumer:
+            consumer = ChangeConsumer(conn, args.consumer, args.table)
+        try:
+            while True:
+                if consumer is not None:
+                    rows = consumer.fetch()
+                    drained = not rows
+                else:
+                    rows = read_changes(conn, position)
+                    drained = not rows
+                    position = rows[-1][0] if rows else position
+                    rows = [row for row in rows if not args.table or row[1] in args.table]
+                for seq, table_name, row_id, op in rows:
+                    print(json.dumps({"seq": seq, "table": table_name, "id": row_id,
+                                      "op": OPERATIONS[op]}), flush=True)
+                if consumer is not None and rows:
+                    consumer.ack()
+                if drained:
+                    if not args.follow:
+                        break
+                    time.sleep(args.every)
+        except KeyboardInterrupt:
+            pass
+        except ChangesPruned as e:
+            print(f"Stopped: {e}; restart with --from {last_seq(conn)}")
+    conn.close()
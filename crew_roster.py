@@ -0,0 +1,466 @@
+# ----------------------------------------
+# Airline Management System - Crew Roster
+# ----------------------------------------
+# Assigns flight attendants (users with position 'Flight Attendant')
+# to the flights of one period, usually a month.
+#
+# - A flight's duty runs from REPORT_MINUTES before departure until
+#   RELEASE_MINUTES after arrival, and needs one attendant per
+#   SEATS_PER_ATTENDANT seats (at least MIN_CREW)
+# - Between two duties an attendant rests at least MIN_REST_MINUTES,
+#   and works at most MAX_DUTY_HOURS in the period
+# - The solver sweeps the duties by start time with two heaps:
+#   attendants resting (by the time they are free again) and free
+#   attendants (by duty minutes so far). Each duty takes the least
+#   loaded free attendants that still have the hours
+# - improve() then moves duties from the most to the least loaded
+#   attendants where their schedules allow, and gives the hours this
+#   frees to flights the sweep left understaffed
+# - Duties of earlier periods already in crew_roster count for the
+#   rest rule, so months are rostered in order; so do the duties that
+#   archive.py moved to the archive with their flights
+#
+#   python crew_roster.py build 2025-05            # roster May 2025
+#   python crew_roster.py flight 42                # crew of flight 42
+#   python crew_roster.py attendant 7              # duties of attendant 7
+#   python crew_roster.py bench --crew 3000 --flights 10000
+# ----------------------------------------
+
+import heapq
+import math
+import sqlite3
+import time
+from bisect import bisect_left, bisect_right, insort
+
+import archive
+from flight_times import to_minutes
+
+DB_PATH = 'airline_management.db'
+
+ATTENDANT_POSITION = "Flight Attendant"
+
+# Cabin crew needed per flight: one per SEATS_PER_ATTENDANT seats
+SEATS_PER_ATTENDANT = 50
+MIN_CREW = 2
+
+# Seats of flights without a flight_capacity row (waitlist.py default layout)
+DEFAULT_SEATS = 150 * 4
+
+# Duty starts before departure and ends after arrival (minutes)
+REPORT_MINUTES = 60
+RELEASE_MINUTES = 30
+
+MIN_REST_MINUTES = 10 * 60
+MAX_DUTY_HOURS = 100
+
+# Improvement pass: rounds, and the least loaded attendants tried per duty
+IMPROVE_ROUNDS = 3
+RECEIVERS_TRIED = 20
+
+
+def setup_roster(conn):
+    """Create the crew_roster table and its per-attendant index."""
+    cursor = conn.cursor()
+    # attendant_id is users.id (the users table may live in another file)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS crew_roster (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flight_id INTEGER NOT NULL,
+            attendant_id INTEGER NOT NULL,
+            UNIQUE(flight_id, attendant_id),
+            FOREIGN KEY(flight_id) REFERENCES flights(id)
+        )
+    ''')
+    # Per flight lookups use the UNIQUE index; this one serves attendants
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_crew_roster_attendant
+        ON crew_roster (attendant_id, flight_id)
+    ''')
+    conn.commit()
+
+
+def required_crew(seats):
+    return max(MIN_CREW, math.ceil(seats / SEATS_PER_ATTENDANT))
+
+
+def month_period(month):
+    """(start, end) minutes of a 'YYYY-MM' month."""
+    year, number = (int(part) for part in month.split("-"))
+    following = f"{year + 1}-01" if number == 12 else f"{year}-{number + 1:02d}"
+    return to_minutes(f"{month}-01 00:00"), to_minutes(f"{following}-01 00:00")
+
+
+class Duty:
+    __slots__ = ("flight_id", "start", "end", "required")
+
+    def __init__(self, flight_id, start, end, required):
+        self.flight_id = flight_id
+        self.start = start
+        self.end = end
+        self.required = required
+
+    @property
+    def minutes(self):
+        return self.end - self.start
+
+
+class AttendantSchedule:
+    """One attendant's duties, sorted by start, for rest checks by bisect."""
+
+    __slots__ = ("starts", "ends", "flights", "minutes")
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.flights = []
+        self.minutes = 0
+
+    def fits(self, duty, rest=MIN_REST_MINUTES):
+        """True if duty leaves the minimum rest to the duties before and after it."""
+        index = bisect_left(self.starts, duty.start)
+        if index and self.ends[index - 1] + rest > duty.start:
+            return False
+        return index == len(self.starts) or duty.end + rest <= self.starts[index]
+
+    def add(self, duty):
+        index = bisect_right(self.starts, duty.start)
+        self.starts.insert(index, duty.start)
+        self.ends.insert(index, duty.end)
+        self.flights.insert(index, duty.flight_id)
+        self.minutes += duty.minutes
+
+    def remove(self, duty):
+        index = self.flights.index(duty.flight_id, bisect_left(self.starts, duty.start))
+        del self.starts[index], self.ends[index], self.flights[index]
+        self.minutes -= duty.minutes
+
+
+class Roster:
+    """Crew of every duty in a period, and every attendant's schedule."""
+
+    def __init__(self, duties, attendants, max_duty_minutes=MAX_DUTY_HOURS * 60,
+                 rest=MIN_REST_MINUTES, free_from=None):
+        self.duties = {duty.flight_id: duty for duty in duties}
+        self.crew = {duty.flight_id: [] for duty in duties}
+        self.schedules = {attendant: AttendantSchedule() for attendant in attendants}
+        # attendant -> end of their last duty before the period
+        self.free_from = free_from or {}
+        self.max_duty_minutes = max_duty_minutes
+        self.rest = rest
+
+    def assign(self, attendant, duty):
+        self.crew[duty.flight_id].append(attendant)
+        self.schedules[attendant].add(duty)
+
+    def unassign(self, attendant, duty):
+        self.crew[duty.flight_id].remove(attendant)
+        self.schedules[attendant].remove(duty)
+
+    def can_take(self, attendant, duty):
+        schedule = self.schedules[attendant]
+        return (schedule.minutes + duty.minutes <= self.max_duty_minutes
+                and attendant not in self.crew[duty.flight_id]
+                and self.free_from.get(attendant, duty.start - self.rest) + self.rest <= duty.start
+                and schedule.fits(duty, self.rest))
+
+    def understaffed(self):
+        return [duty for flight_id, duty in self.duties.items()
+                if len(self.crew[flight_id]) < duty.required]
+
+    def stats(self):
+        minutes = [schedule.minutes for schedule in self.schedules.values()] or [0]
+        short = self.understaffed()
+        return {
+            "flights": len(self.duties),
+            "positions": sum(duty.required for duty in self.duties.values()),
+            "assigned": sum(len(crew) for crew in self.crew.values()),
+            "understaffed": len(short),
+            "missing": sum(duty.required - len(self.crew[duty.flight_id]) for duty in short),
+            "attendants": len(self.schedules),
+            "min_hours": min(minutes) / 60,
+            "mean_hours": sum(minutes) / len(minutes) / 60,
+            "max_hours": max(minutes) / 60,
+        }
+
+
+# -------------------------------
+# Solver
+# -------------------------------
+def solve(duties, attendants, free_from=None, max_duty_minutes=MAX_DUTY_HOURS * 60,
+          rest=MIN_REST_MINUTES):
+    """
+    Greedy roster: duties by start time, each taking the least loaded
+    attendants that are rested and have the hours. free_from maps an
+    attendant to the end of their last duty before the period.
+    """
+    free_from = free_from or {}
+    roster = Roster(duties, attendants, max_duty_minutes, rest, free_from)
+    shortest = min((duty.minutes for duty in duties), default=0)
+
+    resting = [(free_from[attendant] + rest, attendant) for attendant in attendants
+               if attendant in free_from]
+    heapq.heapify(resting)
+    free = [(0, attendant) for attendant in attendants if attendant not in free_from]
+    heapq.heapify(free)
+
+    for duty in sorted(duties, key=lambda duty: (duty.start, duty.flight_id)):
+        while resting and resting[0][0] <= duty.start:
+            _, attendant = heapq.heappop(resting)
+            heapq.heappush(free, (roster.schedules[attendant].minutes, attendant))
+        crew, skipped = [], []
+        while free and len(crew) < duty.required:
+            minutes, attendant = heapq.heappop(free)
+            if minutes + duty.minutes <= max_duty_minutes:
+                crew.append(attendant)
+            elif minutes + shortest <= max_duty_minutes:
+                # Too few hours left for this duty, maybe not for a shorter one
+                skipped.append((minutes, attendant))
+            # else: out of hours for the period, dropped from the pool
+        for item in skipped:
+            heapq.heappush(free, item)
+        for attendant in crew:
+            roster.assign(attendant, duty)
+            heapq.heappush(resting, (duty.end + rest, attendant))
+    return roster
+
+
+def improve(roster, rounds=IMPROVE_ROUNDS, receivers_tried=RECEIVERS_TRIED):
+    """
+    Move duties from attendants above the mean load to the least loaded
+    ones whose schedules fit, then staff understaffed flights with the
+    hours freed. Returns the number of moves and added assignments.
+    """
+    changes = 0
+    schedules = roster.schedules
+    if not schedules:
+        return changes
+    by_load = sorted((schedule.minutes, attendant) for attendant, schedule in schedules.items())
+
+    def reload(attendant, old_minutes):
+        del by_load[bisect_left(by_load, (old_minutes, attendant))]
+        insort(by_load, (schedules[attendant].minutes, attendant))
+
+    for _ in range(rounds):
+        mean = sum(minutes for minutes, _ in by_load) / len(by_load)
+        moved = 0
+        for donor_minutes, donor in reversed(by_load[:]):
+            if donor_minutes <= mean:
+                break
+            donor_schedule = schedules[donor]
+            for flight_id in list(donor_schedule.flights):
+                duty = roster.duties.get(flight_id)
+                if duty is None or donor_schedule.minutes <= mean:
+                    continue
+                for minutes, receiver in by_load[:receivers_tried]:
+                    # Only moves that lower the larger of the two loads
+                    if minutes + duty.minutes >= donor_schedule.minutes:
+                        break
+                    if roster.can_take(receiver, duty):
+                        before = donor_schedule.minutes
+                        roster.unassign(donor, duty)
+                        roster.assign(receiver, duty)
+                        reload(donor, before)
+                        reload(receiver, minutes)
+                        moved += 1
+                        break
+        changes += moved
+        if not moved:
+            break
+
+    for duty in sorted(roster.understaffed(), key=lambda duty: duty.start):
+        for minutes, attendant in by_load[:]:
+            if len(roster.crew[duty.flight_id]) >= duty.required:
+                break
+            if minutes + duty.minutes > roster.max_duty_minutes:
+                break
+            if roster.can_take(attendant, duty):
+                roster.assign(attendant, duty)
+                reload(attendant, minutes)
+                changes += 1
+    return changes
+
+
+def violations(roster):
+    """Rest, hours and crew-count problems in a roster (empty when valid)."""
+    problems = []
+    for attendant, schedule in roster.schedules.items():
+        if schedule.minutes > roster.max_duty_minutes:
+            problems.append(f"attendant {attendant}: {schedule.minutes / 60:.1f} duty hours")
+        previous = roster.free_from.get(attendant)
+        if schedule.starts and previous is not None and previous + roster.rest > schedule.starts[0]:
+            problems.append(f"attendant {attendant}: short rest before flight {schedule.flights[0]}")
+        for i in range(1, len(schedule.starts)):
+            if schedule.ends[i - 1] + roster.rest > schedule.starts[i]:
+                problems.append(f"attendant {attendant}: short rest before flight {schedule.flights[i]}")
+    for flight_id, crew in roster.crew.items():
+        if len(crew) > roster.duties[flight_id].required or len(set(crew)) != len(crew):
+            problems.append(f"flight {flight_id}: crew {crew}")
+    return problems
+
+
+# -------------------------------
+# Database
+# -------------------------------
+def load_attendants(users_conn):
+    return [attendant for (attendant,) in users_conn.execute('''
+        SELECT id FROM users WHERE position = ? ORDER BY id
+    ''', (ATTENDANT_POSITION,))]
+
+
+def load_duties(conn, start, end, archive_path=archive.ARCHIVE_PATH):
+    """
+    (duties departing in [start, end), {attendant: end of their last
+    earlier rostered duty}), archived duties included.
+    """
+    has_capacity = conn.execute('''
+        SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'flight_capacity'
+    ''').fetchone()
+    rows = conn.execute(f'''
+        SELECT f.id, f.departure_time, f.arrival_time, {"c.capacity" if has_capacity else "NULL"}
+        FROM flights f
+        {"LEFT JOIN flight_capacity c ON c.flight_id = f.id" if has_capacity else ""}
+    ''')
+    duties, earlier = [], {}
+    for flight_id, departure_time, arrival_time, seats in rows:
+        departure, arrival = to_minutes(departure_time), to_minutes(arrival_time)
+        if departure is None or arrival is None or arrival < departure:
+            continue
+        duty = Duty(flight_id, departure - REPORT_MINUTES, arrival + RELEASE_MINUTES,
+                    required_crew(seats or DEFAULT_SEATS))
+        if start <= departure < end:
+            duties.append(duty)
+        elif departure < start:
+            earlier[flight_id] = duty.end
+
+    free_from = {}
+    if earlier:
+        for flight_id, attendant in conn.execute("SELECT flight_id, attendant_id FROM crew_roster"):
+            if flight_id in earlier and earlier[flight_id] > free_from.get(attendant, 0):
+                free_from[attendant] = earlier[flight_id]
+    archived = {}   # flight id -> duty end, parsed once per flight
+    for attendant, flight_id, _, _, _, departure_time, arrival_time in archive.archived_duties(
+            archive_path=archive_path):
+        if flight_id not in archived:
+            departure, arrival = to_minutes(departure_time), to_minutes(arrival_time)
+            ok = departure is not None and arrival is not None and departure < start
+            archived[flight_id] = arrival + RELEASE_MINUTES if ok else None
+        duty_end = archived[flight_id]
+        if duty_end is not None and duty_end > free_from.get(attendant, 0):
+            free_from[attendant] = duty_end
+    return duties, free_from
+
+
+def save_roster(conn, roster):
+    """Replace the crew of the roster's flights in one transaction."""
+    flight_ids = sorted(roster.duties)
+    with conn:
+        for start in range(0, len(flight_ids), 500):
+            chunk = flight_ids[start:start + 500]
+            conn.execute(f'''
+                DELETE FROM crew_roster WHERE flight_id IN ({",".join("?" * len(chunk))})
+            ''', chunk)
+        conn.executemany('''
+            INSERT INTO crew_roster (flight_id, attendant_id) VALUES (?, ?)
+        ''', ((flight_id, attendant) for flight_id, crew in roster.crew.items()
+              for attendant in crew))
+
+
+def crew_for_flight(conn, flight_id):
+    return [attendant for (attendant,) in conn.execute('''
+        SELECT attendant_id FROM crew_roster WHERE flight_id = ? ORDER BY attendant_id
+    ''', (flight_id,))]
+
+
+def duties_for_attendant(conn, attendant_id, archive_path=archive.ARCHIVE_PATH):
+    """
+    [(flight_id, flight_number, origin, destination, departure_time,
+    arrival_time)] of the attendant's duties, archived ones included.
+    """
+    rows = conn.execute('''
+        SELECT f.id, f.flight_number, f.origin, f.destination, f.departure_time, f.arrival_time
+        FROM crew_roster r JOIN flights f ON f.id = r.flight_id
+        WHERE r.attendant_id = ?
+    ''', (attendant_id,)).fetchall()
+    rows += [row[1:] for row in archive.archived_duties(attendant_id, archive_path)]
+    return sorted(rows, key=lambda row: to_minutes(row[4]) or 0)
+
+
+def build_roster(conn, users_conn, month, improve_pass=True, archive_path=archive.ARCHIVE_PATH):
+    """Roster a 'YYYY-MM' month, save it and return the Roster."""
+    setup_roster(conn)
+    start, end = month_period(month)
+    duties, free_from = load_duties(conn, start, end, archive_path)
+    roster = solve(duties, load_attendants(users_conn), free_from)
+    if improve_pass:
+        improve(roster)
+    save_roster(conn, roster)
+    return roster
+
+
+def print_stats(stats):
+    print(f"{stats['flights']} flights, {stats['assigned']}/{stats['positions']} positions filled, "
+          f"{stats['understaffed']} flights understaffed ({stats['missing']} missing)")
+    print(f"{stats['attendants']} attendants: duty hours min {stats['min_hours']:.1f}, "
+          f"mean {stats['mean_hours']:.1f}, max {stats['max_hours']:.1f}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import random
+
+    parser = argparse.ArgumentParser(description="Assign flight attendants to flights.")
+    parser.add_argument("command", choices=["build", "flight", "attendant", "bench"])
+    parser.add_argument("target", nargs="?", help="YYYY-MM (build), flight id or attendant id")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--users-db", help="database with the users table (default: --db)")
+    parser.add_argument("--archive", default=archive.ARCHIVE_PATH, help="archive of departed flights")
+    parser.add_argument("--no-improve", action="store_true", help="skip the improvement pass")
+    parser.add_argument("--crew", type=int, default=3000, help="attendants (bench)")
+    parser.add_argument("--flights", type=int, default=10000, help="flights in the month (bench)")
+    args = parser.parse_args()
+
+    if args.command != "bench" and not args.target:
+        parser.error(f"{args.command} needs a target")
+
+    if args.command == "build":
+        conn = sqlite3.connect(args.db)
+        users_conn = sqlite3.connect(args.users_db) if args.users_db else conn
+        started = time.perf_counter()
+        roster = build_roster(conn, users_conn, args.target, not args.no_improve, args.archive)
+        print_stats(roster.stats())
+        print(f"rostered and saved in {time.perf_counter() - started:.2f} s")
+    elif args.command == "flight":
+        conn = sqlite3.connect(args.db)
+        setup_roster(conn)
+        print(", ".join(str(attendant) for attendant in crew_for_flight(conn, int(args.target)))
+              or "no crew assigned")
+    elif args.command == "attendant":
+        conn = sqlite3.connect(args.db)
+        setup_roster(conn)
+        for _, flight_number, origin, destination, departure_time, arrival_time in \
+                duties_for_attendant(conn, int(args.target), args.archive):
+            print(f"{departure_time:<17} {flight_number:<8} {origin}-{destination}  lands {arrival_time}")
+    else:
+        # A month of flights of 90 to 300 seats, departing 05:00-23:00
+        random.seed(50)
+        month_start, month_end = month_period("2025-05")
+        duties = []
+        for flight_id in range(1, args.flights + 1):
+            day = random.randrange((month_end - month_start) // 1440)
+            departure = month_start + day * 1440 + random.randint(5 * 60, 23 * 60)
+            duties.append(Duty(flight_id, departure - REPORT_MINUTES,
+                               departure + random.randint(45, 480) + RELEASE_MINUTES,
+                               required_crew(random.choice((90, 150, 180, 220, 300)))))
+        attendants = list(range(1, args.crew + 1))
+
+        started = time.perf_counter()
+        roster = solve(duties, attendants)
+        solved = time.perf_counter() - started
+        print(f"sweep: {solved:.2f} s")
+        print_stats(roster.stats())
+        started = time.perf_counter()
+        changes = improve(roster)
+        print(f"improvement pass: {changes} changes in {time.perf_counter() - started:.2f} s")
+        print_stats(roster.stats())
+        problems = violations(roster)
+        print(f"{len(problems)} rule violations")
@@ -0,0 +1,300 @@
+# ----------------------------------------
+# Airline Management System - Live Departure Board
+# ----------------------------------------
+# Full-screen departures and arrivals board that follows the edits
+# made in the admin panels, without re-reading or re-drawing the whole
+# schedule.
+#
+# - Every POLL_MS the board reads PRAGMA data_version; only when another
+#   connection has committed does it read the new records of the change
+#   feed (change_feed.py) and re-fetch the changed flights by id
+# - Each changed flight patches its Treeview item in place (insert,
+#   update values, move or delete); untouched rows are never redrawn
+# - Statuses (Boarding, Final call, Departed, Landed, ...) move with
+#   the clock, so once a minute the rows are recomputed from memory and,
+#   again, only the items whose text changed are touched
+#
+#   python departure_board.py            # all airports
+#   python departure_board.py LOS        # departures from / arrivals to LOS
+#   python departure_board.py --windowed
+# ----------------------------------------
+
+import sqlite3
+from bisect import bisect_left
+from tkinter import Tk, Toplevel, Frame, Label, BOTH, LEFT, X
+from tkinter import ttk
+
+import change_feed
+from announcement_scheduler import BOARDING_MINUTES, FINAL_CALL_MINUTES
+from flight_times import to_minutes, from_minutes, now_minutes
+
+DB_PATH = 'airline_management.db'
+
+# Flights shown: from PAST_MINUTES ago until BOARD_HOURS ahead
+BOARD_HOURS = 12
+PAST_MINUTES = 30
+
+# Interval between data_version checks (milliseconds)
+POLL_MS = 1000
+
+DEPARTURE_COLUMNS = ("time", "flight", "to", "status")
+ARRIVAL_COLUMNS = ("time", "flight", "from", "status")
+
+
+def departure_status(departure, now):
+    if now >= departure:
+        return "Departed"
+    if now >= departure - FINAL_CALL_MINUTES:
+        return "Final call"
+    if now >= departure - BOARDING_MINUTES:
+        return "Boarding"
+    return "Scheduled"
+
+
+def arrival_status(departure, arrival, now):
+    if now >= arrival:
+        return "Landed"
+    if now >= departure:
+        return "In flight"
+    return "Expected"
+
+
+class BoardModel:
+    """In-memory copy of the flights table, kept current from the change feed."""
+
+    def __init__(self, airport=None, hours=BOARD_HOURS, past_minutes=PAST_MINUTES):
+        self.airport = airport.strip().upper() if airport else None
+        self.hours = hours
+        self.past_minutes = past_minutes
+        self.flights = {}   # id -> (flight_number, origin, destination, departure, arrival)
+        self.seq = 0        # last change feed record applied
+        self.version = None
+
+    def _store(self, row):
+        flight_id, flight_number, origin, destination, departure_time, arrival_time = row
+        departure = to_minutes(departure_time)
+        arrival = to_minutes(arrival_time)
+        if departure is None or arrival is None:
+            # Cannot be placed on a board
+            self.flights.pop(flight_id, None)
+        else:
+            self.flights[flight_id] = (flight_number, origin.strip().upper(),
+                                       destination.strip().upper(), departure, arrival)
+
+    def load(self, conn):
+        """Read every flight (first load, or the change log was pruned past us)."""
+        self.version = conn.execute("PRAGMA data_version").fetchone()[0]
+        # Taken before the flights, so changes made meanwhile are replayed
+        self.seq = change_feed.last_seq(conn)
+        self.flights = {}
+        for row in conn.execute('''
+            SELECT id, flight_number, origin, destination, departure_time, arrival_time
+            FROM flights
+        '''):
+            self._store(row)
+
+    def poll(self, conn):
+        """
+        Ids of the flights changed since the last poll (empty set: nothing
+        changed). Returns None if everything was reloaded.
+        """
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.version:
+            return set()
+        self.version = version
+
+        # The board keeps no checkpoint: it reloads if it fell too far behind
+        changed = set()
+        try:
+            while True:
+                changes = change_feed.read_changes(conn, self.seq)
+                if not changes:
+                    break
+                self.seq = changes[-1][0]
+                changed.update(row_id for _, table_name, row_id, _ in changes
+                               if table_name == "flights")
+        except change_feed.ChangesPruned:
+            self.load(conn)
+            return None
+        if not changed:
+            return set()
+
+        ids = sorted(changed)
+        for flight_id in ids:
+            self.flights.pop(flight_id, None)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            for row in conn.execute(f'''
+                SELECT id, flight_number, origin, destination, departure_time, arrival_time
+                FROM flights WHERE id IN ({",".join("?" * len(chunk))})
+            ''', chunk):
+                self._store(row)
+        return changed
+
+    # -------------------------------
+    # Board rows: (sort key, values) or None when not shown
+    # -------------------------------
+    def _in_window(self, minutes, now):
+        return now - self.past_minutes <= minutes < now + self.hours * 60
+
+    def departure_row(self, flight_id, now):
+        flight = self.flights.get(flight_id)
+        if flight is None:
+            return None
+        flight_number, origin, destination, departure, arrival = flight
+        if (self.airport and origin != self.airport) or not self._in_window(departure, now):
+            return None
+        return ((departure, flight_number),
+                (from_minutes(departure)[11:], flight_number, destination,
+                 departure_status(departure, now)))
+
+    def arrival_row(self, flight_id, now):
+        flight = self.flights.get(flight_id)
+        if flight is None:
+            return None
+        flight_number, origin, destination, departure, arrival = flight
+        if (self.airport and destination != self.airport) or not self._in_window(arrival, now):
+            return None
+        return ((arrival, flight_number),
+                (from_minutes(arrival)[11:], flight_number, origin,
+                 arrival_status(departure, arrival, now)))
+
+
+class BoardTable:
+    """Treeview whose items are patched one flight at a time, kept in sort order."""
+
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = {}    # iid -> (sort key, values)
+        self.order = []   # sorted (sort key, iid)
+        self.touched = 0  # item inserts/updates/deletes, for the status line
+
+    def set_row(self, iid, row):
+        """Show row (sort key, values) for iid, or remove it when row is None."""
+        old = self.rows.get(iid)
+        if old == row:
+            return
+        self.touched += 1
+        if old is not None and (row is None or row[0] != old[0]):
+            # Removed, or its time changed: take it out of the order
+            del self.order[bisect_left(self.order, (old[0], iid))]
+            self.tree.delete(iid)
+            del self.rows[iid]
+            old = None
+        if row is None:
+            return
+        if old is None:
+            index = bisect_left(self.order, (row[0], iid))
+            self.order.insert(index, (row[0], iid))
+            self.tree.insert("", index, iid=iid, values=row[1])
+        else:
+            self.tree.item(iid, values=row[1])
+        self.rows[iid] = row
+
+    def clear(self):
+        for iid in list(self.rows):
+            self.set_row(iid, None)
+
+
+class DepartureBoard:
+    """Departures and arrivals tables fed by a BoardModel."""
+
+    def __init__(self, window, airport=None, db_path=DB_PATH, poll_ms=POLL_MS, clock=now_minutes):
+        self.window = window
+        self.poll_ms = poll_ms
+        self.clock = clock
+        self.conn = sqlite3.connect(db_path)
+        change_feed.setup_change_feed(self.conn)
+        self.model = BoardModel(airport)
+
+        window.title(f"Departures and Arrivals{' - ' + self.model.airport if self.model.airport else ''}")
+        window.configure(bg="black")
+        style = ttk.Style(window)
+        style.configure("Board.Treeview", background="black", fieldbackground="black",
+                        foreground="gold", font=("Courier", 18, "bold"), rowheight=34)
+        style.configure("Board.Treeview.Heading", font=("Arial", 14, "bold"))
+
+        tables = Frame(window, bg="black")
+        tables.pack(fill=BOTH, expand=True)
+        self.departures = BoardTable(self._make_tree(tables, "DEPARTURES", DEPARTURE_COLUMNS))
+        self.arrivals = BoardTable(self._make_tree(tables, "ARRIVALS", ARRIVAL_COLUMNS))
+        self.status = Label(window, bg="black", fg="gray", anchor="w")
+        self.status.pack(fill=X)
+
+        window.bind("<Escape>", lambda event: window.attributes("-fullscreen", False))
+        window.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.minute = self.clock()
+        self.model.load(self.conn)
+        self.refresh_all()
+        self._show_status(self.minute)
+        self.job = window.after(self.poll_ms, self.poll)
+
+    def _make_tree(self, parent, title, columns):
+        frame = Frame(parent, bg="black")
+        frame.pack(side=LEFT, fill=BOTH, expand=True, padx=10, pady=10)
+        Label(frame, text=title, bg="black", fg="white", font=("Arial", 24, "bold")).pack()
+        tree = ttk.Treeview(frame, columns=columns, show="headings", style="Board.Treeview")
+        for column in columns:
+            tree.heading(column, text=column.upper())
+            tree.column(column, width=160 if column == "status" else 110, anchor="w")
+        tree.pack(fill=BOTH, expand=True)
+        return tree
+
+    def _patch(self, flight_ids, now):
+        for flight_id in flight_ids:
+            iid = str(flight_id)
+            self.departures.set_row(iid, self.model.departure_row(flight_id, now))
+            self.arrivals.set_row(iid, self.model.arrival_row(flight_id, now))
+
+    def refresh_all(self):
+        """Recompute every row from memory; only changed items are touched."""
+        now = self.clock()
+        shown = {int(iid) for iid in self.departures.rows} | {int(iid) for iid in self.arrivals.rows}
+        self._patch(shown | set(self.model.flights), now)
+
+    def poll(self):
+        """One tick: usually a single PRAGMA and nothing else."""
+        changed = self.model.poll(self.conn)
+        now = self.clock()
+        if changed is None or now != self.minute:
+            # Reloaded, or statuses and the time window moved on
+            self.minute = now
+            self.refresh_all()
+            self._show_status(now)
+        elif changed:
+            self._patch(changed, now)
+            self._show_status(now)
+        self.job = self.window.after(self.poll_ms, self.poll)
+
+    def _show_status(self, now):
+        self.status.config(text=f"Updated {from_minutes(now)}  -  "
+                                f"{len(self.departures.rows)} departures, "
+                                f"{len(self.arrivals.rows)} arrivals")
+
+    def close(self):
+        self.window.after_cancel(self.job)
+        self.conn.close()
+        self.window.destroy()
+
+
+def open_board(master=None, airport=None, db_path=DB_PATH, fullscreen=True):
+    """Open the board in a new window (a Toplevel of master, if given)."""
+    window = Toplevel(master) if master is not None else Tk()
+    window.geometry("1200x720")
+    if fullscreen:
+        window.attributes("-fullscreen", True)
+    return DepartureBoard(window, airport, db_path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Live departures and arrivals board.")
+    parser.add_argument("airport", nargs="?", help="only departures from / arrivals to this airport")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--windowed", action="store_true")
+    args = parser.parse_args()
+
+    board = open_board(airport=args.airport, db_path=args.db, fullscreen=not args.windowed)
+    board.window.mainloop()
@@ -0,0 +1,257 @@
+# ----------------------------------------
+# Airline Management System - Flight Cache
+# ----------------------------------------
+# Read-through, in-process cache of flight records for search().
+#
+# - Keyed by flight_number and by id, LRU eviction with a size cap
+# - "No such flight" answers are cached too
+# - PRAGMA data_version on the cache's own connection changes whenever
+#   any other connection (this process or another app instance) commits
+#   to the file. Checking it before every lookup costs microseconds; only
+#   when it moved are the flights records of the change feed
+#   (change_feed.py) read, and only those flights are dropped. Bookings,
+#   passengers and other writes leave the cache alone
+# - Flight add/update/delete in this process also drop the entry
+#   directly through flight_events
+# - Hit rate and lookup latency are kept in stats()
+# ----------------------------------------
+
+import sqlite3
+import time
+from collections import OrderedDict
+
+import change_feed
+import flight_events
+
+DB_PATH = 'airline_management.db'
+
+# Maximum number of cached lookups
+MAX_ENTRIES = 1024
+
+_MISSING = object()
+
+
+class FlightCache:
+    """LRU cache of flight rows (id, flight_number, origin, destination, departure, arrival)."""
+
+    def __init__(self, db_path=DB_PATH, max_entries=MAX_ENTRIES):
+        self.conn = sqlite3.connect(db_path)
+        self.max_entries = max_entries
+        self.entries = OrderedDict()   # ("number", flight_number) / ("id", id) -> rows
+        self.version = self._data_version()
+        self.seq = change_feed.last_seq(self.conn)
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.hit_seconds = 0.0
+        self.miss_seconds = 0.0
+
+    def _data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check_version(self):
+        version = self._data_version()
+        if version == self.version:
+            return
+        self.version = version
+        flight_ids = set()
+        try:
+            while True:
+                changes = change_feed.read_changes(self.conn, self.seq)
+                if not changes:
+                    break
+                self.seq = changes[-1][0]
+                flight_ids.update(row_id for _, table_name, row_id, _ in changes
+                                  if table_name == "flights")
+        except change_feed.ChangesPruned:
+            self.seq = change_feed.last_seq(self.conn)
+            if self.entries:
+                self.entries.clear()
+                self.invalidations += 1
+            return
+        if flight_ids and self.entries:
+            self._forget_ids(flight_ids)
+
+    def _forget_ids(self, flight_ids):
+        """Drop the cached lookups of these flight ids, before and after the change."""
+        stale = {("id", flight_id) for flight_id in flight_ids}
+        # Cached rows carry the old number (update, delete) ...
+        stale.update(key for key, rows in self.entries.items()
+                     if any(row[0] in flight_ids for row in rows))
+        # ... the table has the new one (insert, renumbering), perhaps cached as missing
+        flight_ids = sorted(flight_ids)
+        for start in range(0, len(flight_ids), 500):
+            chunk = flight_ids[start:start + 500]
+            stale.update(("number", flight_number) for flight_number, in self.conn.execute(f'''
+                SELECT flight_number FROM flights WHERE id IN ({",".join("?" * len(chunk))})
+            ''', chunk))
+        stale &= self.entries.keys()
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self.invalidations += 1
+
+    def _lookup(self, key, sql, params):
+        start = time.perf_counter()
+        self._check_version()
+
+        rows = self.entries.get(key, _MISSING)
+        if rows is not _MISSING:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.hit_seconds += time.perf_counter() - start
+            return rows
+
+        rows = self.conn.execute(sql, params).fetchall()
+        self.entries[key] = rows
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.misses += 1
+        self.miss_seconds += time.perf_counter() - start
+        return rows
+
+    # -------------------------------
+    # Lookups
+    # -------------------------------
+    def get_by_number(self, flight_number):
+        """First flight with this number, or None."""
+        rows = self._lookup(("number", flight_number), '''
+            SELECT id, flight_number, origin, destination, departure_time, arrival_time
+            FROM flights
+            WHERE flight_number = ?
+        ''', (flight_number,))
+        return rows[0] if rows else None
+
+    def get_by_id(self, flight_id):
+        """Flight with this id, or None."""
+        rows = self._lookup(("id", flight_id), '''
+            SELECT id, flight_number, origin, destination, departure_time, arrival_time
+            FROM flights
+            WHERE id = ?
+        ''', (flight_id,))
+        return rows[0] if rows else None
+
+    # -------------------------------
+    # Invalidation and statistics
+    # -------------------------------
+    def invalidate(self, flight_number):
+        """Drop every cached lookup that involves this flight number."""
+        stale = [key for key, rows in self.entries.items()
+                 if key == ("number", flight_number)
+                 or any(row[1] == flight_number for row in rows)]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self.invalidations += 1
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "avg_hit_us": self.hit_seconds / self.hits * 1e6 if self.hits else 0.0,
+            "avg_miss_us": self.miss_seconds / self.misses * 1e6 if self.misses else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+# -------------------------------
+# Shared cache for the app
+# -------------------------------
+_cache = None
+
+
+def get_flight_cache(db_path=DB_PATH):
+    """Return the shared flight cache, creating it on first use."""
+    global _cache
+    if _cache is None:
+        _cache = FlightCache(db_path)
+    return _cache
+
+
+@flight_events.subscribe
+def flight_changed(conn, flight_number):
+    """Hook for add/update/delete: drop the flight from the shared cache."""
+    if _cache is not None:
+        _cache.invalidate(flight_number)
+
+
+# -------------------------------
+# Benchmark: repeated gate-agent lookups
+# -------------------------------
+if __name__ == "__main__":
+    import os
+    import random
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "cache_bench.db")
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE flights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flight_number VARCHAR NOT NULL,
+            origin VARCHAR NOT NULL,
+            destination VARCHAR NOT NULL,
+            departure_time VARCHAR NOT NULL,
+            arrival_time VARCHAR NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            passenger_id INTEGER NOT NULL,
+            flight_id INTEGER NOT NULL
+        )
+    ''')
+    change_feed.setup_change_feed(conn)
+    conn.executemany('''
+        INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+        VALUES (?, ?, ?, ?, ?)
+    ''', ((f"FL{i}", "LOS", "ABV", "2025-01-01 08:00", "2025-01-01 09:00") for i in range(50_000)))
+    conn.commit()
+
+    random.seed(3)
+    hot = [f"FL{random.randrange(50_000)}" for _ in range(50)]
+    lookups = [random.choice(hot) for _ in range(20_000)]
+
+    start = time.perf_counter()
+    for flight_number in lookups[:1000]:
+        db = sqlite3.connect(path)
+        db.execute("SELECT * FROM flights WHERE flight_number = ?", (flight_number,)).fetchone()
+        db.close()
+    uncached = (time.perf_counter() - start) / 1000 * 1e6
+    print(f"connect + query per lookup (current search()): {uncached:.1f} us")
+
+    cache = FlightCache(path)
+    for i, flight_number in enumerate(lookups):
+        cache.get_by_number(flight_number)
+        if i % 50 == 49:
+            # Counter traffic from other connections: bookings leave the cache alone
+            conn.execute("INSERT INTO bookings (passenger_id, flight_id) VALUES (?, 1)", (i,))
+            conn.commit()
+        if i % 5000 == 4999:
+            # Another instance changes a hot flight
+            conn.execute("UPDATE flights SET departure_time = ? WHERE flight_number = ?",
+                         (str(i), flight_number))
+            conn.commit()
+    print(cache.stats())
+
+    # Changed, added and deleted flights are seen through the feed
+    conn.execute("UPDATE flights SET origin = 'KAN' WHERE flight_number = ?", (hot[0],))
+    conn.commit()
+    assert cache.get_by_number(hot[0])[2] == "KAN"
+    missing = cache.get_by_number("NEW1")
+    conn.execute("INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time) "
+                 "VALUES ('NEW1', 'LOS', 'ABV', '2025-01-01 08:00', '2025-01-01 09:00')")
+    conn.commit()
+    assert missing is None and cache.get_by_number("NEW1") is not None
+    conn.execute("DELETE FROM flights WHERE flight_number = ?", (hot[1],))
+    conn.commit()
+    assert cache.get_by_number(hot[1]) is None
+    print("Invalidation checks passed")
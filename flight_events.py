@@ -0,0 +1,23 @@
+# ----------------------------------------
+# Airline Management System - Flight Change Hooks
+# ----------------------------------------
+# The admin panels add, update and delete flights by flight number.
+# Anything that keeps flight data in memory (route graph, caches, ...)
+# subscribes here and is told which flight number changed, instead of
+# each panel calling every module by hand.
+# ----------------------------------------
+
+_subscribers = []
+
+
+def subscribe(callback):
+    """Register callback(conn, flight_number) to run after a flight changes."""
+    if callback not in _subscribers:
+        _subscribers.append(callback)
+    return callback
+
+
+def flight_changed(conn, flight_number):
+    """Notify every subscriber; call after the change has been committed."""
+    for callback in _subscribers:
+        callback(conn, flight_number)
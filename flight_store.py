@@ -0,0 +1,234 @@
+# ----------------------------------------
+# Airline Management System - Compact Flight Store
+# ----------------------------------------
+# Holds a full season's schedule (500k+ flights) in memory for
+# departure boards and search, in a fraction of the memory a list of
+# sqlite row tuples takes.
+#
+# Columnar layout:
+# - airport codes are interned into a small table and stored as
+#   2-byte indexes (array 'H')
+# - departure/arrival times are minutes since the epoch (array 'l')
+# - flight numbers are packed into one NUL-separated bytearray with an
+#   array of offsets, instead of one str object per flight
+# - ids are an array 'q'
+#
+# Rows are materialised on demand as lightweight __slots__ records.
+#
+#   python flight_store.py 500000   # memory benchmark vs list-of-tuples
+# ----------------------------------------
+
+import sqlite3
+from array import array
+from bisect import bisect_left, bisect_right
+
+from flight_times import to_minutes, from_minutes
+
+DB_PATH = 'airline_management.db'
+
+
+class FlightRecord:
+    """One flight, materialised from the store."""
+
+    __slots__ = ("id", "flight_number", "origin", "destination", "departure", "arrival")
+
+    def __init__(self, id, flight_number, origin, destination, departure, arrival):
+        self.id = id
+        self.flight_number = flight_number
+        self.origin = origin
+        self.destination = destination
+        self.departure = departure
+        self.arrival = arrival
+
+    def __repr__(self):
+        return (f"FlightRecord({self.flight_number} {self.origin}->{self.destination} "
+                f"{from_minutes(self.departure)})")
+
+
+class FlightStore:
+    """Columnar, append-only store of flights sorted by departure on demand."""
+
+    def __init__(self):
+        self.ids = array("q")
+        self.number_blob = bytearray(b"\0")
+        self.number_offsets = array("L")
+        self.origins = array("H")
+        self.destinations = array("H")
+        self.departures = array("l")
+        self.arrivals = array("l")
+
+        self.airports = []       # index -> code
+        self.airport_index = {}  # code -> index
+        self.skipped = 0
+        self._order = None       # row positions sorted by departure
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _airport(self, code):
+        code = code.strip().upper()
+        index = self.airport_index.get(code)
+        if index is None:
+            index = len(self.airports)
+            self.airports.append(code)
+            self.airport_index[code] = index
+        return index
+
+    def append(self, flight_id, flight_number, origin, destination, departure_time, arrival_time):
+        """Add one flight; rows whose times cannot be parsed are skipped."""
+        departure = to_minutes(departure_time)
+        arrival = to_minutes(arrival_time)
+        if departure is None or arrival is None:
+            self.skipped += 1
+            return False
+        self.ids.append(flight_id)
+        self.number_offsets.append(len(self.number_blob))
+        self.number_blob += flight_number.encode() + b"\0"
+        self.origins.append(self._airport(origin))
+        self.destinations.append(self._airport(destination))
+        self.departures.append(departure)
+        self.arrivals.append(arrival)
+        self._order = None
+        return True
+
+    def load(self, conn, batch_size=10_000):
+        """Stream every flight from the database into the store."""
+        cursor = conn.execute('''
+            SELECT id, flight_number, origin, destination, departure_time, arrival_time
+            FROM flights
+        ''')
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                self.append(*row)
+        return self
+
+    def flight_number(self, position):
+        start = self.number_offsets[position]
+        end = self.number_blob.index(0, start)
+        return self.number_blob[start:end].decode()
+
+    def record(self, position):
+        """Materialise the flight at a row position."""
+        return FlightRecord(self.ids[position], self.flight_number(position),
+                            self.airports[self.origins[position]],
+                            self.airports[self.destinations[position]],
+                            self.departures[position], self.arrivals[position])
+
+    # -------------------------------
+    # Board and search queries
+    # -------------------------------
+    def _sorted(self):
+        if self._order is None:
+            departures = self.departures
+            self._order = array("l", sorted(range(len(departures)), key=departures.__getitem__))
+            self._sorted_departures = array("l", (departures[i] for i in self._order))
+        return self._order
+
+    def departures_between(self, start, end, origin=None):
+        """Flights departing in [start, end) minutes, optionally from one airport."""
+        order = self._sorted()
+        low = bisect_left(self._sorted_departures, start)
+        high = bisect_right(self._sorted_departures, end - 1)
+        wanted = None if origin is None else self.airport_index.get(origin.strip().upper(), -1)
+        records = []
+        for position in order[low:high]:
+            if wanted is None or self.origins[position] == wanted:
+                records.append(self.record(position))
+        return records
+
+    def find_number(self, flight_number):
+        """All flights with this flight number (a C-level scan of the packed numbers)."""
+        needle = b"\0" + flight_number.encode() + b"\0"
+        records = []
+        index = self.number_blob.find(needle)
+        while index != -1:
+            records.append(self.record(bisect_left(self.number_offsets, index + 1)))
+            index = self.number_blob.find(needle, index + 1)
+        return records
+
+    def nbytes(self):
+        """Approximate memory held by the store."""
+        total = sum(column.itemsize * len(column) for column in
+                    (self.ids, self.number_offsets, self.origins, self.destinations,
+                     self.departures, self.arrivals))
+        total += len(self.number_blob)
+        total += sum(len(code) + 49 for code in self.airports)
+        if self._order is not None:
+            total += 2 * self._order.itemsize * len(self._order)
+        return total
+
+
+# -------------------------------
+# Memory benchmark vs list of tuples
+# -------------------------------
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+    import tracemalloc
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    random.seed(5)
+    airports = ["LOS", "ABV", "PHC", "KAN", "ACC", "JFK", "LHR", "DXB", "JNB", "NBO",
+                "CDG", "AMS", "IST", "CAI", "ADD", "DKR", "FRA", "ATL", "ORD", "DOH"]
+    base = to_minutes("2025-04-01 00:00")
+
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE flights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flight_number VARCHAR NOT NULL,
+            origin VARCHAR NOT NULL,
+            destination VARCHAR NOT NULL,
+            departure_time VARCHAR NOT NULL,
+            arrival_time VARCHAR NOT NULL
+        )
+    ''')
+
+    def rows():
+        for i in range(count):
+            origin, destination = random.sample(airports, 2)
+            dep = base + random.randint(0, 180 * 24 * 60)
+            yield (f"PX{i:06d}", origin, destination, from_minutes(dep),
+                   from_minutes(dep + random.randint(45, 900)))
+
+    conn.executemany('''
+        INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows())
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    naive = conn.execute("SELECT * FROM flights").fetchall()
+    naive_seconds = time.perf_counter() - start
+    naive_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del naive
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = FlightStore().load(conn)
+    store_seconds = time.perf_counter() - start
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{count} flights")
+    print(f"list of tuples: {naive_bytes / 1e6:7.1f} MB ({naive_bytes / count:.0f} B/flight), "
+          f"loaded in {naive_seconds:.2f} s")
+    print(f"FlightStore:    {store_bytes / 1e6:7.1f} MB ({store_bytes / count:.0f} B/flight), "
+          f"loaded in {store_seconds:.2f} s")
+
+    start = time.perf_counter()
+    matches = store.find_number(f"PX{count // 2:06d}")
+    print(f"flight number lookup: {matches} in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    start = time.perf_counter()
+    board = store.departures_between(base + 24 * 60, base + 24 * 60 + 120, origin="LOS")
+    print(f"2-hour LOS board: {len(board)} flights in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms (first call sorts the index)")
+    start = time.perf_counter()
+    board = store.departures_between(base + 48 * 60, base + 48 * 60 + 120, origin="LOS")
+    print(f"next board:       {len(board)} flights in {(time.perf_counter() - start) * 1000:.2f} ms")
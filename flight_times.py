@@ -0,0 +1,62 @@
+# ----------------------------------------
+# Airline Management System - Flight Time Helpers
+# ----------------------------------------
+# departure_time and arrival_time are stored as free text (VARCHAR),
+# so anything that needs to compare or sort flights by time goes
+# through these helpers first.
+#
+# Times are converted to whole minutes since the Unix epoch, which is
+# cheap to compare, store in heaps and pack into arrays.
+# ----------------------------------------
+
+from datetime import datetime, timezone
+
+# Formats accepted in the departure/arrival entry fields
+TIME_FORMATS = (
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%d/%m/%Y %H:%M",
+)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_minutes(text):
+    """
+    Convert a stored flight time into minutes since the epoch.
+    Returns None if the text is empty or not in a recognised format.
+    """
+    if not text:
+        return None
+    text = str(text).strip()
+    try:
+        # Fast path for the ISO formats, which is what the app stores
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        parsed = None
+    if parsed is not None and parsed.tzinfo is None:
+        return int((parsed - _EPOCH).total_seconds() // 60)
+    for fmt in TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return int((parsed - _EPOCH).total_seconds() // 60)
+    return None
+
+
+def from_minutes(minutes):
+    """Format minutes since the epoch back into 'YYYY-MM-DD HH:MM'."""
+    return datetime.fromtimestamp(minutes * 60, tz=timezone.utc).strftime("%Y-%m-%d %H:%M")
+
+
+def now_seconds():
+    """Current local time in seconds since the epoch (same clock as stored times)."""
+    return (datetime.now() - _EPOCH).total_seconds()
+
+
+def now_minutes():
+    """Current local time in minutes since the epoch (same clock as stored times)."""
+    return int(now_seconds() // 60)
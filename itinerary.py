@@ -0,0 +1,305 @@
+# ----------------------------------------
+# Airline Management System - Itinerary Finder
+# ----------------------------------------
+# Answers "how do I get from ABV to JFK" by chaining flights.
+#
+# - Builds an adjacency index from the flights table:
+#     origin -> departures sorted by departure time
+# - Runs a time-dependent shortest-path search (earliest arrival)
+#   with a minimum connection time and a hop limit
+# - The graph is cached per process and updated incrementally
+#   when a flight is added, updated or deleted
+# ----------------------------------------
+
+import heapq
+import sqlite3
+import time
+from bisect import bisect_left, insort
+
+import flight_events
+from flight_times import to_minutes, from_minutes
+
+DB_PATH = 'airline_management.db'
+
+# Default minimum connection time between two flights (minutes)
+MIN_CONNECTION_MINUTES = 45
+
+# Default maximum number of flights in one itinerary
+MAX_HOPS = 3
+
+# Longest wait at an airport before a connecting flight (minutes)
+MAX_WAIT_MINUTES = 24 * 60
+
+
+class FlightGraph:
+    """In-memory connection graph of all flights with parseable times."""
+
+    def __init__(self):
+        self.flights = {}      # flight id -> (flight_number, origin, destination, dep, arr)
+        self.departures = {}   # origin -> sorted list of (dep, flight id)
+        self.by_number = {}    # flight_number -> set of flight ids
+        self.skipped = 0       # rows whose times could not be parsed
+
+    # -------------------------------
+    # Building and incremental updates
+    # -------------------------------
+    def load(self, conn):
+        """(Re)build the graph from every row in the flights table."""
+        self.flights.clear()
+        self.departures.clear()
+        self.by_number.clear()
+        self.skipped = 0
+
+        cursor = conn.execute('''
+            SELECT id, flight_number, origin, destination, departure_time, arrival_time
+            FROM flights
+        ''')
+        for row in cursor:
+            self.add_flight(row, keep_sorted=False)
+
+        for departures in self.departures.values():
+            departures.sort()
+
+    def add_flight(self, row, keep_sorted=True):
+        """Add one (id, flight_number, origin, destination, departure, arrival) row."""
+        flight_id, flight_number, origin, destination, departure_time, arrival_time = row
+        dep = to_minutes(departure_time)
+        arr = to_minutes(arrival_time)
+        if dep is None or arr is None or arr < dep:
+            self.skipped += 1
+            return False
+
+        if flight_id in self.flights:
+            self.remove_flight(flight_id)
+
+        origin = origin.strip().upper()
+        destination = destination.strip().upper()
+        self.flights[flight_id] = (flight_number, origin, destination, dep, arr)
+        self.by_number.setdefault(flight_number, set()).add(flight_id)
+
+        departures = self.departures.setdefault(origin, [])
+        if keep_sorted:
+            insort(departures, (dep, flight_id))
+        else:
+            departures.append((dep, flight_id))
+        return True
+
+    def remove_flight(self, flight_id):
+        """Remove one flight from the graph, if present."""
+        flight = self.flights.pop(flight_id, None)
+        if flight is None:
+            return False
+
+        flight_number, origin, _, dep, _ = flight
+        departures = self.departures[origin]
+        index = bisect_left(departures, (dep, flight_id))
+        if index < len(departures) and departures[index] == (dep, flight_id):
+            del departures[index]
+        if not departures:
+            del self.departures[origin]
+
+        ids = self.by_number.get(flight_number)
+        if ids is not None:
+            ids.discard(flight_id)
+            if not ids:
+                del self.by_number[flight_number]
+        return True
+
+    def refresh_flight_number(self, conn, flight_number):
+        """
+        Re-read every row with this flight number and patch the graph.
+        The admin panel adds, updates and deletes by flight number,
+        so this one call covers all three operations.
+        """
+        for flight_id in list(self.by_number.get(flight_number, ())):
+            self.remove_flight(flight_id)
+
+        # A fresh cursor, so the caller's cursor.rowcount is left intact
+        cursor = conn.execute('''
+            SELECT id, flight_number, origin, destination, departure_time, arrival_time
+            FROM flights
+            WHERE flight_number = ?
+        ''', (flight_number,))
+        for row in cursor.fetchall():
+            self.add_flight(row)
+
+    # -------------------------------
+    # Search
+    # -------------------------------
+    def find_itineraries(self, origin, destination, earliest=None,
+                         min_connection=MIN_CONNECTION_MINUTES, max_hops=MAX_HOPS,
+                         limit=3, connection_times=None, max_wait=MAX_WAIT_MINUTES):
+        """
+        Return up to `limit` itineraries from origin to destination,
+        ordered by arrival time. Each itinerary is a list of flight ids.
+
+        earliest         - first allowed departure (minutes since epoch)
+        min_connection   - minimum minutes between arrival and next departure
+        max_hops         - maximum number of flights in one itinerary
+        connection_times - optional {airport: minutes} overrides
+        max_wait         - longest layover (or initial wait) considered
+        """
+        origin = origin.strip().upper()
+        destination = destination.strip().upper()
+        if origin == destination or origin not in self.departures:
+            return []
+        if earliest is None:
+            earliest = self.departures[origin][0][0]
+        connection_times = connection_times or {}
+
+        # Each airport may be settled up to `limit` times, which gives the
+        # `limit` earliest-arriving itineraries without a full enumeration.
+        # Labels are popped by arrival, so a label is only blocked by those
+        # settled with no more hops: a later one with fewer hops left may
+        # still reach airports the earlier ones cannot.
+        settled = {}   # airport -> labels settled there, by hops used
+
+        def settled_within(airport, hops):
+            counts = settled.get(airport)
+            return sum(counts[:hops + 1]) if counts else 0
+
+        results = []
+        counter = 0
+        # (arrival, hops, tie-breaker, airport, path)
+        heap = [(earliest, 0, counter, origin, ())]
+
+        while heap and len(results) < limit:
+            arrival, hops, _, airport, path = heapq.heappop(heap)
+
+            if airport == destination:
+                results.append(list(path))
+                continue
+
+            # A label without hops left cannot expand, so it takes no slot
+            if hops >= max_hops or settled_within(airport, hops) >= limit:
+                continue
+            settled.setdefault(airport, [0] * max_hops)[hops] += 1
+
+            if path:
+                ready = arrival + connection_times.get(airport, min_connection)
+            else:
+                ready = arrival
+            departures = self.departures.get(airport)
+            if not departures:
+                continue
+
+            visited = {self.flights[flight_id][1] for flight_id in path}
+            visited.add(origin)
+            latest = ready + max_wait
+            best_to = {}
+
+            for index in range(bisect_left(departures, (ready, 0)), len(departures)):
+                dep, flight_id = departures[index]
+                if dep > latest:
+                    break
+                _, _, next_airport, _, next_arrival = self.flights[flight_id]
+                if next_airport in visited:
+                    continue
+                if next_airport != destination and (
+                        hops + 1 >= max_hops or settled_within(next_airport, hops + 1) >= limit):
+                    continue
+                # A later departure to the same airport is only worth
+                # exploring if it also gets there earlier.
+                if next_arrival >= best_to.get(next_airport, next_arrival + 1):
+                    continue
+                best_to[next_airport] = next_arrival
+                counter += 1
+                heapq.heappush(heap, (next_arrival, hops + 1, counter,
+                                      next_airport, path + (flight_id,)))
+
+        return results
+
+    def describe(self, itinerary):
+        """Human-readable description of one itinerary."""
+        legs = []
+        for flight_id in itinerary:
+            flight_number, origin, destination, dep, arr = self.flights[flight_id]
+            legs.append(f"{flight_number} {origin} {from_minutes(dep)} -> "
+                        f"{destination} {from_minutes(arr)}")
+        return "\n".join(legs)
+
+
+# -------------------------------
+# Per-process cached graph
+# -------------------------------
+_graph = None
+
+
+def get_flight_graph(db_path=DB_PATH):
+    """Return the cached flight graph, loading it on first use."""
+    global _graph
+    if _graph is None:
+        graph = FlightGraph()
+        conn = sqlite3.connect(db_path)
+        try:
+            graph.load(conn)
+        finally:
+            conn.close()
+        _graph = graph
+    return _graph
+
+
+@flight_events.subscribe
+def flight_changed(conn, flight_number):
+    """Hook for add/update/delete: patch the cached graph if it is loaded."""
+    if _graph is not None:
+        _graph.refresh_flight_number(conn, flight_number)
+
+
+# -------------------------------
+# Benchmark on a synthetic schedule
+# -------------------------------
+if __name__ == "__main__":
+    import random
+
+    # A label that has used all its hops must not block a shorter route:
+    # A->B->C arrives at C first, but only A->C can go on to D
+    graph = FlightGraph()
+    for row in [(1, "AB", "A", "B", "2025-01-01 08:00", "2025-01-01 09:00"),
+                (2, "BC", "B", "C", "2025-01-01 10:00", "2025-01-01 11:00"),
+                (3, "AC", "A", "C", "2025-01-01 08:00", "2025-01-01 12:00"),
+                (4, "CD", "C", "D", "2025-01-01 14:00", "2025-01-01 15:00")]:
+        graph.add_flight(row)
+    assert graph.find_itineraries("A", "D", max_hops=2, limit=1) == [[3, 4]]
+    assert graph.find_itineraries("A", "D", max_hops=3, limit=2) == [[3, 4], [1, 2, 4]]
+    print("Hop limit checks passed")
+
+    random.seed(7)
+    airports = [f"A{i:02d}" for i in range(80)]
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE flights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flight_number VARCHAR NOT NULL,
+            origin VARCHAR NOT NULL,
+            destination VARCHAR NOT NULL,
+            departure_time VARCHAR NOT NULL,
+            arrival_time VARCHAR NOT NULL
+        )
+    ''')
+    base = to_minutes("2025-01-01 00:00")
+    rows = []
+    for i in range(100_000):
+        origin, destination = random.sample(airports, 2)
+        dep = base + random.randint(0, 30 * 24 * 60)
+        arr = dep + random.randint(60, 600)
+        rows.append((f"FL{i}", origin, destination, from_minutes(dep), from_minutes(arr)))
+    conn.executemany('''
+        INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows)
+
+    graph = FlightGraph()
+    start = time.perf_counter()
+    graph.load(conn)
+    print(f"Loaded {len(graph.flights)} flights in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    queries = 200
+    start = time.perf_counter()
+    found = 0
+    for _ in range(queries):
+        origin, destination = random.sample(airports, 2)
+        earliest = base + random.randint(0, 29 * 24 * 60)
+        found += bool(graph.find_itineraries(origin, destination, earliest))
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{queries} queries, {found} answered, {elapsed / queries:.2f} ms per query")
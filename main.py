@@ -1,16 +1,31 @@
-from gtts import gTTS
 from tkinter import *
 import tkinter.messagebox as messagebox
 import sqlite3
-import os
-import pygame
+import slow_query_log
+import speech
+import passenger_search
+import passport_index
+import booking_conflicts
+import waitlist
+import maintenance
+import change_feed
+import itinerary  # keeps the route graph in sync through flight_events
+import flight_events
+import flight_cache
+import autocomplete
+import audit_log
+import announcer
+import archive
 from PIL import ImageTk,Image
-import random
 
 # Initialize SQLite database.
 def setup_database():
-    conn = sqlite3.connect('airline_management.db')
+    conn = slow_query_log.connect('airline_management.db')
     cursor = conn.cursor()
+
+    # Free pages are reclaimed in small slices (see maintenance.py);
+    # only takes effect when the database file is new
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
     
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS flights (
@@ -22,6 +37,11 @@ def setup_database():
             arrival_time VARCHAR NOT NULL
         )
     ''')
+
+    # Lookups, updates and deletes by flight number (see query_plans.py)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_flights_number ON flights (flight_number)
+    ''')
     
      # Create passengers table
     cursor.execute('''
@@ -46,6 +66,18 @@ def setup_database():
             FOREIGN KEY(flight_id) REFERENCES flights(id)
         )
     ''')
+
+    # Full-text passenger lookup index (see passenger_search.py)
+    passenger_search.setup_passenger_search(conn)
+
+    # Capacity and waitlist tables (see waitlist.py)
+    waitlist.setup_waitlist(conn)
+
+    # Change counters that trigger ANALYZE (see maintenance.py)
+    maintenance.setup_maintenance(conn)
+
+    # Change records for boards, caches and exports (see change_feed.py)
+    change_feed.setup_change_feed(conn)
     
     conn.commit()
     conn.close()
@@ -54,19 +86,11 @@ setup_database()
     
 # Text-to-Speech function
 def text_to_speech(text):
-    tts = gTTS(text=text, lang='en')
-    audio_file = "flight_info.mp3"
-    tts.save(audio_file)
-    
-    pygame.mixer.init()
-    pygame.mixer.music.load(audio_file)
-    pygame.mixer.music.play()
-    
-    while pygame.mixer.music.get_busy():  # Wait until the audio finishes playing
-        continue
-    
-    pygame.mixer.quit()  # Properly quit the mixer
-    os.remove(audio_file)  # Remove the audio file after playing
+    # Synthesised sentence by sentence; playback starts with the first one
+    speech.speak(text)
+
+# Announcements are spoken by a background thread, bursts merged into one
+announcements = announcer.Announcer(text_to_speech)
 
 # Function to switch to the correct frame based on user role
 def login():
@@ -74,8 +98,10 @@ def login():
     password = password_entry.get()
 
     if email == "attendant@planexpress.com" and password == "password123":
+        audit_log.set_actor(email)
         show_left_frame()
     elif email == "admin@planetip.com" and password == "adminpass":
+        audit_log.set_actor(email)
         show_right_frame()
     else:
         message_label.config(text="Invalid credentials, please try again.")
@@ -100,7 +126,7 @@ def add():
     arrival_time = arrival_time_entry.get()
 
     if flight_number and origin and destination and departure_time and arrival_time:
-        conn = sqlite3.connect('airline_management.db')
+        conn = slow_query_log.connect('airline_management.db')
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -109,12 +135,16 @@ def add():
         ''', (flight_number, origin, destination, departure_time, arrival_time))
         
         conn.commit()
+        flight_events.flight_changed(conn, flight_number)
+        audit_log.record("insert", "flights", flight_number, after={
+            "flight_number": flight_number, "origin": origin, "destination": destination,
+            "departure_time": departure_time, "arrival_time": arrival_time})
         conn.close()
         messagebox.showinfo("Success", "Flight added successfully!")
         
         # Text-to-Speech
         flight_info = f"Flight {flight_number} from {origin} to {destination} has been successfully added. Departure at {departure_time} and arrival at {arrival_time}."
-        text_to_speech(flight_info)
+        announcements.announce(flight_info, kind="added", flight_number=flight_number, origin=origin)
         
         clear_entries()
     else:
@@ -125,23 +155,20 @@ def search():
     flight_number = flight_number_entry.get()
 
     if flight_number:
-        conn = sqlite3.connect('airline_management.db')
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT flight_number, origin, destination, departure_time, arrival_time
-            FROM flights
-            WHERE flight_number = ?
-        ''', (flight_number,))
-        
-        result = cursor.fetchone()
-        conn.close()
+        # Served from memory unless the flights table has changed
+        result = flight_cache.get_flight_cache().get_by_number(flight_number)
 
         if result:
-            flight_info = f"Flight {result[0]} from {result[1]} to {result[2]} departs at {result[3]} and arrives at {result[4]}."
-            text_to_speech(flight_info)
+            flight_info = f"Flight {result[1]} from {result[2]} to {result[3]} departs at {result[4]} and arrives at {result[5]}."
+            announcements.announce(flight_info, kind="info", flight_number=result[1])
         else:
-            messagebox.showinfo("Not Found", "No flight found with that flight number.")
+            # Departed flights are moved to the archive (see archive.py)
+            archived = archive.find_archived_flight(flight_number)
+            if archived:
+                messagebox.showinfo("Archived", f"Flight {archived[1]} from {archived[2]} to {archived[3]} "
+                                                f"departed at {archived[4]} and has been archived.")
+            else:
+                messagebox.showinfo("Not Found", "No flight found with that flight number.")
     else:
         messagebox.showinfo("Alert", "Please enter a flight number to search.")
 
@@ -154,9 +181,11 @@ def update():
     arrival_time = arrival_time_entry.get()
 
     if flight_number and origin and destination and departure_time and arrival_time:
-            conn = sqlite3.connect('airline_management.db')
+            conn = slow_query_log.connect('airline_management.db')
             cursor = conn.cursor()
 
+            before = audit_log.rows_as_dicts(conn, "SELECT * FROM flights WHERE flight_number = ?", (flight_number,))
+
             cursor.execute('''
                 UPDATE flights 
                 SET origin = ?, destination = ?, departure_time = ?, arrival_time = ? 
@@ -164,6 +193,11 @@ def update():
             ''', (origin, destination, departure_time, arrival_time, flight_number))
 
             conn.commit()
+            flight_events.flight_changed(conn, flight_number)
+            for row in before:
+                audit_log.record("update", "flights", flight_number, before=row, after=dict(
+                    row, origin=origin, destination=destination,
+                    departure_time=departure_time, arrival_time=arrival_time))
 
             if cursor.rowcount > 0:  # Check if any rows were updated
                 messagebox.showinfo("Success", f"Flight {flight_number} updated successfully.")
@@ -171,7 +205,7 @@ def update():
                 flight_info = (f"Flight {flight_number} has been successfully updated. "
                                f"It will now depart from {origin} to {destination} at {departure_time} "
                                f"and arrive at {arrival_time}.")
-                text_to_speech(flight_info)  # Assuming text_to_speech is defined elsewhere
+                announcements.announce(flight_info, kind="updated", flight_number=flight_number, origin=origin)
                 clear_entries()  # Assuming clear_entries is defined elsewhere
             else:
                 messagebox.showinfo("Not Found", "No flight found with that flight number.")
@@ -184,20 +218,26 @@ def delete():
     flight_number = flight_number_entry.get()
 
     if flight_number:
-        conn = sqlite3.connect('airline_management.db')
+        conn = slow_query_log.connect('airline_management.db')
         cursor = conn.cursor()
         
+        before = audit_log.rows_as_dicts(conn, "SELECT * FROM flights WHERE flight_number = ?", (flight_number,))
+
         cursor.execute('''
             DELETE FROM flights WHERE flight_number = ?
         ''', (flight_number,))
         
         conn.commit()
+        flight_events.flight_changed(conn, flight_number)
+        for row in before:
+            audit_log.record("delete", "flights", flight_number, before=row)
         conn.close()
 
-        if cursor.xcount > 0:
+        if cursor.rowcount > 0:
             messagebox.showinfo("Success", f"Flight {flight_number} deleted successfully.")
             flight_info = f"Flight {flight_number} has been successfully deleted."
-            text_to_speech(flight_info)
+            announcements.announce(flight_info, kind="deleted", flight_number=flight_number,
+                                   origin=before[0]["origin"] if before else None)
             clear_entries()
         else:
             messagebox.showinfo("Not Found", "No flight found with that flight number.")
@@ -219,24 +259,32 @@ def save_passenger():
         return
 
     # to connect to the database
-    conn = sqlite3.connect('airline_management.db')
+    conn = slow_query_log.connect('airline_management.db')
     cursor = conn.cursor()
 
-    # to check if the passport number already exists
-    cursor.execute('''
-        SELECT COUNT(*) FROM passengers WHERE passport_number = ?
-    ''', (passport_number,))
-    exists = cursor.fetchone()[0]
+    # to check if the passport number already exists (Bloom filter first,
+    # see passport_index.py)
+    passports = passport_index.get_passport_index()
+    exists = passports.exists(passport_number)
+
+    if not exists:
+        try:
+            cursor.execute('''
+                INSERT INTO passengers (name, age, gender, passport_number, contact_info)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (name, age, gender, passport_number, contact_info))
+        except sqlite3.IntegrityError:
+            # Saved from another terminal since the index last caught up
+            exists = True
 
     if exists:
         messagebox.showerror("Error", "A passenger with this passport number already exists.")
     else:
-        cursor.execute('''
-            INSERT INTO passengers (name, age, gender, passport_number, contact_info)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (name, age, gender, passport_number, contact_info))
-
         conn.commit()
+        passports.add(passport_number)
+        audit_log.record("insert", "passengers", passport_number, after={
+            "name": name, "age": age, "gender": gender,
+            "passport_number": passport_number, "contact_info": contact_info})
         messagebox.showinfo("Success", f"Passenger {name} added successfully.")
         name_entry.delete(0, END)
         age_entry.delete(0, END)
@@ -245,14 +293,9 @@ def save_passenger():
     
     conn.close()
     
-def generate_seat_number():
-    seat_number = f"{random.randint(1, 150):03d}-"  # Generate seat number between 001 and 150
-    seat_row = random.choice(['A', 'B', 'C', 'D'])  # Randomly select a row
-    return seat_number + seat_row
-
 def book_flight(passenger_id, flight_id):
     # Connect to the database
-    conn = sqlite3.connect('airline_management.db')
+    conn = slow_query_log.connect('airline_management.db')
     cursor = conn.cursor()
 
 # Check if the passenger_id is already booked for the given flight_id
@@ -264,23 +307,38 @@ def book_flight(passenger_id, flight_id):
 
     if already_booked:
         messagebox.showwarning("Booking Error", "This passenger is already booked on this flight.")
+    elif waitlist.is_waitlisted(conn, passenger_id, flight_id):
+        messagebox.showwarning("Booking Error", "This passenger is already on the waitlist for this flight.")
     else:
-        # Generate a random seat number only if booking is valid
-        seat_number = generate_seat_number()
-        
-        # Insert the booking data into the bookings table
-        cursor.execute('''
-            INSERT INTO bookings (passenger_id, flight_id, seat_number)
-            VALUES (?, ?, ?)
-        ''', (passenger_id, flight_id, seat_number))
+        # Book a free seat, or waitlist the passenger if the flight is full
+        # (refused if the passenger is on an overlapping flight, checked
+        # under the same write lock as the insert)
+        status, detail = waitlist.book_or_waitlist(
+            conn, passenger_id, flight_id, conflicts=booking_conflicts.get_conflict_index().conflicts)
+        if status == "conflict":
+            conn.rollback()
+            messagebox.showwarning("Booking Error", "This passenger is already booked on overlapping flight(s):\n"
+                                   + booking_conflicts.describe(conn, detail))
+            conn.close()
+            return
+
+        # Commit the changes
+        conn.commit()
+        if status == "booked":
+            audit_log.record("insert", "bookings", f"{passenger_id}/{flight_id}", after={
+                "passenger_id": passenger_id, "flight_id": flight_id, "seat_number": detail})
+        else:
+            audit_log.record("insert", "waitlist", f"{passenger_id}/{flight_id}", after={
+                "passenger_id": passenger_id, "flight_id": flight_id, "position": detail})
 
-    # Commit the changes
-    conn.commit()
-    messagebox.showinfo("Success", f"Flight booked successfully! Seat number: {seat_number}")
+        if status == "waitlisted":
+            messagebox.showinfo("Waitlisted", f"Flight is full. Passenger added to the waitlist at position {detail}.")
+        else:
+            messagebox.showinfo("Success", f"Flight booked successfully! Seat number: {detail or 'assigned at gate'}")
 
-    passport_number_entry.delete(0, END)
-    passenger_id_entry.delete(0, END)
-    flight_id_entry.delete(0, END)
+        passport_number_entry.delete(0, END)
+        passenger_id_entry.delete(0, END)
+        flight_id_entry.delete(0, END)
 
 
     # Close the connection
@@ -359,6 +417,12 @@ destination_entry.place(x=280, y=225)
 departure_time_entry.place(x=280, y=275)
 arrival_time_entry.place(x=280, y=325)
 
+# Type-ahead suggestions from the in-memory flight index
+suggestions = autocomplete.get_suggestions()
+autocomplete.Autocomplete(flight_number_entry, suggestions.flight_numbers)
+for place_entry in (origin_entry, destination_entry):
+    autocomplete.Autocomplete(place_entry, suggestions.places_for)
+
 # Add button for registering flight information
 add_button = Button(right_frame, text="Add Flight", command=add)
 add_button.place(x=180, y=380)
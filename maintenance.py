@@ -0,0 +1,298 @@
+# ----------------------------------------
+# Airline Management System - Storage Maintenance
+# ----------------------------------------
+# Keeps the database file compact and the query planner informed:
+#
+# - Triggers count inserts/updates/deletes per table in change_counts.
+#   Once CHANGE_THRESHOLD changes have piled up, ANALYZE (bounded by
+#   analysis_limit) and PRAGMA optimize are run, and the representative
+#   QUERIES are timed before and after
+# - With auto_vacuum=INCREMENTAL, free pages left by delete()/update()
+#   churn are returned to the OS VACUUM_PAGES at a time, only while
+#   the database is idle (PRAGMA data_version unchanged since the
+#   previous tick), so agents never wait behind a long VACUUM
+# - Acknowledged change feed records (change_feed.py) are pruned
+# - Reports give file size, freelist pages and fragmentation
+#
+# New databases get auto_vacuum=INCREMENTAL from setup_database();
+# an existing file needs one full VACUUM to switch:
+#   python maintenance.py enable-incremental
+#   python maintenance.py report
+#   python maintenance.py run               # ANALYZE + reclaim now
+#   python maintenance.py watch --every 30  # the scheduler, in a terminal
+# ----------------------------------------
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import change_feed
+
+_log = logging.getLogger(__name__)
+
+DB_PATH = 'airline_management.db'
+
+# Changes (all tables) after which statistics are refreshed
+CHANGE_THRESHOLD = 1000
+
+# Pages reclaimed per idle tick
+VACUUM_PAGES = 256
+
+# Seconds between scheduler ticks
+TICK_SECONDS = 30
+
+# Rows sampled per index by ANALYZE (0 = all)
+ANALYSIS_LIMIT = 1000
+
+TRACKED_TABLES = ("flights", "passengers", "bookings")
+
+AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+# Representative lookups timed before and after ANALYZE
+QUERIES = {
+    "flight by number": ("SELECT * FROM flights WHERE flight_number = ?", ("BA123",)),
+    "passport check": ("SELECT COUNT(*) FROM passengers WHERE passport_number = ?", ("A0000000",)),
+    "bookings on flight": ("SELECT COUNT(*) FROM bookings WHERE flight_id = ?", (1,)),
+    "already booked": ("SELECT COUNT(*) FROM bookings WHERE passenger_id = ? AND flight_id = ?", (1, 1)),
+    "passenger bookings": ('''
+        SELECT f.flight_number, b.seat_number
+        FROM bookings b JOIN flights f ON f.id = b.flight_id
+        WHERE b.passenger_id = ?
+    ''', (1,)),
+}
+
+
+def setup_maintenance(conn):
+    """Create the change_counts table and the triggers that maintain it."""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_counts (
+            table_name TEXT PRIMARY KEY,
+            changes INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for table in TRACKED_TABLES:
+        cursor.execute("INSERT OR IGNORE INTO change_counts (table_name) VALUES (?)", (table,))
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_count_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    UPDATE change_counts SET changes = changes + 1 WHERE table_name = '{table}';
+                END
+            ''')
+    conn.commit()
+
+
+def pending_changes(conn):
+    row = conn.execute("SELECT COALESCE(SUM(changes), 0) FROM change_counts").fetchone()
+    return row[0]
+
+
+def storage_report(conn, db_path=DB_PATH):
+    """File size, page counts, freelist and auto_vacuum mode."""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+    return {
+        "file_bytes": os.path.getsize(db_path) if os.path.exists(db_path) else 0,
+        "page_size": page_size,
+        "page_count": page_count,
+        "freelist_pages": freelist,
+        "fragmentation": freelist / page_count if page_count else 0.0,
+        "auto_vacuum": AUTO_VACUUM_MODES.get(mode, mode),
+    }
+
+
+def time_queries(conn, queries=QUERIES, repeat=50):
+    """Median milliseconds of each query (missing tables are skipped)."""
+    timings = {}
+    for name, (sql, params) in queries.items():
+        samples = []
+        try:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                conn.execute(sql, params).fetchall()
+                samples.append(time.perf_counter() - start)
+        except sqlite3.OperationalError:
+            continue
+        samples.sort()
+        timings[name] = samples[len(samples) // 2] * 1000
+    return timings
+
+
+def analyze(conn, analysis_limit=ANALYSIS_LIMIT):
+    """Refresh planner statistics and reset the change counters. Returns before/after timings."""
+    before = time_queries(conn)
+    start = time.perf_counter()
+    conn.execute(f"PRAGMA analysis_limit = {int(analysis_limit)}")
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA optimize")
+    conn.execute("UPDATE change_counts SET changes = 0")
+    conn.commit()
+    seconds = time.perf_counter() - start
+    return {"seconds": seconds, "before_ms": before, "after_ms": time_queries(conn)}
+
+
+def reclaim(conn, pages=VACUUM_PAGES):
+    """Return up to `pages` free pages to the OS. Returns the number reclaimed."""
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return 0
+    freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    if not freelist:
+        return 0
+    # The pragma frees one page per step; execute() would only step it
+    # once, executescript() runs it to the end
+    conn.executescript(f"PRAGMA incremental_vacuum({int(pages)});")
+    return freelist - conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+def enable_incremental_vacuum(conn):
+    """Switch an existing database to auto_vacuum=INCREMENTAL (runs one full VACUUM)."""
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+
+
+class MaintenanceScheduler:
+    """Background thread running ANALYZE after heavy change and reclaiming pages when idle."""
+
+    def __init__(self, db_path=DB_PATH, threshold=CHANGE_THRESHOLD, pages=VACUUM_PAGES,
+                 tick_seconds=TICK_SECONDS, on_report=None):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.pages = pages
+        self.tick_seconds = tick_seconds
+        self.on_report = on_report or print_report
+        self.conn = None
+        self.version = None
+        self.reclaimed = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def tick(self):
+        """One maintenance pass. Returns what was done: 'analyze', 'reclaim' or None."""
+        if self.conn is None:
+            # Created here, so it belongs to the thread that runs the ticks
+            self.conn = sqlite3.connect(self.db_path)
+            setup_maintenance(self.conn)
+            change_feed.setup_change_feed(self.conn)
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        idle = version == self.version
+        self.version = version
+
+        # Change feed records every consumer has acknowledged
+        change_feed.prune(self.conn)
+
+        if pending_changes(self.conn) >= self.threshold:
+            report = storage_report(self.conn, self.db_path)
+            report.update(analyze(self.conn))
+            self.on_report(report)
+            return "analyze"
+        if idle:
+            reclaimed = reclaim(self.conn, self.pages)
+            if reclaimed:
+                self.reclaimed += reclaimed
+                return "reclaim"
+        return None
+
+    def _run(self):
+        while not self._stop.wait(self.tick_seconds):
+            try:
+                self.tick()
+            except sqlite3.Error as e:
+                if isinstance(e, sqlite3.OperationalError) and "locked" in str(e):
+                    # Busy: another terminal is writing, try again next tick
+                    _log.warning("Maintenance skipped: %s", e)
+                    continue
+                _log.exception("Maintenance tick failed; reconnecting on the next tick")
+                if self.conn is not None:
+                    self.conn.close()
+                    self.conn = None
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="maintenance", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(10)
+            self._thread = None
+
+
+_scheduler = None
+
+
+def start_maintenance(db_path=DB_PATH):
+    """Start the shared maintenance scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = MaintenanceScheduler(db_path).start()
+    return _scheduler
+
+
+def print_report(report):
+    print(f"File:      {report['file_bytes'] / 1e6:.2f} MB "
+          f"({report['page_count']} pages of {report['page_size']} B)")
+    print(f"Freelist:  {report['freelist_pages']} pages "
+          f"({report['fragmentation'] * 100:.1f}% of the file), auto_vacuum={report['auto_vacuum']}")
+    if "before_ms" in report:
+        print(f"ANALYZE:   {report['seconds'] * 1000:.0f} ms")
+        for name, before in report["before_ms"].items():
+            after = report["after_ms"].get(name, before)
+            print(f"  {name:<20} {before:8.3f} ms -> {after:8.3f} ms")
+    for name, ms in report.get("timings_ms", {}).items():
+        print(f"  {name:<20} {ms:8.3f} ms")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Storage maintenance for the airline database.")
+    parser.add_argument("command", choices=["report", "run", "watch", "enable-incremental"])
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--every", type=float, default=TICK_SECONDS, help="seconds between ticks")
+    parser.add_argument("--threshold", type=int, default=CHANGE_THRESHOLD)
+    parser.add_argument("--pages", type=int, default=VACUUM_PAGES)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    setup_maintenance(conn)
+    if args.command == "report":
+        report = storage_report(conn, args.db)
+        report["timings_ms"] = time_queries(conn)
+        print_report(report)
+        print(f"Changes since last ANALYZE: {pending_changes(conn)}")
+    elif args.command == "enable-incremental":
+        before = storage_report(conn, args.db)
+        enable_incremental_vacuum(conn)
+        after = storage_report(conn, args.db)
+        print(f"auto_vacuum {before['auto_vacuum']} -> {after['auto_vacuum']}, "
+              f"{before['file_bytes'] / 1e6:.2f} MB -> {after['file_bytes'] / 1e6:.2f} MB")
+    elif args.command == "run":
+        report = storage_report(conn, args.db)
+        report.update(analyze(conn))
+        reclaimed = 0
+        while True:
+            step = reclaim(conn, args.pages)
+            if not step:
+                break
+            reclaimed += step
+        print_report(report)
+        print(f"Reclaimed: {reclaimed} pages, now {storage_report(conn, args.db)['file_bytes'] / 1e6:.2f} MB")
+    else:
+        scheduler = MaintenanceScheduler(args.db, args.threshold, args.pages, args.every)
+        scheduler.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            scheduler.stop()
+    conn.close()
@@ -0,0 +1,234 @@
+# ----------------------------------------
+# Airline Management System - Passenger Lookup
+# ----------------------------------------
+# Full-text and typo-tolerant search over the passengers table,
+# e.g. "Adeyemi 4471" finds Adeyemi whose passport ends in 4471.
+#
+# - An FTS5 index (trigram tokenizer) over name, passport_number and
+#   contact_info, kept in sync with passengers by triggers
+# - Exact search: every word must appear somewhere in the record
+#   (substring match, so passport suffixes work)
+# - Fuzzy search: when nothing matches exactly, candidates sharing
+#   an untouched fragment of a word are re-ranked by string similarity
+#
+# If the SQLite build has no FTS5 the lookup falls back to LIKE scans.
+# ----------------------------------------
+
+import re
+import sqlite3
+import time
+from difflib import SequenceMatcher
+
+DB_PATH = 'airline_management.db'
+
+# Number of candidates re-ranked by the fuzzy search
+FUZZY_CANDIDATES = 200
+
+# Minimum similarity (0..1) for a fuzzy match to be returned
+FUZZY_THRESHOLD = 0.6
+
+
+def setup_passenger_search(conn):
+    """
+    Create the passengers_fts index and its sync triggers.
+    Returns False if this SQLite build does not support FTS5.
+    """
+    cursor = conn.cursor()
+    exists = cursor.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'passengers_fts'"
+    ).fetchone()[0]
+
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS passengers_fts USING fts5(
+                name, passport_number, contact_info,
+                content='passengers', content_rowid='id',
+                tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        return False
+
+    cursor.executescript('''
+        CREATE TRIGGER IF NOT EXISTS passengers_fts_insert AFTER INSERT ON passengers BEGIN
+            INSERT INTO passengers_fts (rowid, name, passport_number, contact_info)
+            VALUES (new.id, new.name, new.passport_number, new.contact_info);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS passengers_fts_delete AFTER DELETE ON passengers BEGIN
+            INSERT INTO passengers_fts (passengers_fts, rowid, name, passport_number, contact_info)
+            VALUES ('delete', old.id, old.name, old.passport_number, old.contact_info);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS passengers_fts_update AFTER UPDATE ON passengers BEGIN
+            INSERT INTO passengers_fts (passengers_fts, rowid, name, passport_number, contact_info)
+            VALUES ('delete', old.id, old.name, old.passport_number, old.contact_info);
+            INSERT INTO passengers_fts (rowid, name, passport_number, contact_info)
+            VALUES (new.id, new.name, new.passport_number, new.contact_info);
+        END;
+    ''')
+
+    # Index passengers saved before the index existed
+    if not exists:
+        cursor.execute("INSERT INTO passengers_fts (passengers_fts) VALUES ('rebuild')")
+
+    conn.commit()
+    return True
+
+
+def _has_fts(conn):
+    return conn.execute(
+        "SELECT COUNT(*) FROM sqlite_master WHERE name = 'passengers_fts'"
+    ).fetchone()[0] > 0
+
+
+def _words(query):
+    """Split a query like 'Adeyemi, 4471' into lower-case words."""
+    return [word for word in re.split(r"[^\w@.+-]+", query.lower()) if word]
+
+
+def _quote(word):
+    return '"' + word.replace('"', '""') + '"'
+
+
+def _fragments(word):
+    """
+    Substrings of a word that survive a single typo: the two halves of a
+    long word (one of them is untouched), or its trigrams if it is short.
+    """
+    if len(word) >= 6:
+        middle = len(word) // 2
+        return {word[:middle], word[middle:]}
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def _similarity(word, row):
+    """Best similarity between a query word and any word of the record."""
+    best = 0.0
+    for field in row[1:4]:
+        for candidate in _words(str(field)):
+            if word in candidate:
+                return 1.0
+            best = max(best, SequenceMatcher(None, word, candidate).ratio())
+    return best
+
+
+def search_passengers(conn, query, limit=20):
+    """
+    Look up passengers by any mix of name, passport number and contact
+    details. Returns rows of (id, name, passport_number, contact_info).
+    """
+    words = _words(query)
+    if not words:
+        return []
+
+    if not _has_fts(conn):
+        return _search_like(conn, words, limit)
+
+    # Trigram MATCH needs at least 3 characters per word; shorter words
+    # are still checked afterwards against the returned records.
+    long_words = [word for word in words if len(word) >= 3]
+    if not long_words:
+        return _search_like(conn, words, limit)
+
+    rows = conn.execute('''
+        SELECT p.id, p.name, p.passport_number, p.contact_info
+        FROM passengers_fts
+        JOIN passengers p ON p.id = passengers_fts.rowid
+        WHERE passengers_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    ''', (" AND ".join(_quote(word) for word in long_words), limit * 5)).fetchall()
+
+    rows = [row for row in rows
+            if all(_similarity(word, row) == 1.0 for word in words)]
+    if rows:
+        return rows[:limit]
+
+    return _search_fuzzy(conn, words, limit)
+
+
+def _search_fuzzy(conn, words, limit):
+    """Typo-tolerant fallback: candidates sharing a fragment, ranked by similarity."""
+    grams = set()
+    for word in words:
+        grams |= _fragments(word)
+    if not grams:
+        return []
+
+    candidates = conn.execute('''
+        SELECT p.id, p.name, p.passport_number, p.contact_info
+        FROM passengers_fts
+        JOIN passengers p ON p.id = passengers_fts.rowid
+        WHERE passengers_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    ''', (" OR ".join(_quote(gram) for gram in sorted(grams)), FUZZY_CANDIDATES)).fetchall()
+
+    scored = []
+    for row in candidates:
+        score = min(_similarity(word, row) for word in words)
+        if score >= FUZZY_THRESHOLD:
+            scored.append((score, row))
+    scored.sort(key=lambda item: -item[0])
+    return [row for _, row in scored[:limit]]
+
+
+def _search_like(conn, words, limit):
+    """Fallback for SQLite builds without FTS5 (full table scan)."""
+    conditions = []
+    params = []
+    for word in words:
+        conditions.append("(name LIKE ? OR passport_number LIKE ? OR contact_info LIKE ?)")
+        params += [f"%{word}%"] * 3
+    params.append(limit)
+    return conn.execute(f'''
+        SELECT id, name, passport_number, contact_info
+        FROM passengers
+        WHERE {" AND ".join(conditions)}
+        LIMIT ?
+    ''', params).fetchall()
+
+
+# -------------------------------
+# Benchmark on synthetic passengers
+# -------------------------------
+if __name__ == "__main__":
+    import random
+    import sys
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    random.seed(11)
+    surnames = ["Adeyemi", "Okafor", "Balogun", "Eze", "Smith", "Johnson", "Ibrahim",
+                "Mensah", "Garcia", "Okonkwo", "Abubakar", "Williams", "Nwosu", "Bello"]
+    given = ["Tunde", "Ngozi", "Ade", "Chioma", "John", "Mary", "Musa", "Kwame",
+             "Amaka", "Emeka", "Fatima", "Grace", "Ifeanyi", "Sade"]
+
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE passengers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            gender TEXT NOT NULL,
+            passport_number TEXT UNIQUE NOT NULL,
+            contact_info TEXT NOT NULL
+        )
+    ''')
+    setup_passenger_search(conn)
+
+    start = time.perf_counter()
+    conn.executemany('''
+        INSERT INTO passengers (name, age, gender, passport_number, contact_info)
+        VALUES (?, ?, ?, ?, ?)
+    ''', ((f"{random.choice(given)} {random.choice(surnames)}{i % 997}",
+           random.randint(1, 90), random.choice("MF"), f"A{i:08d}",
+           f"user{i}@example.com") for i in range(count)))
+    conn.commit()
+    print(f"Inserted {count} passengers in {time.perf_counter() - start:.1f} s")
+
+    for query in ["Adeyemi 4471", "A00004471", "Okonkwo12", "Okonkow12", "user777@"]:
+        start = time.perf_counter()
+        rows = search_passengers(conn, query)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{query!r}: {len(rows)} results in {elapsed:.1f} ms")
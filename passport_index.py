@@ -0,0 +1,331 @@
+# ----------------------------------------
+# Airline Management System - Passport Index
+# ----------------------------------------
+# Answers "is this passport number already registered?" without a
+# SQLite lookup for the common case of a new passenger.
+#
+# - A Bloom filter over every passport number, rebuilt at startup in
+#   one streaming pass over the UNIQUE index on passport_number
+# - "Not in the filter" means definitely new: no query at all
+# - "Maybe in the filter" is confirmed against the UNIQUE index, so a
+#   false positive costs one point lookup and never a wrong answer
+# - Passengers saved by other app instances are added from the change
+#   feed (change_feed.py), read at most every CATCH_UP_SECONDS and only
+#   when PRAGMA data_version on the index's own connection shows a
+#   commit. In that window a passport saved elsewhere can look new;
+#   the UNIQUE constraint still rejects the INSERT, so callers treat
+#   IntegrityError as a duplicate too
+# - filter_new() checks a whole batch (bulk imports) with one IN query
+#   per FILTER_BATCH possible hits
+# - stats() reports memory, the expected false-positive rate and the
+#   false positives actually seen
+#
+#   python passport_index.py                 # report for airline_management.db
+#   python passport_index.py --bench 1000000 # filter vs SQLite vs a Python set
+# ----------------------------------------
+
+import hashlib
+import math
+import sqlite3
+import time
+
+import change_feed
+
+DB_PATH = 'airline_management.db'
+
+# Target false-positive rate of the filter
+ERROR_RATE = 0.01
+
+# Room for growth: the filter is sized for this many times the current rows
+GROWTH = 2
+
+# Smallest capacity, so a new database does not rebuild after a few saves
+MIN_CAPACITY = 100_000
+
+# Possible hits checked per IN query in filter_new()
+FILTER_BATCH = 500
+
+# Minimum interval between checks for passengers saved elsewhere
+CATCH_UP_SECONDS = 1.0
+
+
+class BloomFilter:
+    """Bit array with k hash positions per key (double hashing over blake2b)."""
+
+    def __init__(self, capacity, error_rate=ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _hash(self, key):
+        value = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=16).digest(), "little")
+        return value & 0xFFFFFFFFFFFFFFFF, (value >> 64) | 1
+
+    def add(self, key):
+        h1, h2 = self._hash(key)
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        h1, h2 = self._hash(key)
+        bits, size = self.bits, self.size
+        for i in range(self.hashes):
+            position = (h1 + i * h2) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                # Usually the first or second bit for a new key
+                return False
+        return True
+
+    def expected_error_rate(self):
+        """False-positive rate for the keys added so far."""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    def nbytes(self):
+        return len(self.bits)
+
+
+class PassportIndex:
+    """Bloom filter over passengers.passport_number, confirmed by the UNIQUE index."""
+
+    def __init__(self, db_path=DB_PATH, error_rate=ERROR_RATE):
+        # Own connection: data_version only compares on the same connection
+        self.conn = sqlite3.connect(db_path)
+        self.error_rate = error_rate
+        self.bloom = None
+        self.seq = 0          # last change feed record applied
+        self.version = None
+        self.checked = 0.0
+        self.rebuilds = 0
+        self.rebuild_seconds = 0.0
+
+        self.lookups = 0
+        self.definitely_new = 0
+        self.confirmed = 0
+        self.false_positives = 0
+
+    def rebuild(self):
+        """Stream every passport number into a new filter sized for growth."""
+        conn = self.conn
+        start = time.perf_counter()
+        rows = conn.execute("SELECT COUNT(*) FROM passengers").fetchone()[0]
+        bloom = BloomFilter(max(MIN_CAPACITY, rows * GROWTH), self.error_rate)
+        self.version = conn.execute("PRAGMA data_version").fetchone()[0]
+        # Taken first, so passengers saved meanwhile are replayed from the feed
+        self.seq = change_feed.last_seq(conn)
+        cursor = conn.execute("SELECT passport_number FROM passengers")
+        while True:
+            batch = cursor.fetchmany(10_000)
+            if not batch:
+                break
+            for (passport_number,) in batch:
+                bloom.add(passport_number)
+        self.bloom = bloom
+        self.rebuilds += 1
+        self.rebuild_seconds = time.perf_counter() - start
+        return self
+
+    def add(self, passport_number):
+        """Record a passport saved through this index's process."""
+        if self.bloom is not None:
+            self.bloom.add(passport_number)
+
+    def _catch_up(self):
+        conn = self.conn
+        if self.bloom is None:
+            self.rebuild()
+            return
+        now = time.monotonic()
+        if now - self.checked < CATCH_UP_SECONDS:
+            return
+        self.checked = now
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self.version:
+            return
+        self.version = version
+        ids = []
+        try:
+            while True:
+                changes = change_feed.read_changes(conn, self.seq)
+                if not changes:
+                    break
+                self.seq = changes[-1][0]
+                ids.extend(row_id for _, table_name, row_id, op in changes
+                           if table_name == "passengers" and op != "D")
+        except change_feed.ChangesPruned:
+            self.rebuild()
+            return
+        for start in range(0, len(ids), FILTER_BATCH):
+            chunk = ids[start:start + FILTER_BATCH]
+            for (passport_number,) in conn.execute(f'''
+                SELECT passport_number FROM passengers WHERE id IN ({",".join("?" * len(chunk))})
+            ''', chunk):
+                self.bloom.add(passport_number)
+        if self.bloom.count > self.bloom.capacity:
+            # Past its capacity the false-positive rate climbs quickly
+            self.rebuild()
+
+    def exists(self, passport_number):
+        """True if a passenger with this passport number is registered."""
+        self._catch_up()
+        self.lookups += 1
+        if passport_number not in self.bloom:
+            self.definitely_new += 1
+            return False
+        found = self.conn.execute('''
+            SELECT COUNT(*) FROM passengers WHERE passport_number = ?
+        ''', (passport_number,)).fetchone()[0] > 0
+        if found:
+            self.confirmed += 1
+        else:
+            self.false_positives += 1
+        return found
+
+    def filter_new(self, passport_numbers):
+        """The passport numbers that are not registered yet, in input order."""
+        self._catch_up()
+        maybe = []
+        for passport_number in passport_numbers:
+            self.lookups += 1
+            if passport_number in self.bloom:
+                maybe.append(passport_number)
+            else:
+                self.definitely_new += 1
+        registered = set()
+        for start in range(0, len(maybe), FILTER_BATCH):
+            chunk = maybe[start:start + FILTER_BATCH]
+            registered.update(passport_number for (passport_number,) in self.conn.execute(f'''
+                SELECT passport_number FROM passengers
+                WHERE passport_number IN ({",".join("?" * len(chunk))})
+            ''', chunk))
+        self.confirmed += sum(1 for passport_number in maybe if passport_number in registered)
+        self.false_positives += sum(1 for passport_number in set(maybe) if passport_number not in registered)
+        return [passport_number for passport_number in passport_numbers
+                if passport_number not in registered]
+
+    def stats(self):
+        bloom = self.bloom
+        checks = self.confirmed + self.false_positives
+        return {
+            "passports": bloom.count if bloom else 0,
+            "capacity": bloom.capacity if bloom else 0,
+            "bytes": bloom.nbytes() if bloom else 0,
+            "bits_per_passport": bloom.size / max(1, bloom.count) if bloom else 0.0,
+            "hashes": bloom.hashes if bloom else 0,
+            "expected_error_rate": bloom.expected_error_rate() if bloom else 0.0,
+            "lookups": self.lookups,
+            "definitely_new": self.definitely_new,
+            "db_checks": checks,
+            "false_positives": self.false_positives,
+            "rebuild_seconds": self.rebuild_seconds,
+        }
+
+
+# -------------------------------
+# Shared index for the app
+# -------------------------------
+_index = None
+
+
+def get_passport_index():
+    """Return the shared passport index (built on its first lookup)."""
+    global _index
+    if _index is None:
+        _index = PassportIndex()
+    return _index
+
+
+def print_stats(stats):
+    print(f"{stats['passports']} passports (capacity {stats['capacity']}), "
+          f"{stats['bytes'] / 1e6:.2f} MB, {stats['bits_per_passport']:.1f} bits each, "
+          f"{stats['hashes']} hashes, rebuilt in {stats['rebuild_seconds']:.2f} s")
+    print(f"expected false-positive rate: {stats['expected_error_rate'] * 100:.3f}%")
+    if stats["lookups"]:
+        print(f"{stats['lookups']} lookups: {stats['definitely_new']} answered by the filter, "
+              f"{stats['db_checks']} checked in SQLite "
+              f"({stats['false_positives']} false positives)")
+
+
+# -------------------------------
+# Benchmark on a synthetic passengers table
+# -------------------------------
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Bloom filter prefilter for passport duplicates.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--bench", type=int, metavar="N", help="benchmark on N generated passengers")
+    args = parser.parse_args()
+
+    if not args.bench:
+        conn = sqlite3.connect(args.db)
+        change_feed.setup_change_feed(conn)
+        print_stats(PassportIndex(args.db).rebuild().stats())
+        sys.exit(0)
+
+    count = args.bench
+    path = os.path.join(tempfile.mkdtemp(), "passport_bench.db")
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE passengers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            gender TEXT NOT NULL,
+            passport_number TEXT UNIQUE NOT NULL,
+            contact_info TEXT NOT NULL
+        )
+    ''')
+    conn.executemany('''
+        INSERT INTO passengers (name, age, gender, passport_number, contact_info) VALUES (?, ?, ?, ?, ?)
+    ''', ((f"Passenger {i}", 30, "F", f"A{i:09d}", "x") for i in range(count)))
+    change_feed.setup_change_feed(conn)
+    conn.commit()
+
+    index = PassportIndex(path).rebuild()
+    new_passports = [f"B{i:09d}" for i in range(50_000)]
+    registered = [f"A{i * 7 % count:09d}" for i in range(50_000)]
+
+    def per_check_us(check, probes):
+        start = time.perf_counter()
+        for passport_number in probes:
+            check(passport_number)
+        return (time.perf_counter() - start) / len(probes) * 1e6
+
+    def sqlite_check(passport_number):
+        return conn.execute("SELECT COUNT(*) FROM passengers WHERE passport_number = ?",
+                            (passport_number,)).fetchone()[0] > 0
+
+    def index_check(passport_number):
+        return index.exists(passport_number)
+
+    print(f"{'':<22} {'filter':>9} {'SQLite':>9}")
+    for label, probes in (("new passport", new_passports), ("registered passport", registered)):
+        print(f"{label:<22} {per_check_us(index_check, probes):>7.1f}us "
+              f"{per_check_us(sqlite_check, probes):>7.1f}us")
+
+    # Historical import: half new, half already registered
+    probes = new_passports + registered
+    start = time.perf_counter()
+    new = index.filter_new(probes)
+    batched = time.perf_counter() - start
+    start = time.perf_counter()
+    direct = [passport_number for passport_number in probes if not sqlite_check(passport_number)]
+    one_by_one = time.perf_counter() - start
+    assert new == direct
+    print(f"import of {len(probes)}: filter_new() {batched:.2f} s, "
+          f"one lookup each {one_by_one:.2f} s ({len(new)} new)")
+
+    exact = set(passport_number for (passport_number,) in conn.execute(
+        "SELECT passport_number FROM passengers"))
+    set_bytes = sys.getsizeof(exact) + sum(sys.getsizeof(p) for p in exact)
+    print_stats(index.stats())
+    print(f"exact Python set of the same passports: {set_bytes / 1e6:.1f} MB")
@@ -0,0 +1,286 @@
+# ----------------------------------------
+# Airline Management System - Query Plan Guard
+# ----------------------------------------
+# Registry of the SQL statements the app runs, checked with EXPLAIN
+# QUERY PLAN against a populated database built by base.py.
+#
+# Statements marked hot run on every click (search, duplicate checks,
+# booking, login). If any of them plans a full SCAN instead of an index
+# SEARCH, the guard prints the plans and exits with status 1, so a
+# change that drops an index or rewrites a WHERE clause is caught
+# before it reaches the counters.
+#
+# When you add or change a query in the app, add or update it here.
+#
+#   python query_plans.py          # check hot statements, print all plans
+#   python query_plans.py --hot    # only print the hot statements
+# ----------------------------------------
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+import base
+import crew_roster
+
+# (name, sql, params, hot)
+STATEMENTS = [
+    # Admin panel / main.py: flights
+    ("search flight (flight_cache)", '''
+        SELECT id, flight_number, origin, destination, departure_time, arrival_time
+        FROM flights
+        WHERE flight_number = ?
+    ''', ("FL100",), True),
+    ("flight by id (flight_cache)", '''
+        SELECT id, flight_number, origin, destination, departure_time, arrival_time
+        FROM flights
+        WHERE id = ?
+    ''', (100,), True),
+    ("audit snapshot before update/delete",
+     "SELECT * FROM flights WHERE flight_number = ?", ("FL100",), True),
+    ("add flight", '''
+        INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+        VALUES (?, ?, ?, ?, ?)
+    ''', ("FL1", "LOS", "ABV", "2025-01-01 08:00", "2025-01-01 09:00"), False),
+    ("update flight", '''
+        UPDATE flights
+        SET origin = ?, destination = ?, departure_time = ?, arrival_time = ?
+        WHERE flight_number = ?
+    ''', ("LOS", "ABV", "2025-01-01 08:00", "2025-01-01 09:00", "FL100"), True),
+    ("delete flight", '''
+        DELETE FROM flights WHERE flight_number = ?
+    ''', ("FL100",), True),
+
+    # Attendant panel: passengers
+    ("passport duplicate check", '''
+        SELECT COUNT(*) FROM passengers WHERE passport_number = ?
+    ''', ("P100",), True),
+    ("passenger exists", "SELECT COUNT(*) FROM passengers WHERE id = ?", (100,), True),
+    ("passport batch check (passport_index)", '''
+        SELECT passport_number FROM passengers
+        WHERE passport_number IN (?, ?, ?)
+    ''', ("P1", "P2", "NEW1"), True),
+    ("passports of new passengers (passport_index)", '''
+        SELECT passport_number FROM passengers WHERE id IN (?, ?, ?)
+    ''', (1, 2, 3), True),
+    ("passport index rebuild (passport_index)",
+     "SELECT passport_number FROM passengers", (), False),
+    ("save passenger", '''
+        INSERT INTO passengers (name, age, gender, passport_number, contact_info)
+        VALUES (?, ?, ?, ?, ?)
+    ''', ("Ada", 30, "F", "NEW1", "ada@example.com"), False),
+    ("passenger search (passenger_search)", '''
+        SELECT p.id, p.name, p.passport_number, p.contact_info
+        FROM passengers_fts
+        JOIN passengers p ON p.id = passengers_fts.rowid
+        WHERE passengers_fts MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    ''', ('"passenger"', 100), True),
+
+    # Bookings and waitlist
+    ("flight exists", "SELECT COUNT(*) FROM flights WHERE id = ?", (100,), True),
+    ("already booked", '''
+        SELECT COUNT(*) FROM bookings
+        WHERE passenger_id = ? AND flight_id = ?
+    ''', (100, 100), True),
+    ("bookings on flight (waitlist)", '''
+        SELECT COUNT(*) FROM bookings WHERE flight_id = ?
+    ''', (100,), True),
+    ("booking limit (waitlist)", '''
+        SELECT capacity, overbooking_percent FROM flight_capacity WHERE flight_id = ?
+    ''', (100,), True),
+    ("flight layout (waitlist)", '''
+        SELECT layout FROM flight_capacity WHERE flight_id = ?
+    ''', (100,), True),
+    ("occupied seats (seat_map)", '''
+        SELECT seat_number FROM bookings WHERE flight_id = ? AND seat_number IS NOT NULL
+    ''', (100,), True),
+    ("book seat", '''
+        INSERT INTO bookings (passenger_id, flight_id, seat_number)
+        VALUES (?, ?, ?)
+    ''', (100, 100, "001-A"), False),
+    ("waitlist entry (waitlist)", '''
+        SELECT id, priority FROM waitlist WHERE passenger_id = ? AND flight_id = ?
+    ''', (100, 100), True),
+    ("waitlist position (waitlist)", '''
+        SELECT COUNT(*) FROM waitlist
+        WHERE flight_id = ? AND (priority > ? OR (priority = ? AND id < ?))
+    ''', (100, 0, 0, 50), True),
+    ("next waitlisted (waitlist)", '''
+        SELECT id, passenger_id FROM waitlist
+        WHERE flight_id = ?
+        ORDER BY priority DESC, id
+    ''', (100,), True),
+    ("booking to cancel (waitlist)", '''
+        SELECT id, seat_number FROM bookings WHERE passenger_id = ? AND flight_id = ?
+    ''', (100, 100), True),
+    ("cancel booking", "DELETE FROM bookings WHERE id = ?", (1,), True),
+    ("changed bookings (booking_conflicts)", '''
+        SELECT b.id, b.passenger_id, b.flight_id, f.departure_time, f.arrival_time
+        FROM bookings b JOIN flights f ON f.id = b.flight_id
+        WHERE b.id IN (?, ?, ?)
+    ''', (1, 2, 3), True),
+    ("booking conflict audit (booking_conflicts)", '''
+        SELECT b.passenger_id, b.flight_id, f.flight_number, f.departure_time, f.arrival_time
+        FROM bookings b JOIN flights f ON f.id = b.flight_id
+    ''', (), False),
+
+    # Change feed and departure board: changes since the last poll
+    ("changes since (change_feed)", '''
+        SELECT newest.seq, c.seq, c.table_name, c.row_id, c.op
+        FROM (SELECT COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'changes'), 0) AS seq) newest
+        LEFT JOIN (
+            SELECT seq, table_name, row_id, op FROM changes
+            WHERE seq > ?
+            ORDER BY seq
+            LIMIT ?
+        ) c
+        ORDER BY c.seq
+    ''', (100, 500), True),
+    ("prune acknowledged (change_feed)", "DELETE FROM changes WHERE seq <= ?", (100,), True),
+    ("changed flight rows (departure_board)", '''
+        SELECT id, flight_number, origin, destination, departure_time, arrival_time
+        FROM flights WHERE id IN (?, ?, ?)
+    ''', (1, 2, 3), True),
+
+    # Login (EmailSignupandLogin.py)
+    ("login", '''
+        SELECT password FROM users
+        WHERE first_name = ? AND position = ?
+    ''', ("User100", "attendant"), True),
+    ("existing emails (staff_import)", "SELECT email FROM users", (), False),
+    ("import staff account (staff_import)", '''
+        INSERT OR IGNORE INTO users (first_name, last_name, email, position, password)
+        VALUES (?, ?, ?, ?, ?)
+    ''', ("User1", "X", "new@example.com", "attendant", "pbkdf2_sha256$1$s$h"), False),
+
+    # Whole-table reads, scans by design
+    ("route graph load (itinerary)", '''
+        SELECT id, flight_number, origin, destination, departure_time, arrival_time
+        FROM flights
+    ''', (), False),
+    ("bookings per flight (analytics)", '''
+        SELECT flight_id, COUNT(*) FROM bookings GROUP BY flight_id
+    ''', (), False),
+    # Crew roster
+    ("crew of flight (crew_roster)", '''
+        SELECT attendant_id FROM crew_roster WHERE flight_id = ? ORDER BY attendant_id
+    ''', (1,), True),
+    ("duties of attendant (crew_roster)", '''
+        SELECT f.id, f.flight_number, f.origin, f.destination, f.departure_time, f.arrival_time
+        FROM crew_roster r JOIN flights f ON f.id = r.flight_id
+        WHERE r.attendant_id = ?
+    ''', (1,), True),
+    ("replace crew of flights (crew_roster)", '''
+        DELETE FROM crew_roster WHERE flight_id IN (?, ?, ?)
+    ''', (1, 2, 3), True),
+    ("flight attendants (crew_roster)",
+     "SELECT id FROM users WHERE position = ? ORDER BY id", ("Flight Attendant",), False),
+    ("earlier roster rows (crew_roster)",
+     "SELECT flight_id, attendant_id FROM crew_roster", (), False),
+    ("passenger lookup without FTS5 (passenger_search)", '''
+        SELECT id, name, passport_number, contact_info
+        FROM passengers
+        WHERE (name LIKE ? OR passport_number LIKE ? OR contact_info LIKE ?)
+        LIMIT ?
+    ''', ("%ada%", "%ada%", "%ada%", 20), False),
+]
+
+
+def build_database(directory, flights=5000, passengers=5000, bookings=20000, users=500):
+    """Populated database with the app's schema (base.py) and a users table."""
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        base.setup_database()
+    finally:
+        os.chdir(cwd)
+
+    conn = sqlite3.connect(os.path.join(directory, 'airline_management.db'))
+    # Same table and index as EmailSignupandLogin.setup_database()
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            position TEXT NOT NULL,
+            password TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_users_login ON users (first_name, position);
+    ''')
+    crew_roster.setup_roster(conn)
+
+    rng = random.Random(11)
+    conn.executemany('''
+        INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+        VALUES (?, ?, ?, ?, ?)
+    ''', ((f"FL{i}", "LOS", "ABV", "2025-01-01 08:00", "2025-01-01 09:00") for i in range(flights)))
+    conn.executemany('''
+        INSERT INTO passengers (name, age, gender, passport_number, contact_info)
+        VALUES (?, ?, ?, ?, ?)
+    ''', ((f"Passenger {i}", 30, "F", f"P{i}", f"p{i}@example.com") for i in range(passengers)))
+    conn.executemany('''
+        INSERT INTO bookings (passenger_id, flight_id, seat_number) VALUES (?, ?, ?)
+    ''', ((rng.randint(1, passengers), rng.randint(1, flights), None) for _ in range(bookings)))
+    conn.executemany('''
+        INSERT INTO waitlist (passenger_id, flight_id, priority, requested_at) VALUES (?, ?, 0, '')
+    ''', ((i, rng.randint(1, flights)) for i in range(1, 1001)))
+    conn.executemany('''
+        INSERT INTO users (first_name, last_name, email, position, password) VALUES (?, ?, ?, ?, ?)
+    ''', ((f"User{i}", "X", f"user{i}@example.com", "attendant", "secret") for i in range(users)))
+    conn.execute("ANALYZE")
+    conn.commit()
+    return conn
+
+
+def query_plan(conn, sql, params):
+    """The EXPLAIN QUERY PLAN detail lines of one statement."""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def is_full_scan(detail, subqueries=()):
+    # FTS5 reports its index lookups as "SCAN <table> VIRTUAL TABLE INDEX ..."
+    if not detail.startswith("SCAN") or "VIRTUAL TABLE" in detail:
+        return False
+    # sqlite_sequence holds one row per AUTOINCREMENT table, and a
+    # subquery's rows were already found by its own plan lines
+    table = detail.split()[1]
+    return table not in ("CONSTANT", "sqlite_sequence") and table not in subqueries
+
+
+def check(conn, statements=STATEMENTS):
+    """Returns [(name, plan, hot, failed)] for every statement."""
+    results = []
+    for name, sql, params, hot in statements:
+        plan = query_plan(conn, sql, params)
+        subqueries = {detail.split()[-1] for detail in plan
+                      if detail.startswith(("CO-ROUTINE", "MATERIALIZE"))}
+        failed = hot and any(is_full_scan(detail, subqueries) for detail in plan)
+        results.append((name, plan, hot, failed))
+    return results
+
+
+if __name__ == "__main__":
+    only_hot = "--hot" in sys.argv[1:]
+    directory = tempfile.mkdtemp()
+    conn = build_database(directory)
+    results = check(conn)
+    conn.close()
+
+    for name, plan, hot, failed in results:
+        if only_hot and not hot:
+            continue
+        status = "FAIL" if failed else ("ok" if hot else "--")
+        print(f"[{status:>4}] {name}")
+        for detail in plan or ["(no table access)"]:
+            print(f"         {detail}")
+
+    failures = [name for name, _, _, failed in results if failed]
+    if failures:
+        print(f"\n{len(failures)} hot statement(s) scan a whole table: {', '.join(failures)}")
+        sys.exit(1)
+    print(f"\nAll {sum(1 for result in results if result[2])} hot statements use an index.")
@@ -0,0 +1,367 @@
+# ----------------------------------------
+# Airline Management System - Schedule Snapshot
+# ----------------------------------------
+# Read-only displays and kiosks read the schedule from one binary file
+# instead of querying SQLite and parsing the stored times themselves.
+#
+# File layout (little-endian):
+#   header    HEADER: magic, version, counts and section offsets
+#   airports  airport_count x AIRPORT_BYTES, UTF-8, NUL padded
+#   records   count x RECORD: id, flight number, origin and
+#             destination (airport indexes), departure and arrival
+#             (minutes since the epoch), sorted by departure
+#   numbers   count x NUMBER_ENTRY: flight number, record index,
+#             sorted by flight number
+#
+# - Readers mmap the file and unpack single records straight from the
+#   mapping (struct.unpack_from); opening it reads only the header and
+#   the airport table, whatever the number of flights
+# - Departure windows and flight numbers are found by binary search
+#   over the mapped sections
+# - export_snapshot() writes a temporary file next to the target and
+#   publishes it with os.replace(), so a reader sees either the old or
+#   the new file, never a half-written one; ScheduleSnapshot.refresh()
+#   switches to a newly published file
+#
+#   python schedule_snapshot.py export               # write schedule.bin
+#   python schedule_snapshot.py export --watch       # re-export when flights change
+#   python schedule_snapshot.py show BA123
+#   python schedule_snapshot.py bench 500000         # snapshot vs SQLite
+# ----------------------------------------
+
+import mmap
+import os
+import sqlite3
+import struct
+import time
+from bisect import bisect_left
+
+from flight_store import FlightStore, FlightRecord
+
+DB_PATH = 'airline_management.db'
+SNAPSHOT_PATH = 'schedule.bin'
+
+MAGIC = b"AIRSCHED"
+VERSION = 1
+
+# magic, version, record count, airport count, generated (unix seconds),
+# airports offset, records offset, numbers offset
+HEADER = struct.Struct("<8sIIIqQQQ")
+
+NUMBER_BYTES = 16
+AIRPORT_BYTES = 32
+
+# id, flight number, origin, destination, departure, arrival
+RECORD = struct.Struct(f"<q{NUMBER_BYTES}sHHii")
+
+# flight number, record index
+NUMBER_ENTRY = struct.Struct(f"<{NUMBER_BYTES}sI")
+
+
+class SnapshotError(Exception):
+    """The snapshot file is missing, truncated or of another format."""
+
+
+# -------------------------------
+# Export
+# -------------------------------
+def build_snapshot(store):
+    """The snapshot file contents for a FlightStore. Returns (bytes, skipped)."""
+    positions = []
+    skipped = 0
+    for position in range(len(store)):
+        if len(store.flight_number(position).encode()) > NUMBER_BYTES:
+            skipped += 1
+        else:
+            positions.append(position)
+    if len(store.airports) > 0xFFFF:
+        raise SnapshotError("too many airports for 2-byte indexes")
+    positions.sort(key=store.departures.__getitem__)
+
+    airports_offset = HEADER.size
+    records_offset = airports_offset + len(store.airports) * AIRPORT_BYTES
+    numbers_offset = records_offset + len(positions) * RECORD.size
+    data = bytearray(numbers_offset + len(positions) * NUMBER_ENTRY.size)
+
+    HEADER.pack_into(data, 0, MAGIC, VERSION, len(positions), len(store.airports),
+                     int(time.time()), airports_offset, records_offset, numbers_offset)
+    for index, code in enumerate(store.airports):
+        encoded = code.encode()[:AIRPORT_BYTES]
+        data[airports_offset + index * AIRPORT_BYTES:
+             airports_offset + index * AIRPORT_BYTES + len(encoded)] = encoded
+
+    numbers = []
+    for index, position in enumerate(positions):
+        number = store.flight_number(position).encode()
+        RECORD.pack_into(data, records_offset + index * RECORD.size,
+                         store.ids[position], number,
+                         store.origins[position], store.destinations[position],
+                         store.departures[position], store.arrivals[position])
+        numbers.append((number, index))
+    numbers.sort()
+    for index, (number, record_index) in enumerate(numbers):
+        NUMBER_ENTRY.pack_into(data, numbers_offset + index * NUMBER_ENTRY.size,
+                               number, record_index)
+    return data, skipped + store.skipped
+
+
+def export_snapshot(db_path=DB_PATH, path=SNAPSHOT_PATH):
+    """Write the schedule to path atomically. Returns {'flights', 'skipped', 'bytes', 'seconds'}."""
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    store = FlightStore().load(conn)
+    conn.close()
+    data, skipped = build_snapshot(store)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    temporary = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    with open(temporary, "wb") as snapshot_file:
+        snapshot_file.write(data)
+        snapshot_file.flush()
+        os.fsync(snapshot_file.fileno())
+    # Readers holding the old file keep their mapping; new opens see the new file
+    os.replace(temporary, path)
+    return {"flights": HEADER.unpack_from(data)[2], "skipped": skipped,
+            "bytes": len(data), "seconds": time.perf_counter() - start}
+
+
+# -------------------------------
+# Reader
+# -------------------------------
+class _Column:
+    """Sequence view of one field of a mapped section, for bisect."""
+
+    def __init__(self, mapped, offset, count, unpack, field):
+        self.mapped = mapped
+        self.offset = offset
+        self.count = count
+        self.unpack = unpack
+        self.field = field
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return self.unpack.unpack_from(self.mapped, self.offset + index * self.unpack.size)[self.field]
+
+
+class ScheduleSnapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        self.path = path
+        self.mapped = None
+        self._open()
+
+    def _open(self):
+        try:
+            with open(self.path, "rb") as snapshot_file:
+                stat = os.fstat(snapshot_file.fileno())
+                mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"{self.path}: {e}")
+        if len(mapped) < HEADER.size:
+            mapped.close()
+            raise SnapshotError(f"{self.path}: truncated header")
+        (magic, version, count, airport_count, generated,
+         airports_offset, records_offset, numbers_offset) = HEADER.unpack_from(mapped)
+        if magic != MAGIC or version != VERSION:
+            mapped.close()
+            raise SnapshotError(f"{self.path}: not a version {VERSION} schedule snapshot")
+        if len(mapped) != numbers_offset + count * NUMBER_ENTRY.size:
+            mapped.close()
+            raise SnapshotError(f"{self.path}: size does not match its header")
+
+        if self.mapped is not None:
+            self.mapped.close()
+        self.mapped = mapped
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self.count = count
+        self.generated = generated
+        self.records_offset = records_offset
+        self.numbers_offset = numbers_offset
+        self.airports = [
+            bytes(mapped[airports_offset + i * AIRPORT_BYTES:
+                         airports_offset + (i + 1) * AIRPORT_BYTES]).rstrip(b"\0").decode()
+            for i in range(airport_count)]
+        self.airport_index = {code: index for index, code in enumerate(self.airports)}
+        self._departures = _Column(mapped, records_offset, count, RECORD, 4)
+        self._numbers = _Column(mapped, numbers_offset, count, NUMBER_ENTRY, 0)
+
+    def refresh(self):
+        """Switch to a newly published file. Returns True if it changed."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self.identity:
+            return False
+        self._open()
+        return True
+
+    def close(self):
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+
+    def __len__(self):
+        return self.count
+
+    def record(self, index):
+        """The flight at a record index (records are in departure order)."""
+        flight_id, number, origin, destination, departure, arrival = RECORD.unpack_from(
+            self.mapped, self.records_offset + index * RECORD.size)
+        return FlightRecord(flight_id, number.rstrip(b"\0").decode(),
+                            self.airports[origin], self.airports[destination],
+                            departure, arrival)
+
+    def find_number(self, flight_number):
+        """All flights with this flight number."""
+        key = flight_number.encode().ljust(NUMBER_BYTES, b"\0")
+        if len(key) > NUMBER_BYTES:
+            return []
+        records = []
+        index = bisect_left(self._numbers, key)
+        while index < self.count:
+            number, record_index = NUMBER_ENTRY.unpack_from(
+                self.mapped, self.numbers_offset + index * NUMBER_ENTRY.size)
+            if number != key:
+                break
+            records.append(self.record(record_index))
+            index += 1
+        return records
+
+    def departures_between(self, start, end, origin=None):
+        """Flights departing in [start, end) minutes, optionally from one airport."""
+        wanted = None if origin is None else self.airport_index.get(origin.strip().upper(), -1)
+        records = []
+        for index in range(bisect_left(self._departures, start), bisect_left(self._departures, end)):
+            if wanted is None or RECORD.unpack_from(
+                    self.mapped, self.records_offset + index * RECORD.size)[2] == wanted:
+                records.append(self.record(index))
+        return records
+
+
+# -------------------------------
+# Benchmark: snapshot vs SQLite
+# -------------------------------
+def bench(count):
+    import random
+    import tempfile
+
+    from flight_times import to_minutes, from_minutes
+
+    random.seed(5)
+    airports = ["LOS", "ABV", "PHC", "KAN", "ACC", "JFK", "LHR", "DXB", "JNB", "NBO",
+                "CDG", "AMS", "IST", "CAI", "ADD", "DKR", "FRA", "ATL", "ORD", "DOH"]
+    base = to_minutes("2025-04-01 00:00")
+    directory = tempfile.mkdtemp()
+    db_path = os.path.join(directory, "bench.db")
+    path = os.path.join(directory, SNAPSHOT_PATH)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE flights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flight_number VARCHAR NOT NULL,
+            origin VARCHAR NOT NULL,
+            destination VARCHAR NOT NULL,
+            departure_time VARCHAR NOT NULL,
+            arrival_time VARCHAR NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX idx_flights_number ON flights (flight_number)")
+
+    def rows():
+        for i in range(count):
+            origin, destination = random.sample(airports, 2)
+            dep = base + random.randint(0, 180 * 24 * 60)
+            yield (f"PX{i:06d}", origin, destination, from_minutes(dep),
+                   from_minutes(dep + random.randint(45, 900)))
+
+    conn.executemany('''
+        INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+        VALUES (?, ?, ?, ?, ?)
+    ''', rows())
+    conn.commit()
+    conn.close()
+
+    result = export_snapshot(db_path, path)
+    print(f"{count} flights: exported {result['bytes'] / 1e6:.1f} MB in {result['seconds']:.2f} s")
+
+    start = time.perf_counter()
+    snapshot = ScheduleSnapshot(path)
+    print(f"open snapshot (mmap + header): {(time.perf_counter() - start) * 1000:.2f} ms")
+    start = time.perf_counter()
+    FlightStore().load(sqlite3.connect(db_path))
+    print(f"load + parse from SQLite:      {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    numbers = [f"PX{random.randrange(count):06d}" for _ in range(10_000)]
+    start = time.perf_counter()
+    for number in numbers:
+        snapshot.find_number(number)
+    snapshot_us = (time.perf_counter() - start) / len(numbers) * 1e6
+    conn = sqlite3.connect(db_path)
+    start = time.perf_counter()
+    for number in numbers:
+        conn.execute('''
+            SELECT id, flight_number, origin, destination, departure_time, arrival_time
+            FROM flights WHERE flight_number = ?
+        ''', (number,)).fetchall()
+    sqlite_us = (time.perf_counter() - start) / len(numbers) * 1e6
+    print(f"flight number lookup: snapshot {snapshot_us:.1f} us, SQLite {sqlite_us:.1f} us "
+          f"(SQLite rows still need their times parsed)")
+
+    start = time.perf_counter()
+    board = snapshot.departures_between(base + 24 * 60, base + 24 * 60 + 120, origin="LOS")
+    print(f"2-hour LOS board: {len(board)} flights in {(time.perf_counter() - start) * 1000:.2f} ms")
+    snapshot.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Binary schedule snapshot for read-only displays.")
+    parser.add_argument("command", choices=["export", "show", "bench"])
+    parser.add_argument("value", nargs="?", help="flight number (show) or flight count (bench)")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--out", default=SNAPSHOT_PATH)
+    parser.add_argument("--watch", action="store_true", help="re-export whenever flights change")
+    parser.add_argument("--every", type=float, default=5.0, help="seconds between checks with --watch")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        bench(int(args.value or 500_000))
+    elif args.command == "show":
+        snapshot = ScheduleSnapshot(args.out)
+        print(f"{len(snapshot)} flights, generated {time.ctime(snapshot.generated)}")
+        for record in snapshot.find_number(args.value) if args.value else []:
+            print(record)
+    else:
+        def publish():
+            result = export_snapshot(args.db, args.out)
+            print(f"{args.out}: {result['flights']} flights ({result['skipped']} skipped), "
+                  f"{result['bytes'] / 1e6:.2f} MB in {result['seconds']:.2f} s")
+
+        publish()
+        if args.watch:
+            import change_feed
+
+            conn = sqlite3.connect(args.db)
+            change_feed.setup_change_feed(conn)
+            consumer = change_feed.ChangeConsumer(conn, "schedule_snapshot", ["flights"])
+            consumer.ack(change_feed.last_seq(conn))
+            try:
+                while True:
+                    time.sleep(args.every)
+                    try:
+                        changed = bool(list(consumer))
+                    except change_feed.ChangesPruned:
+                        # Fell behind the kept records: export everything again
+                        consumer.position = change_feed.last_seq(conn)
+                        changed = True
+                    if changed:
+                        publish()
+                        consumer.ack()
+            except KeyboardInterrupt:
+                conn.close()
@@ -0,0 +1,148 @@
+# ----------------------------------------
+# Airline Management System - Seat Map
+# ----------------------------------------
+# A Tk Canvas that shows which seats on a flight are taken.
+#
+# - Seats use the same "001-A" format as generate_seat_number()
+# - Each flight's layout is a key of AIRCRAFT_LAYOUTS stored in
+#   flight_capacity (waitlist.flight_layout() resolves it)
+# - Occupancy for a flight is loaded with a single query
+# - Only the cells whose state changed are recoloured, and the canvas
+#   items are created once and reused when switching flights
+# ----------------------------------------
+
+from tkinter import Canvas, Frame, Scrollbar, HORIZONTAL, BOTTOM, TOP, X, BOTH
+
+# Seat layouts per aircraft type: (number of rows, seat letters)
+AIRCRAFT_LAYOUTS = {
+    "default": (150, "ABCD"),
+    "regional": (20, "ABCD"),
+    "narrowbody": (30, "ABCDEF"),
+}
+
+FREE_COLOUR = "white"
+TAKEN_COLOUR = "tomato"
+CELL = 14      # cell size in pixels
+GAP = 2        # space between cells
+MARGIN = 24    # room for the row numbers and seat letters
+
+
+def seat_label(row, letter):
+    """Seat number in the same format as generate_seat_number()."""
+    return f"{row:03d}-{letter}"
+
+
+def load_occupied_seats(conn, flight_id):
+    """All seat numbers already booked on a flight, in one query."""
+    cursor = conn.execute('''
+        SELECT seat_number FROM bookings WHERE flight_id = ? AND seat_number IS NOT NULL
+    ''', (flight_id,))
+    return {seat_number for (seat_number,) in cursor}
+
+
+class SeatMap(Frame):
+    """Scrollable grid of seats: one column per row of the aircraft."""
+
+    def __init__(self, parent, width=540, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.canvas = Canvas(self, width=width, bg="lightblue", highlightthickness=0)
+        scrollbar = Scrollbar(self, orient=HORIZONTAL, command=self.canvas.xview)
+        self.canvas.configure(xscrollcommand=scrollbar.set)
+        scrollbar.pack(side=BOTTOM, fill=X)
+        self.canvas.pack(side=TOP, fill=BOTH, expand=True)
+
+        self.cells = {}        # seat number -> rectangle item id
+        self.labels = []       # row number / seat letter text items
+        self.status = None     # hover text under the grid
+        self.visible = set()   # seats that exist on the current layout
+        self.layout = None
+        self.flight_id = None
+        self.occupied = set()
+
+    # -------------------------------
+    # Layout (created once, reused across flights)
+    # -------------------------------
+    def set_layout(self, layout):
+        """Show the grid for (rows, letters), reusing existing canvas items."""
+        if layout == self.layout:
+            return
+        rows, letters = layout
+        wanted = {seat_label(row, letter) for row in range(1, rows + 1) for letter in letters}
+
+        # Hide cells this aircraft does not have instead of deleting them
+        for seat, item in self.cells.items():
+            if seat not in wanted:
+                self.canvas.itemconfigure(item, state="hidden")
+
+        for row in range(1, rows + 1):
+            x = MARGIN + (row - 1) * (CELL + GAP)
+            for index, letter in enumerate(letters):
+                seat = seat_label(row, letter)
+                y = MARGIN + index * (CELL + GAP)
+                item = self.cells.get(seat)
+                if item is None:
+                    item = self.canvas.create_rectangle(x, y, x + CELL, y + CELL,
+                                                        fill=FREE_COLOUR, outline="gray")
+                    self.canvas.tag_bind(item, "<Enter>",
+                                         lambda event, seat=seat: self._show_seat(seat))
+                    self.cells[seat] = item
+                else:
+                    self.canvas.coords(item, x, y, x + CELL, y + CELL)
+                    self.canvas.itemconfigure(item, state="normal")
+
+        self._draw_labels(rows, letters)
+        width = MARGIN + rows * (CELL + GAP)
+        height = MARGIN + len(letters) * (CELL + GAP) + MARGIN
+        self.canvas.configure(scrollregion=(0, 0, width, height), height=height)
+
+        self.layout = layout
+        self.visible = wanted
+        self.occupied &= wanted
+
+    def _draw_labels(self, rows, letters):
+        for item in self.labels:
+            self.canvas.delete(item)
+        self.labels = []
+        for index, letter in enumerate(letters):
+            y = MARGIN + index * (CELL + GAP) + CELL / 2
+            self.labels.append(self.canvas.create_text(MARGIN / 2, y, text=letter))
+        for row in range(1, rows + 1, 10):
+            x = MARGIN + (row - 1) * (CELL + GAP) + CELL / 2
+            self.labels.append(self.canvas.create_text(x, MARGIN / 2, text=str(row)))
+        self.status = self.canvas.create_text(
+            MARGIN, MARGIN + len(letters) * (CELL + GAP) + MARGIN / 2, anchor="w", text="")
+        self.labels.append(self.status)
+
+    def _show_seat(self, seat):
+        state = "taken" if seat in self.occupied else "free"
+        self.canvas.itemconfigure(self.status, text=f"Seat {seat}: {state}")
+
+    # -------------------------------
+    # Occupancy (incremental redraw)
+    # -------------------------------
+    def show_flight(self, conn, flight_id, layout=AIRCRAFT_LAYOUTS["default"]):
+        """Switch the map to a flight (layout: rows, letters) and recolour only the seats that differ."""
+        self.set_layout(layout)
+        self.flight_id = flight_id
+        self.update_occupancy(load_occupied_seats(conn, flight_id))
+
+    def update_occupancy(self, occupied):
+        """Apply a new set of taken seats, touching only changed cells."""
+        occupied = set(occupied) & self.visible
+        for seat in self.occupied - occupied:
+            self.canvas.itemconfigure(self.cells[seat], fill=FREE_COLOUR)
+        for seat in occupied - self.occupied:
+            self.canvas.itemconfigure(self.cells[seat], fill=TAKEN_COLOUR)
+        self.occupied = occupied
+
+    def mark_taken(self, flight_id, seat):
+        """A booking was made: recolour that single seat if it is on screen."""
+        if flight_id == self.flight_id and seat in self.visible and seat not in self.occupied:
+            self.occupied.add(seat)
+            self.canvas.itemconfigure(self.cells[seat], fill=TAKEN_COLOUR)
+
+    def mark_free(self, flight_id, seat):
+        """A booking was cancelled: recolour that single seat if it is on screen."""
+        if flight_id == self.flight_id and seat in self.occupied:
+            self.occupied.discard(seat)
+            self.canvas.itemconfigure(self.cells[seat], fill=FREE_COLOUR)
@@ -0,0 +1,253 @@
+# ----------------------------------------
+# Airline Management System - Slow Query Log
+# ----------------------------------------
+# Finds out which statement made a counter terminal feel sluggish.
+#
+# connect() returns a sqlite3 connection whose cursors time every
+# statement, from execute() until its rows have been fetched. Any
+# statement slower than SLOW_QUERY_MS is written to slow_queries.log
+# (JSON lines, rotated at MAX_LOG_BYTES) with:
+# - the SQL and its parameters; all text parameters of statements
+#   that mention passports are redacted
+# - the duration in milliseconds
+# - its EXPLAIN QUERY PLAN
+#
+# The threshold can be changed with the AIRLINE_SLOW_QUERY_MS
+# environment variable (0 logs every statement).
+#
+#   python slow_query_log.py top          # top offenders by total time
+#   python slow_query_log.py top --by max --limit 5
+#   python slow_query_log.py check        # redaction self-check
+# ----------------------------------------
+
+import json
+import logging
+import logging.handlers
+import os
+import sqlite3
+import time
+
+LOG_PATH = 'slow_queries.log'
+
+# Statements slower than this are logged (milliseconds)
+SLOW_QUERY_MS = float(os.environ.get("AIRLINE_SLOW_QUERY_MS", 50))
+
+# Log rotation: size of one file and number of old files kept
+MAX_LOG_BYTES = 1_000_000
+BACKUP_COUNT = 3
+
+_logger = None
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        _logger = logging.getLogger("airline.slow_queries")
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+        handler = logging.handlers.RotatingFileHandler(
+            LOG_PATH, maxBytes=MAX_LOG_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _logger.addHandler(handler)
+    return _logger
+
+
+# -------------------------------
+# Redaction
+# -------------------------------
+def redact(sql, params):
+    """
+    Parameters with passport numbers replaced by '***'. Fails closed:
+    every text parameter of a statement that mentions passports (or
+    searches passengers) is redacted, since a search term bound to
+    name LIKE ? can just as well be a passport number.
+    """
+    if isinstance(params, dict):
+        return {name: "***" if "passport" in name.lower() else value
+                for name, value in params.items()}
+    params = list(params or ())
+    lowered = sql.lower()
+    if "passport" in lowered or "passengers_fts" in lowered:
+        return ["***" if isinstance(value, str) else value for value in params]
+    return params
+
+
+# -------------------------------
+# Traced connection
+# -------------------------------
+class TracedCursor(sqlite3.Cursor):
+    """Cursor that times each statement until its rows have been fetched."""
+
+    _pending = None   # [sql, params, seconds so far]
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None and pending[2] * 1000 >= SLOW_QUERY_MS:
+            log_statement(self.connection, pending[0], pending[1], pending[2])
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._pending is not None:
+                self._pending[2] += time.perf_counter() - start
+
+    def execute(self, sql, params=()):
+        self._finish()
+        self._pending = [sql, params, 0.0]
+        self._timed(super().execute, sql, params)
+        if self.description is None:
+            # No rows to fetch (INSERT/UPDATE/DELETE/...)
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._finish()
+        self._pending = [sql, "(executemany)", 0.0]
+        self._timed(super().executemany, sql, seq_of_params)
+        self._finish()
+        return self
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # conn.execute(...).fetchone() drops the cursor without exhausting it
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TracedConnection(sqlite3.Connection):
+    """sqlite3 connection whose statements go through TracedCursor."""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+
+def connect(db_path, **kwargs):
+    """sqlite3.connect() with slow statements logged."""
+    return sqlite3.connect(db_path, factory=TracedConnection, **kwargs)
+
+
+def log_statement(conn, sql, params, seconds):
+    """Write one slow statement, with its plan, to the log."""
+    plan = []
+    if params != "(executemany)":
+        try:
+            # A plain cursor, so the EXPLAIN itself is not traced
+            cursor = sqlite3.Cursor(conn)
+            plan = [row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+            cursor.close()
+        except sqlite3.Error:
+            plan = []
+    _get_logger().info(json.dumps({
+        "ts": time.time(),
+        "ms": round(seconds * 1000, 3),
+        "sql": " ".join(sql.split()),
+        "params": params if params == "(executemany)" else redact(sql, params),
+        "plan": plan,
+    }, default=str))
+
+
+# -------------------------------
+# Aggregation
+# -------------------------------
+def read_entries(path=LOG_PATH):
+    """Every entry in the log and its rotated files, oldest file first."""
+    paths = [f"{path}.{i}" for i in range(BACKUP_COUNT, 0, -1)] + [path]
+    entries = []
+    for name in paths:
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding="utf-8") as log:
+            for line in log:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
+
+
+def top_offenders(entries, by="total", limit=10):
+    """[(sql, count, total ms, max ms, last plan)] sorted by total or max time."""
+    stats = {}
+    for entry in entries:
+        item = stats.setdefault(entry["sql"], [0, 0.0, 0.0, []])
+        item[0] += 1
+        item[1] += entry["ms"]
+        item[2] = max(item[2], entry["ms"])
+        item[3] = entry.get("plan", [])
+    key = (lambda item: item[1][1]) if by == "total" else (lambda item: item[1][2])
+    ranked = sorted(stats.items(), key=key, reverse=True)[:limit]
+    return [(sql, count, total, worst, plan) for sql, (count, total, worst, plan) in ranked]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarise the slow query log.")
+    parser.add_argument("command", choices=["top", "check"])
+    parser.add_argument("--log", default=LOG_PATH)
+    parser.add_argument("--by", choices=["total", "max"], default="total")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "check":
+        cases = [
+            ("SELECT passport_number FROM passengers WHERE passport_number IN (?, ?, ?)",
+             ("A1", "A2", "A3"), ["***", "***", "***"]),
+            # passenger_search fallback without FTS5
+            ("SELECT id, name, passport_number, contact_info FROM passengers "
+             "WHERE (name LIKE ? OR passport_number LIKE ? OR contact_info LIKE ?) LIMIT ?",
+             ("%A123%", "%A123%", "%A123%", 20), ["***", "***", "***", 20]),
+            ("INSERT INTO passengers (name, age, gender, passport_number, contact_info) "
+             "VALUES (?, ?, ?, ?, ?)", ("Ada", 30, "F", "A1", "x"), ["***", 30, "***", "***", "***"]),
+            ("SELECT rowid FROM passengers_fts WHERE passengers_fts MATCH ?", ("A1*",), ["***"]),
+            ("SELECT * FROM flights WHERE flight_number = ?", ("FL1",), ["FL1"]),
+        ]
+        for sql, params, expected in cases:
+            assert redact(sql, params) == expected, (sql, redact(sql, params))
+        print(f"redact: {len(cases)} cases ok")
+        raise SystemExit(0)
+
+    entries = read_entries(args.log)
+    print(f"{len(entries)} slow statements logged")
+    for sql, count, total, worst, plan in top_offenders(entries, args.by, args.limit):
+        print(f"\n{total:10.1f} ms total  {count:5d}x  max {worst:.1f} ms")
+        print(f"  {sql[:200]}")
+        for detail in plan:
+            print(f"    {detail}")
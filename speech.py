@@ -0,0 +1,126 @@
+# ----------------------------------------
+# Airline Management System - Streaming Text-to-Speech
+# ----------------------------------------
+# text_to_speech used to save the whole announcement to
+# flight_info.mp3 with gTTS before pygame could start playing it, so
+# long announcements began seconds late.
+#
+# speak() instead:
+# - splits the text into sentence-sized chunks
+# - synthesises the chunks concurrently (SYNTH_WORKERS requests in
+#   flight), in memory, ahead of playback
+# - starts playing chunk 1 as soon as it is ready and queues each
+#   following chunk on the same mixer channel, so there is no gap
+#   between sentences
+#
+# The words spoken are the same: gTTS splits long text into pieces of
+# at most 100 characters itself, on the same punctuation.
+#
+#   python speech.py "Flight LA12 to Abuja ..."   # compares time to first audio
+# ----------------------------------------
+
+import io
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+from gtts import gTTS
+
+# Chunks are whole sentences, joined until they reach this length
+# (gTTS itself never sends more than 100 characters per request)
+MAX_CHUNK_CHARS = 100
+
+# Concurrent synthesis requests
+SYNTH_WORKERS = 3
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+")
+
+
+def split_sentences(text, max_chars=MAX_CHUNK_CHARS):
+    """Split text into chunks of whole sentences, each at most max_chars if possible."""
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if not sentence:
+            continue
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def synthesize(chunk, lang='en'):
+    """mp3 audio of one chunk, in memory."""
+    audio = io.BytesIO()
+    gTTS(text=chunk, lang=lang).write_to_fp(audio)
+    audio.seek(0)
+    return audio
+
+
+def speak(text, lang='en', workers=SYNTH_WORKERS):
+    """
+    Speak text, starting playback as soon as the first chunk has been
+    synthesised. Blocks until playback ends. Returns timings in seconds.
+    """
+    start = time.perf_counter()
+    chunks = split_sentences(text)
+    if not chunks:
+        return {"chunks": 0, "first_audio": 0.0, "total": 0.0}
+
+    pygame.mixer.init()
+    first_audio = None
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = [pool.submit(synthesize, chunk, lang) for chunk in chunks]
+            channel = None
+            for future in pending:
+                sound = pygame.mixer.Sound(file=future.result())
+                if channel is None:
+                    # Sound.play() returns None when every channel is busy;
+                    # find_channel(True) takes over the oldest one instead
+                    channel = pygame.mixer.find_channel(True)
+                    channel.play(sound)
+                    first_audio = time.perf_counter() - start
+                    continue
+                # The channel holds one queued sound; wait for its slot
+                while channel.get_queue() is not None:
+                    pygame.time.wait(5)
+                channel.queue(sound)
+
+        # Keep program running until audio finishes
+        while channel.get_busy():
+            pygame.time.wait(10)
+    finally:
+        pygame.mixer.quit()
+
+    return {"chunks": len(chunks), "first_audio": first_audio,
+            "total": time.perf_counter() - start}
+
+
+# -------------------------------
+# Time to first audio: whole file vs streaming
+# -------------------------------
+if __name__ == "__main__":
+    import os
+    import sys
+
+    text = " ".join(sys.argv[1:]) or (
+        "Flight LA12 from Lagos to Abuja has been successfully updated. "
+        "It will now depart from gate 14 at 2025-06-01 09:30 and arrive at 2025-06-01 10:45. "
+        "Passengers holding connecting tickets to Kano should see an agent at the transfer desk. "
+        "We apologise for the inconvenience and thank you for flying with us.")
+
+    start = time.perf_counter()
+    gTTS(text=text, lang='en').save("flight_info.mp3")
+    whole = time.perf_counter() - start
+    os.remove("flight_info.mp3")
+    print(f"whole file: first audio after {whole:.2f} s (synthesis only)")
+
+    stats = speak(text)
+    print(f"streaming:  first audio after {stats['first_audio']:.2f} s, "
+          f"{stats['chunks']} chunks, {stats['total']:.2f} s including playback")
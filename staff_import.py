@@ -0,0 +1,258 @@
+# ----------------------------------------
+# Airline Management System - Bulk Staff Import
+# ----------------------------------------
+# Creates staff accounts in the users table from a CSV file, for
+# onboarding a whole base at once instead of one signup form at a time.
+#
+# - The CSV needs the columns first_name, last_name, email, position,
+#   password (header row, any order)
+# - Passwords are stored as salted PBKDF2-SHA256 hashes. Hashing is
+#   deliberately slow and CPU-bound, so it runs across a process pool
+#   (one worker per core by default) while the main process inserts
+#   the finished rows
+# - Rows are inserted BATCH_SIZE at a time, one transaction per batch
+# - Rows with missing fields, emails repeated in the file and emails
+#   that already have an account are skipped and reported with their
+#   line number
+#
+# Login (EmailSignupandLogin.py) checks passwords with verify_password(),
+# which accepts these hashes and the plain-text passwords stored by the
+# signup form.
+#
+#   python staff_import.py staff.csv
+#   python staff_import.py staff.csv --workers 4 --db airline_manage.db
+#   python staff_import.py --bench 2000        # throughput per worker count
+#   python staff_import.py --check             # password verification self-check
+# ----------------------------------------
+
+import csv
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+DB_PATH = 'airline_management.db'
+
+COLUMNS = ("first_name", "last_name", "email", "position", "password")
+
+# PBKDF2 rounds per password (about 0.1 s on one core)
+PBKDF2_ITERATIONS = 200_000
+
+# Rows inserted per transaction
+BATCH_SIZE = 500
+
+HASH_PREFIX = "pbkdf2_sha256"
+
+
+# -------------------------------
+# Password hashing
+# -------------------------------
+def hash_password(password, iterations=PBKDF2_ITERATIONS, salt=None):
+    """'pbkdf2_sha256$iterations$salt$hash' for password."""
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations)
+    return f"{HASH_PREFIX}${iterations}${salt}${digest.hex()}"
+
+
+def verify_password(stored, password):
+    """True if password matches the stored hash (or plain-text password)."""
+    if not stored.startswith(HASH_PREFIX + "$"):
+        # Accounts created through the signup form. compare_digest only
+        # takes ASCII str, so compare the UTF-8 bytes
+        return hmac.compare_digest(stored.encode(), password.encode())
+    _, iterations, salt, _ = stored.split("$", 3)
+    return hmac.compare_digest(stored, hash_password(password, int(iterations), salt))
+
+
+def _hash_row(row):
+    # Runs in a worker process
+    first_name, last_name, email, position, password = row
+    return first_name, last_name, email, position, hash_password(password)
+
+
+# -------------------------------
+# Import
+# -------------------------------
+def setup_users(conn):
+    """Same users table and index as EmailSignupandLogin.setup_database()."""
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            email TEXT NOT NULL UNIQUE,
+            position TEXT NOT NULL,
+            password TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_users_login ON users (first_name, position);
+    ''')
+
+
+def read_staff(path):
+    """
+    ([(line, row)], [(line, reason)]) from a staff CSV. Rows are tuples
+    in COLUMNS order; rows with a missing column or field are rejected.
+    """
+    rows, rejected = [], []
+    with open(path, newline="", encoding="utf-8-sig") as staff_file:
+        reader = csv.DictReader(staff_file)
+        missing = [column for column in COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{path}: missing column(s) {', '.join(missing)}")
+        for record in reader:
+            row = tuple((record.get(column) or "").strip() for column in COLUMNS)
+            empty = [column for column, value in zip(COLUMNS, row) if not value]
+            if empty:
+                rejected.append((reader.line_num, f"empty {', '.join(empty)}"))
+            else:
+                rows.append((reader.line_num, row))
+    return rows, rejected
+
+
+def _skip_duplicates(conn, rows, rejected):
+    """Rows whose email is new, both in the file and in the users table."""
+    existing = {email.lower() for (email,) in conn.execute("SELECT email FROM users")}
+    seen = {}
+    fresh = []
+    for line, row in rows:
+        email = row[2].lower()
+        if email in existing:
+            rejected.append((line, f"{row[2]} already has an account"))
+        elif email in seen:
+            rejected.append((line, f"{row[2]} repeats line {seen[email]}"))
+        else:
+            seen[email] = line
+            fresh.append((line, row))
+    return fresh
+
+
+def _insert_batch(conn, batch, rejected):
+    inserted = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for line, row in batch:
+            cursor = conn.execute('''
+                INSERT OR IGNORE INTO users (first_name, last_name, email, position, password)
+                VALUES (?, ?, ?, ?, ?)
+            ''', row)
+            if cursor.rowcount:
+                inserted += 1
+            else:
+                # Signed up from another terminal during the import
+                rejected.append((line, f"{row[2]} already has an account"))
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    return inserted
+
+
+def import_staff(path, db_path=DB_PATH, workers=None, batch_size=BATCH_SIZE):
+    """
+    Import the staff CSV at path into users. Returns
+    {'read': n, 'imported': n, 'rejected': [(line, reason)], 'seconds': s}.
+    """
+    start = time.perf_counter()
+    rows, rejected = read_staff(path)
+    read = len(rows) + len(rejected)
+
+    # Autocommit, so each batch is exactly one explicit transaction
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    setup_users(conn)
+    rows = _skip_duplicates(conn, rows, rejected)
+
+    imported = 0
+    lines = [line for line, _ in rows]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(rows) // ((workers or os.cpu_count() or 1) * 4))
+        hashed = pool.map(_hash_row, [row for _, row in rows], chunksize=chunksize)
+        # Batches are inserted as soon as their hashes are ready
+        batch = []
+        for line, row in zip(lines, hashed):
+            batch.append((line, row))
+            if len(batch) == batch_size:
+                imported += _insert_batch(conn, batch, rejected)
+                batch = []
+        if batch:
+            imported += _insert_batch(conn, batch, rejected)
+    conn.close()
+
+    rejected.sort()
+    return {"read": read, "imported": imported, "rejected": rejected,
+            "seconds": time.perf_counter() - start}
+
+
+# -------------------------------
+# Throughput per worker count
+# -------------------------------
+def write_sample_csv(path, count):
+    with open(path, "w", newline="", encoding="utf-8") as staff_file:
+        writer = csv.writer(staff_file)
+        writer.writerow(COLUMNS)
+        for i in range(count):
+            writer.writerow((f"Staff{i}", "Sample", f"staff{i}@example.com",
+                             "Flight Attendant", secrets.token_urlsafe(12)))
+
+
+def check_passwords():
+    """Self-check of verify_password(), including non-ASCII passwords."""
+    cases = [
+        ("secret", "secret", True),
+        ("secret", "Secret", False),
+        ("pässwörd", "pässwörd", True),
+        ("abc", "é", False),
+        ("é", "abc", False),
+        (hash_password("pässwörd", 1000), "pässwörd", True),
+        (hash_password("pässwörd", 1000), "passwort", False),
+    ]
+    for stored, password, expected in cases:
+        assert verify_password(stored, password) is expected, (stored, password)
+    print(f"verify_password: {len(cases)} cases ok")
+
+
+def bench(count):
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    csv_path = os.path.join(directory, "staff.csv")
+    write_sample_csv(csv_path, count)
+    cores = os.cpu_count() or 1
+    levels = sorted({1, 2, 4, 8, cores} - {n for n in (2, 4, 8) if n > cores})
+    print(f"{count} accounts, {PBKDF2_ITERATIONS} PBKDF2 rounds, {cores} cores")
+    print(f"{'workers':>7} {'seconds':>8} {'accounts/s':>11} {'speed-up':>9}")
+    baseline = None
+    for workers in levels:
+        db_path = os.path.join(directory, f"bench_{workers}.db")
+        result = import_staff(csv_path, db_path, workers)
+        rate = result["imported"] / result["seconds"]
+        baseline = baseline or rate
+        print(f"{workers:>7} {result['seconds']:>8.2f} {rate:>11.1f} {rate / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk import staff accounts from a CSV file.")
+    parser.add_argument("csv", nargs="?")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="hashing processes (default: one per core)")
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE)
+    parser.add_argument("--bench", type=int, metavar="N", help="time the import of N generated accounts")
+    parser.add_argument("--check", action="store_true", help="self-check password verification")
+    args = parser.parse_args()
+
+    if args.check:
+        check_passwords()
+    elif args.bench:
+        bench(args.bench)
+    elif not args.csv:
+        parser.error("a CSV file is required")
+    else:
+        result = import_staff(args.csv, args.db, args.workers, args.batch)
+        for line, reason in result["rejected"]:
+            print(f"line {line}: {reason}")
+        print(f"Imported {result['imported']} of {result['read']} accounts "
+              f"in {result['seconds']:.1f} s ({len(result['rejected'])} skipped)")
@@ -0,0 +1,282 @@
+# ----------------------------------------
+# Airline Management System - Multi-Terminal Stress Tool
+# ----------------------------------------
+# Finds where "database is locked" starts when several terminals share
+# one database file. N worker processes run a realistic mix of flight
+# searches, passenger saves and bookings (the same statements the GUI
+# runs, including the FTS triggers and the waitlist check) against a
+# WAL-mode copy of the database. N is swept upward and each level
+# reports throughput, lock errors and tail latency.
+#
+# Lock errors are split into:
+# - timeout:  a writer waited longer than --timeout for the write lock
+# - snapshot: SQLITE_BUSY without waiting, when a transaction that has
+#   already read tries to write after another terminal committed
+#
+# Like the GUI, writes run in sqlite3's default mode: the existence
+# checks run outside the transaction and the INSERT opens it.
+# --immediate wraps check and write in BEGIN IMMEDIATE instead, which
+# closes that race at the cost of holding the write lock longer.
+#
+#   python stress.py                          # 1, 2, 4, 8, 16 workers
+#   python stress.py --workers 1,4,16,32 --seconds 10 --mix 50,30,20
+#   python stress.py --immediate
+# ----------------------------------------
+
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+import passenger_search
+import waitlist
+
+DB_PATH = 'airline_management.db'
+
+WORKERS = (1, 2, 4, 8, 16)
+SECONDS = 5
+# Busy timeout of each connection (seconds); sqlite3's own default is 5
+TIMEOUT = 5.0
+# Percentages of searches, passenger saves and bookings
+MIX = (60, 25, 15)
+
+OPERATIONS = ("search", "save_passenger", "book")
+
+
+# -------------------------------
+# Database copy
+# -------------------------------
+def _seed(conn, flights=2000, passengers=5000):
+    """Fill an empty copy with a synthetic schedule and passenger list."""
+    conn.executescript('''
+        CREATE TABLE IF NOT EXISTS flights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            flight_number VARCHAR NOT NULL,
+            origin VARCHAR NOT NULL,
+            destination VARCHAR NOT NULL,
+            departure_time VARCHAR NOT NULL,
+            arrival_time VARCHAR NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS passengers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            gender TEXT NOT NULL,
+            passport_number TEXT UNIQUE NOT NULL,
+            contact_info TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS bookings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            passenger_id INTEGER NOT NULL,
+            flight_id INTEGER NOT NULL,
+            seat_number TEXT
+        );
+    ''')
+    if conn.execute("SELECT COUNT(*) FROM flights").fetchone()[0] == 0:
+        airports = ["LOS", "ABV", "PHC", "KAN", "ACC", "JFK", "LHR", "DXB"]
+        conn.executemany('''
+            INSERT INTO flights (flight_number, origin, destination, departure_time, arrival_time)
+            VALUES (?, ?, ?, ?, ?)
+        ''', ((f"ST{i}", *random.sample(airports, 2), "2025-06-01 08:00", "2025-06-01 10:00")
+              for i in range(flights)))
+    if conn.execute("SELECT COUNT(*) FROM passengers").fetchone()[0] == 0:
+        conn.executemany('''
+            INSERT INTO passengers (name, age, gender, passport_number, contact_info)
+            VALUES (?, ?, ?, ?, ?)
+        ''', ((f"Passenger {i}", random.randint(1, 90), "F", f"SEED{i}", "x@example.com")
+              for i in range(passengers)))
+    conn.commit()
+
+
+def make_copy(db_path, directory):
+    """
+    WAL-mode copy of db_path (or of a synthetic database when db_path
+    does not exist) with the app's indexes and triggers in place.
+    """
+    path = os.path.join(directory, "stress.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    target = sqlite3.connect(path)
+    if os.path.exists(db_path):
+        source = sqlite3.connect(db_path)
+        source.backup(target)
+        source.close()
+    _seed(target)
+    passenger_search.setup_passenger_search(target)
+    waitlist.setup_waitlist(target)
+    target.execute("PRAGMA journal_mode=WAL")
+    target.close()
+    return path
+
+
+# -------------------------------
+# Worker process
+# -------------------------------
+def _search(conn, rng, state):
+    conn.execute('''
+        SELECT * FROM flights WHERE flight_number = ?
+    ''', (rng.choice(state["flight_numbers"]),)).fetchone()
+
+
+def _save_passenger(conn, rng, state, immediate):
+    state["saved"] += 1
+    passport_number = f"W{state['worker']}-{state['saved']}"
+    if immediate:
+        conn.execute("BEGIN IMMEDIATE")
+    exists = conn.execute('''
+        SELECT COUNT(*) FROM passengers WHERE passport_number = ?
+    ''', (passport_number,)).fetchone()[0]
+    if not exists:
+        conn.execute('''
+            INSERT INTO passengers (name, age, gender, passport_number, contact_info)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (f"Stress {passport_number}", rng.randint(1, 90), "M", passport_number, "x@example.com"))
+    conn.commit()
+
+
+def _book(conn, rng, state, immediate):
+    passenger_id = rng.randint(1, state["passengers"])
+    flight_id = rng.choice(state["flight_ids"])
+    if immediate:
+        conn.execute("BEGIN IMMEDIATE")
+    already_booked = conn.execute('''
+        SELECT COUNT(*) FROM bookings WHERE passenger_id = ? AND flight_id = ?
+    ''', (passenger_id, flight_id)).fetchone()[0]
+    if not already_booked and not waitlist.is_waitlisted(conn, passenger_id, flight_id):
+        waitlist.book_or_waitlist(conn, passenger_id, flight_id)
+    conn.commit()
+
+
+def _worker(path, worker, seconds, timeout, mix, immediate, start, results):
+    rng = random.Random(worker)
+    conn = sqlite3.connect(path, timeout=timeout)
+    state = {
+        "worker": worker,
+        "saved": 0,
+        "flight_ids": [row[0] for row in conn.execute("SELECT id FROM flights")],
+        "flight_numbers": [row[0] for row in conn.execute("SELECT flight_number FROM flights")],
+        "passengers": conn.execute("SELECT MAX(id) FROM passengers").fetchone()[0],
+    }
+    run = {
+        "search": lambda: _search(conn, rng, state),
+        "save_passenger": lambda: _save_passenger(conn, rng, state, immediate),
+        "book": lambda: _book(conn, rng, state, immediate),
+    }
+    latencies = {name: [] for name in OPERATIONS}
+    errors = {"timeout": 0, "snapshot": 0, "other": 0}
+
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        name = rng.choices(OPERATIONS, weights=mix)[0]
+        began = time.perf_counter()
+        try:
+            run[name]()
+        except sqlite3.OperationalError as e:
+            conn.rollback()
+            waited = time.perf_counter() - began
+            if "locked" in str(e) or "busy" in str(e):
+                # A busy timeout shows up after waiting; a stale snapshot
+                # fails immediately.
+                errors["timeout" if waited >= timeout * 0.9 else "snapshot"] += 1
+            else:
+                errors["other"] += 1
+            continue
+        latencies[name].append(time.perf_counter() - began)
+
+    conn.close()
+    results.put((latencies, errors))
+
+
+# -------------------------------
+# Sweep
+# -------------------------------
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def run_level(path, workers, seconds=SECONDS, timeout=TIMEOUT, mix=MIX, immediate=False):
+    """Run one concurrency level and return its statistics."""
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_worker, args=(
+        path, worker, seconds, timeout, mix, immediate, start, results))
+        for worker in range(workers)]
+    for process in processes:
+        process.start()
+    time.sleep(0.5)  # let every worker connect and load its ids
+    start.set()
+
+    latencies = {name: [] for name in OPERATIONS}
+    errors = {"timeout": 0, "snapshot": 0, "other": 0}
+    for _ in processes:
+        worker_latencies, worker_errors = results.get()
+        for name in OPERATIONS:
+            latencies[name].extend(worker_latencies[name])
+        for kind in errors:
+            errors[kind] += worker_errors[kind]
+    for process in processes:
+        process.join()
+
+    everything = sorted(value for values in latencies.values() for value in values)
+    writes = sorted(latencies["save_passenger"] + latencies["book"])
+    attempts = len(everything) + sum(errors.values())
+    return {
+        "workers": workers,
+        "ops_per_s": len(everything) / seconds,
+        "writes_per_s": len(writes) / seconds,
+        "errors": errors,
+        "error_rate": sum(errors.values()) / attempts if attempts else 0.0,
+        "p50_ms": _percentile(everything, 0.50) * 1000,
+        "p95_ms": _percentile(everything, 0.95) * 1000,
+        "p99_ms": _percentile(everything, 0.99) * 1000,
+        "write_p99_ms": _percentile(writes, 0.99) * 1000,
+        "max_ms": (everything[-1] if everything else 0.0) * 1000,
+    }
+
+
+def print_row(stats):
+    errors = stats["errors"]
+    print(f"{stats['workers']:>7} {stats['ops_per_s']:>9.0f} {stats['writes_per_s']:>8.0f} "
+          f"{stats['error_rate'] * 100:>6.2f}% ({errors['timeout']} timeout, "
+          f"{errors['snapshot']} snapshot) "
+          f"{stats['p50_ms']:>7.2f} {stats['p95_ms']:>7.2f} {stats['p99_ms']:>8.2f} "
+          f"{stats['write_p99_ms']:>9.2f} {stats['max_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Multi-process write-throughput stress test.")
+    parser.add_argument("--db", default=DB_PATH, help="database to copy (synthetic data if missing)")
+    parser.add_argument("--workers", default=",".join(map(str, WORKERS)),
+                        help="comma-separated concurrency levels")
+    parser.add_argument("--seconds", type=float, default=SECONDS, help="duration of each level")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT, help="busy timeout per connection")
+    parser.add_argument("--mix", default=",".join(map(str, MIX)),
+                        help="search,save_passenger,book percentages")
+    parser.add_argument("--immediate", action="store_true",
+                        help="start write transactions with BEGIN IMMEDIATE")
+    args = parser.parse_args()
+
+    levels = [int(n) for n in args.workers.split(",")]
+    mix = [float(n) for n in args.mix.split(",")]
+    directory = tempfile.mkdtemp()
+    try:
+        print(f"mix search/save/book = {args.mix}, {args.seconds:g} s per level, "
+              f"busy timeout {args.timeout:g} s{', BEGIN IMMEDIATE' if args.immediate else ''}")
+        print("workers     ops/s  writes/s  lock errors                     "
+              "p50 ms  p95 ms   p99 ms  write p99   max ms")
+        for workers in levels:
+            # Fresh copy per level so every level starts from the same data
+            path = make_copy(args.db, directory)
+            print_row(run_level(path, workers, args.seconds, args.timeout, mix, args.immediate))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
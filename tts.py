@@ -1,25 +1,11 @@
 #
-from gtts import gTTS
 from tkinter import *
 import tkinter.messagebox as messagebox  # Correcting import
 import sqlite3
-import os
-import pygame
+import speech
 
 def text_to_speech(text):
-    tts = gTTS(text=text, lang='en')
-    audio_file = "flight_info.mp3"
-    tts.save(audio_file)
-    
-    pygame.mixer.init()
-    pygame.mixer.music.load(audio_file)
-    pygame.mixer.music.play()
-    
-    while pygame.mixer.music.get_busy():  # Wait until the audio finishes playing
-        continue
-    
-    pygame.mixer.quit()  # Properly quit the mixer
-    os.remove(audio_file)  # Remove the audio file after playing
+    speech.speak(text)  # Plays the first sentence while the rest is synthesised
 
 def add_flight():
     flight_number = flight_number_entry.get()
@@ -0,0 +1,294 @@
+# ----------------------------------------
+# Airline Management System - Capacity, Overbooking and Waitlist
+# ----------------------------------------
+# - flight_capacity: per-flight seat capacity, overbooking percentage
+#   and aircraft layout (a seat_map.AIRCRAFT_LAYOUTS key; flights without
+#   a row, or without a layout, use the default layout). The capacity
+#   defaults to the layout's seat count
+# - waitlist: passengers waiting for a seat, served by priority
+#   (higher first) and then by request order
+# - Cancelling a booking promotes the next waitlisted passenger in the
+#   same transaction. The (flight_id, priority, id) index makes finding
+#   that passenger an O(log n) index seek instead of a table scan.
+# - Booking and promoting take the write lock (BEGIN IMMEDIATE) before
+#   counting, so two terminals cannot both see the last free place;
+#   a partial UNIQUE index stops two bookings sharing a seat
+# - An optional conflicts(passenger_id, flight_id) callback (see
+#   booking_conflicts.py) is asked inside that transaction: a booking
+#   that overlaps another flight of the passenger is refused, and a
+#   waitlisted passenger with one is held back at promotion
+#
+#   python waitlist.py 42 narrowbody                 # 30 x ABCDEF, 180 seats
+#   python waitlist.py 42 regional --capacity 76 --overbooking 0
+# ----------------------------------------
+
+import logging
+import random
+import sqlite3
+from datetime import datetime
+
+from seat_map import AIRCRAFT_LAYOUTS, seat_label, load_occupied_seats
+
+DB_PATH = 'airline_management.db'
+
+# Default percentage of extra bookings accepted beyond capacity
+OVERBOOKING_PERCENT = 5
+
+DEFAULT_LAYOUT = AIRCRAFT_LAYOUTS["default"]
+
+_log = logging.getLogger(__name__)
+
+
+def setup_waitlist(conn):
+    """Create the capacity and waitlist tables and their indexes."""
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS flight_capacity (
+            flight_id INTEGER PRIMARY KEY,
+            capacity INTEGER NOT NULL,
+            overbooking_percent REAL NOT NULL DEFAULT 0,
+            layout TEXT,
+            FOREIGN KEY(flight_id) REFERENCES flights(id)
+        )
+    ''')
+    # Databases created before layouts were stored per flight
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(flight_capacity)")]
+    if "layout" not in columns:
+        cursor.execute("ALTER TABLE flight_capacity ADD COLUMN layout TEXT")
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS waitlist (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            passenger_id INTEGER NOT NULL,
+            flight_id INTEGER NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            requested_at TEXT NOT NULL,
+            UNIQUE(passenger_id, flight_id),
+            FOREIGN KEY(passenger_id) REFERENCES passengers(id),
+            FOREIGN KEY(flight_id) REFERENCES flights(id)
+        )
+    ''')
+    # Next passenger to promote: highest priority, then earliest request
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_waitlist_next
+        ON waitlist (flight_id, priority DESC, id)
+    ''')
+    # Seat counts and occupancy per flight
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_bookings_flight
+        ON bookings (flight_id, passenger_id)
+    ''')
+    # One booking per seat (overbooked passengers have no seat yet)
+    try:
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_bookings_seat
+            ON bookings (flight_id, seat_number) WHERE seat_number IS NOT NULL
+        ''')
+    except sqlite3.IntegrityError:
+        _log.warning("Seats booked twice exist; idx_bookings_seat not created until they are fixed")
+    conn.commit()
+
+
+def begin_write(conn):
+    """
+    Take the write lock now, so counts read afterwards stay true until
+    the commit. A transaction that already wrote holds the lock.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def seat_count(layout):
+    rows, letters = layout
+    return rows * len(letters)
+
+
+def set_capacity(conn, flight_id, capacity=None, overbooking_percent=OVERBOOKING_PERCENT,
+                 layout=None):
+    """
+    Set the aircraft layout (an AIRCRAFT_LAYOUTS key, None for the
+    default), seat capacity and overbooking allowance of one flight.
+    The capacity defaults to the layout's seat count.
+    """
+    if layout is not None and layout not in AIRCRAFT_LAYOUTS:
+        raise ValueError(f"Unknown aircraft layout: {layout}")
+    if capacity is None:
+        capacity = seat_count(AIRCRAFT_LAYOUTS[layout or "default"])
+    conn.execute('''
+        INSERT INTO flight_capacity (flight_id, capacity, overbooking_percent, layout)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(flight_id) DO UPDATE SET
+            capacity = excluded.capacity,
+            overbooking_percent = excluded.overbooking_percent,
+            layout = excluded.layout
+    ''', (flight_id, capacity, overbooking_percent, layout))
+    conn.commit()
+
+
+def flight_layout(conn, flight_id):
+    """(rows, letters) of the flight's aircraft, the default layout if none is set."""
+    row = conn.execute('''
+        SELECT layout FROM flight_capacity WHERE flight_id = ?
+    ''', (flight_id,)).fetchone()
+    return AIRCRAFT_LAYOUTS.get(row[0] if row else None, DEFAULT_LAYOUT)
+
+
+def booking_limit(conn, flight_id):
+    """Number of bookings accepted on a flight, overbooking included."""
+    row = conn.execute('''
+        SELECT capacity, overbooking_percent FROM flight_capacity WHERE flight_id = ?
+    ''', (flight_id,)).fetchone()
+    if row is None:
+        row = (seat_count(DEFAULT_LAYOUT), OVERBOOKING_PERCENT)
+    capacity, overbooking_percent = row
+    return int(capacity * (1 + overbooking_percent / 100))
+
+
+def pick_free_seat(conn, flight_id, layout=None):
+    """
+    A random seat of the flight's layout that is not already taken, or
+    None when every physical seat is booked (overbooked passengers get a
+    seat at the gate).
+    """
+    occupied = load_occupied_seats(conn, flight_id)
+    rows, letters = layout or flight_layout(conn, flight_id)
+    free = [seat_label(row, letter)
+            for row in range(1, rows + 1) for letter in letters
+            if seat_label(row, letter) not in occupied]
+    return random.choice(free) if free else None
+
+
+def book_or_waitlist(conn, passenger_id, flight_id, priority=0, conflicts=None):
+    """
+    Book the passenger if the flight is under its limit, otherwise add
+    them to the waitlist. Returns ("booked", seat_number),
+    ("waitlisted", position) or ("conflict", overlapping flights) when
+    conflicts() finds any. The caller commits.
+    """
+    begin_write(conn)
+    if conflicts is not None:
+        overlapping = conflicts(passenger_id, flight_id)
+        if overlapping:
+            return "conflict", overlapping
+    booked = conn.execute('''
+        SELECT COUNT(*) FROM bookings WHERE flight_id = ?
+    ''', (flight_id,)).fetchone()[0]
+
+    if booked < booking_limit(conn, flight_id):
+        seat_number = pick_free_seat(conn, flight_id)
+        conn.execute('''
+            INSERT INTO bookings (passenger_id, flight_id, seat_number)
+            VALUES (?, ?, ?)
+        ''', (passenger_id, flight_id, seat_number))
+        return "booked", seat_number
+
+    conn.execute('''
+        INSERT OR IGNORE INTO waitlist (passenger_id, flight_id, priority, requested_at)
+        VALUES (?, ?, ?, ?)
+    ''', (passenger_id, flight_id, priority, datetime.now().isoformat(timespec="seconds")))
+    return "waitlisted", waitlist_position(conn, passenger_id, flight_id)
+
+
+def waitlist_position(conn, passenger_id, flight_id):
+    """1-based position of a passenger on a flight's waitlist, or None."""
+    row = conn.execute('''
+        SELECT id, priority FROM waitlist WHERE passenger_id = ? AND flight_id = ?
+    ''', (passenger_id, flight_id)).fetchone()
+    if row is None:
+        return None
+    entry_id, priority = row
+    ahead = conn.execute('''
+        SELECT COUNT(*) FROM waitlist
+        WHERE flight_id = ? AND (priority > ? OR (priority = ? AND id < ?))
+    ''', (flight_id, priority, priority, entry_id)).fetchone()[0]
+    return ahead + 1
+
+
+def is_waitlisted(conn, passenger_id, flight_id):
+    return waitlist_position(conn, passenger_id, flight_id) is not None
+
+
+def cancel_booking(conn, passenger_id, flight_id, conflicts=None):
+    """
+    Cancel a booking and promote the next waitlisted passenger onto the
+    freed seat, in one transaction. Returns (cancelled, promoted) where
+    promoted is (passenger_id, seat_number) or None.
+    """
+    try:
+        begin_write(conn)
+        row = conn.execute('''
+            SELECT id, seat_number FROM bookings WHERE passenger_id = ? AND flight_id = ?
+        ''', (passenger_id, flight_id)).fetchone()
+        if row is None:
+            # Not booked: maybe the passenger is only on the waitlist
+            cursor = conn.execute('''
+                DELETE FROM waitlist WHERE passenger_id = ? AND flight_id = ?
+            ''', (passenger_id, flight_id))
+            conn.commit()
+            return cursor.rowcount > 0, None
+
+        booking_id, seat_number = row
+        conn.execute("DELETE FROM bookings WHERE id = ?", (booking_id,))
+        promoted = promote_next(conn, flight_id, seat_number, conflicts)
+        conn.commit()
+        return True, promoted
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+
+
+def promote_next(conn, flight_id, seat_number=None, conflicts=None):
+    """
+    Move the first waitlisted passenger onto the flight if it is under
+    its limit, skipping passengers that conflicts() says are booked on
+    an overlapping flight (they keep their place). Uses the
+    idx_waitlist_next index. The caller commits.
+    """
+    begin_write(conn)
+    booked = conn.execute('''
+        SELECT COUNT(*) FROM bookings WHERE flight_id = ?
+    ''', (flight_id,)).fetchone()[0]
+    if booked >= booking_limit(conn, flight_id):
+        return None
+
+    # Read in waitlist order; usually the first entry is taken
+    candidates = conn.execute('''
+        SELECT id, passenger_id FROM waitlist
+        WHERE flight_id = ?
+        ORDER BY priority DESC, id
+    ''', (flight_id,))
+    for entry_id, passenger_id in candidates:
+        if conflicts is None or not conflicts(passenger_id, flight_id):
+            break
+    else:
+        return None
+    candidates.close()
+
+    if seat_number is None:
+        seat_number = pick_free_seat(conn, flight_id)
+    conn.execute("DELETE FROM waitlist WHERE id = ?", (entry_id,))
+    conn.execute('''
+        INSERT INTO bookings (passenger_id, flight_id, seat_number)
+        VALUES (?, ?, ?)
+    ''', (passenger_id, flight_id, seat_number))
+    return passenger_id, seat_number
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Set the aircraft layout and capacity of a flight.")
+    parser.add_argument("flight_id", type=int)
+    parser.add_argument("layout", choices=sorted(AIRCRAFT_LAYOUTS))
+    parser.add_argument("--capacity", type=int, help="seats sold (default: the layout's seat count)")
+    parser.add_argument("--overbooking", type=float, default=OVERBOOKING_PERCENT,
+                        help="percentage of extra bookings accepted")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    setup_waitlist(conn)
+    set_capacity(conn, args.flight_id, args.capacity, args.overbooking, args.layout)
+    rows, letters = flight_layout(conn, args.flight_id)
+    print(f"Flight {args.flight_id}: {args.layout} ({rows} rows x {letters}), "
+          f"up to {booking_limit(conn, args.flight_id)} bookings")
+    conn.close()